@@ -0,0 +1,12 @@
+"""
+Benchmark suite for Void Walker v4.
+
+    benchmarks.generator  deterministic synthetic directory trees
+    benchmarks.runner     drives the engine across shapes/workers/strategies
+    benchmarks.compare    regression gate against a stored baseline report
+
+Run with: python -m benchmarks.runner --help
+"""
+from benchmarks.generator import SHAPES, generate_tree
+
+__all__ = ["SHAPES", "generate_tree"]
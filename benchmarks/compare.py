@@ -0,0 +1,178 @@
+"""
+Performance regression gate for Void Walker v4.
+
+Compares a benchmark report (from benchmarks.runner) against a baseline
+report and exits non-zero when any metric regresses beyond its tolerance.
+Runs are matched on (shape, strategy, workers); repeated runs are reduced
+to their median first.
+
+Usage:
+    # Record a baseline on the reference machine
+    python -m benchmarks.runner --scale 0.5 --repeat 3 --output benchmarks/baseline.json
+
+    # Compare an existing report
+    python -m benchmarks.compare bench.json --baseline benchmarks/baseline.json
+
+    # Re-run the baseline's suite and compare in one step
+    python -m benchmarks.compare --run --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+# metric -> (higher_is_better, relative tolerance, absolute slack)
+# Absolute slack keeps sub-millisecond noise on tiny values from failing the gate.
+DEFAULT_TOLERANCES: Dict[str, Tuple[bool, float, float]] = {
+    "folders_per_sec": (True, 0.10, 0.0),
+    "peak_rss_bytes": (False, 0.15, 4 * 1024 * 1024),
+    "db_bytes_per_folder": (False, 0.05, 16.0),
+    "startup_seconds": (False, 0.25, 0.05),
+}
+
+RunKey = Tuple[str, str, int]
+
+RESET = "\033[0m"
+
+
+def _median_runs(report: Dict[str, object]) -> Dict[RunKey, Dict[str, float]]:
+    """Reduce a report's runs to {(shape, strategy, workers): {metric: median}}."""
+    grouped: Dict[RunKey, List[dict]] = {}
+    for run in report.get("runs", []):
+        grouped.setdefault((run["shape"], run["strategy"], run["workers"]), []).append(run)
+    medians = {}
+    for key, runs in grouped.items():
+        medians[key] = {}
+        for metric in DEFAULT_TOLERANCES:
+            values = [run[metric] for run in runs if run.get(metric) is not None]
+            if values:
+                medians[key][metric] = statistics.median(values)
+    return medians
+
+
+def compare_reports(baseline: Dict[str, object], current: Dict[str, object],
+                    tolerances: Optional[Dict[str, float]] = None) -> List[Dict[str, object]]:
+    """Compare two benchmark reports metric by metric.
+
+    Args:
+        baseline: Baseline report (may carry a "tolerances" {metric: relative} override)
+        current: Report to check
+        tolerances: Extra {metric: relative tolerance} overrides (win over the baseline's)
+
+    Returns:
+        Rows with key, metric, baseline, current, change (relative) and status
+        ("ok", "improved", "regressed" or "missing")
+    """
+    limits = {metric: rel for metric, (_, rel, _) in DEFAULT_TOLERANCES.items()}
+    limits.update(baseline.get("tolerances", {}))
+    limits.update(tolerances or {})
+
+    base_runs = _median_runs(baseline)
+    current_runs = _median_runs(current)
+    rows = []
+    for key in sorted(base_runs):
+        for metric, base_value in base_runs[key].items():
+            higher_is_better, _, slack = DEFAULT_TOLERANCES[metric]
+            value = current_runs.get(key, {}).get(metric)
+            row = {"key": key, "metric": metric, "baseline": base_value, "current": value,
+                   "change": None, "status": "missing"}
+            if value is not None:
+                delta = value - base_value
+                row["change"] = delta / base_value if base_value else 0.0
+                # Positive "worse" means the metric moved in the bad direction
+                worse = -delta if higher_is_better else delta
+                allowed = max(abs(base_value) * limits[metric], slack)
+                if worse > allowed:
+                    row["status"] = "regressed"
+                elif -worse > allowed:
+                    row["status"] = "improved"
+                else:
+                    row["status"] = "ok"
+            rows.append(row)
+    return rows
+
+
+def _format_value(metric: str, value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if metric == "peak_rss_bytes":
+        return f"{value / (1024 * 1024):,.1f} MB"
+    if metric == "startup_seconds":
+        return f"{value * 1000:,.0f} ms"
+    return f"{value:,.1f}"
+
+
+def format_table(rows: List[Dict[str, object]]) -> List[str]:
+    """Render comparison rows as an aligned diff table."""
+    colors = {"regressed": "\033[91m", "improved": "\033[92m", "missing": "\033[93m", "ok": ""}
+    lines = [f" {'Configuration':<26} {'Metric':<20} {'Baseline':>12} {'Current':>12} {'Change':>8}  Status",
+             " " + "-" * 90]
+    for row in rows:
+        shape, strategy, workers = row["key"]
+        change = f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "-"
+        color = colors[row["status"]]
+        lines.append(
+            f" {f'{shape} {strategy} x{workers}':<26} {row['metric']:<20} "
+            f"{_format_value(row['metric'], row['baseline']):>12} {_format_value(row['metric'], row['current']):>12} "
+            f"{change:>8}  {color}{row['status'].upper()}{RESET if color else ''}"
+        )
+    return lines
+
+
+def _parse_tolerance(text: str) -> Tuple[str, float]:
+    metric, _, value = text.partition("=")
+    if metric not in DEFAULT_TOLERANCES or not value:
+        raise argparse.ArgumentTypeError(f"expected METRIC=FRACTION with METRIC in {', '.join(DEFAULT_TOLERANCES)}")
+    return metric, float(value)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument("current", nargs="?", help="Benchmark report JSON to check")
+    parser.add_argument("--baseline", required=True, help="Baseline report JSON")
+    parser.add_argument("--run", action="store_true", help="Run the baseline's suite now instead of reading CURRENT")
+    parser.add_argument("--tolerance", action="append", type=_parse_tolerance, default=[],
+                        metavar="METRIC=FRACTION", help="Override a relative tolerance, e.g. folders_per_sec=0.2")
+    parser.add_argument("--output", help="With --run, also save the new report here")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    if args.run:
+        from benchmarks.runner import run_suite
+        suite = baseline.get("suite", {})
+        with tempfile.TemporaryDirectory(prefix="void_walker_bench_") as work_dir:
+            current = run_suite(suite.get("shapes", list(baseline.get("trees", {}))),
+                                suite.get("workers", [1, 4, 16]), suite.get("strategies", ["bfs", "dfs"]),
+                                work_dir, baseline.get("scale", 1.0), baseline.get("seed", 42),
+                                suite.get("repeat", 1), suite.get("cleanup", False),
+                                backend=baseline.get("fs", "disk"),
+                                latency=baseline.get("latency", {}).get("model"),
+                                stall_rate=baseline.get("latency", {}).get("stall_rate", 0.0))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+    elif args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        parser.error("give a CURRENT report or --run")
+
+    rows = compare_reports(baseline, current, dict(args.tolerance))
+    for line in format_table(rows):
+        print(line)
+
+    regressed = sum(1 for row in rows if row["status"] == "regressed")
+    missing = sum(1 for row in rows if row["status"] == "missing")
+    if regressed:
+        print(f"\n\033[91m[!] {regressed} metric(s) regressed beyond tolerance\033[0m")
+        return 1
+    print("\n\033[92m[OK] No regressions\033[0m" + (f" ({missing} baseline metric(s) not measured)" if missing else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Deterministic synthetic directory trees for Void Walker benchmarks.
+
+Every shape is driven by random.Random(seed), so the same (shape, scale,
+seed) always produces the same tree. generate_tree returns a manifest with
+the folder/file/empty counts the engine is expected to report. Trees are
+written to disk, or into a utils.filesystem.MemoryFileSystem when one is given.
+"""
+import os
+import random
+import shutil
+from typing import Callable, Dict, Optional
+
+from utils.filesystem import MemoryFileSystem
+
+# Largest file written by the generator; contents are irrelevant to the scanner
+MAX_FILE_BYTES = 256
+
+
+class _Builder:
+    """Creates folders/files under a root (on disk or in memory) and tallies the manifest."""
+
+    def __init__(self, root: str, rng: random.Random, fs: Optional[MemoryFileSystem] = None):
+        self.root = root
+        self.rng = rng
+        self.fs = fs
+        self.folders = 1  # The root itself
+        self.files = 0
+        self.bytes = 0
+        self.max_depth = 0
+        self.non_empty = set()  # Folders that received at least one entry
+
+    def folder(self, parent: str, name: str, depth: int) -> str:
+        path = os.path.join(parent, name)
+        if self.fs:
+            self.fs.mkdir(path)
+        else:
+            os.mkdir(path)
+        self.folders += 1
+        self.max_depth = max(self.max_depth, depth)
+        self.non_empty.add(parent)
+        return path
+
+    def files_in(self, parent: str, count: int) -> None:
+        for i in range(count):
+            size = self.rng.randint(0, MAX_FILE_BYTES)
+            path = os.path.join(parent, f"file_{i:05d}.dat")
+            if self.fs:
+                self.fs.add_file(path, size)
+            else:
+                with open(path, "wb") as f:
+                    f.write(b"v" * size)
+            self.files += 1
+            self.bytes += size
+            self.non_empty.add(parent)
+
+
+def _wide(b: _Builder, scale: float) -> None:
+    """One level of many sibling folders, a quarter of them empty."""
+    for i in range(max(1, int(2000 * scale))):
+        path = b.folder(b.root, f"wide_{i:05d}", 1)
+        if b.rng.random() >= 0.25:
+            b.files_in(path, 1)
+
+
+def _deep(b: _Builder, scale: float) -> None:
+    """Long single-child chains; every other chain ends in an empty leaf."""
+    depth = max(2, int(50 * min(scale, 4) ** 0.5))
+    for chain in range(max(1, int(20 * scale))):
+        path = b.root
+        for level in range(1, depth + 1):
+            path = b.folder(path, f"d{chain}_{level}", level)
+        if chain % 2:
+            b.files_in(path, 1)
+
+
+def _balanced(b: _Builder, scale: float) -> None:
+    """Full 4-ary tree; 30% of leaves are empty."""
+    levels = 5 + (1 if scale >= 4 else 0)
+
+    def grow(parent, depth):
+        for i in range(4):
+            path = b.folder(parent, f"n{i}", depth)
+            if depth < levels:
+                grow(path, depth + 1)
+            elif b.rng.random() >= 0.3:
+                b.files_in(path, 1)
+
+    grow(b.root, 1)
+
+
+def _many_files(b: _Builder, scale: float) -> None:
+    """Few folders holding many files each."""
+    for i in range(max(1, int(100 * scale))):
+        b.files_in(b.folder(b.root, f"bucket_{i:04d}", 1), 200)
+
+
+def _huge_dir(b: _Builder, scale: float) -> None:
+    """Pathological single directory with a very large listing."""
+    huge = b.folder(b.root, "huge", 1)
+    b.files_in(huge, max(1, int(20000 * scale)))
+    for i in range(max(1, int(500 * scale))):
+        b.folder(huge, f"empty_{i:04d}", 2)
+
+
+def _mixed(b: _Builder, scale: float) -> None:
+    """Irregular tree with random fan-out, files and nested empty chains."""
+    budget = [max(10, int(3000 * scale))]
+
+    def grow(parent, depth):
+        fan_out = b.rng.randint(0, 6) if depth > 1 else 8
+        for i in range(fan_out):
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+            path = b.folder(parent, f"m{depth}_{i}", depth)
+            roll = b.rng.random()
+            if roll < 0.2:
+                b.files_in(path, b.rng.randint(1, 20))
+            if roll > 0.85:
+                # Chain of folders that only contain empty folders
+                nested = path
+                for level in range(b.rng.randint(1, 4)):
+                    budget[0] -= 1
+                    nested = b.folder(nested, f"e{level}", depth + level + 1)
+            elif depth < 8:
+                grow(path, depth + 1)
+
+    grow(b.root, 1)
+
+
+SHAPES: Dict[str, Callable[[_Builder, float], None]] = {
+    "wide": _wide,
+    "deep": _deep,
+    "balanced": _balanced,
+    "many_files": _many_files,
+    "huge_dir": _huge_dir,
+    "mixed": _mixed,
+}
+
+
+def generate_tree(root: str, shape: str, scale: float = 1.0, seed: int = 42,
+                  fs: Optional[MemoryFileSystem] = None) -> Dict[str, object]:
+    """Create a synthetic tree at `root` (replacing anything already there).
+
+    Args:
+        root: Directory to create
+        shape: One of SHAPES
+        scale: Size multiplier (1.0 = a few thousand folders or files)
+        seed: RNG seed; identical arguments produce identical trees
+        fs: Build the tree in this in-memory filesystem instead of on disk
+
+    Returns:
+        Manifest dict: shape, scale, seed, root, folders, files, bytes, empty, max_depth
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown tree shape: {shape} (choose from {', '.join(SHAPES)})")
+    if fs:
+        fs.add_root(root)
+    else:
+        if os.path.exists(root):
+            shutil.rmtree(root)
+        os.makedirs(root)
+
+    builder = _Builder(root, random.Random(f"{shape}:{seed}"), fs)
+    SHAPES[shape](builder, scale)
+    return {
+        "shape": shape,
+        "scale": scale,
+        "seed": seed,
+        "root": root,
+        "folders": builder.folders,
+        "files": builder.files,
+        "bytes": builder.bytes,
+        # Folders with no entries at all (what the scanner reports as empty)
+        "empty": builder.folders - len(builder.non_empty),
+        "max_depth": builder.max_depth,
+    }
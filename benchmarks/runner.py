@@ -0,0 +1,299 @@
+"""
+Scan benchmark runner for Void Walker v4.
+
+Generates the requested synthetic trees once, then drives Engine.scan_only
+(and optionally a dry-run cleanup_only) for every combination of shape,
+worker count and strategy. Each run executes in a fresh subprocess so peak
+RSS and interpreter state are per configuration. With --fs memory the trees
+live in a MemoryFileSystem, isolating the engine, scheduler and database
+from disk I/O (peak RSS then includes the in-memory tree). --latency wraps
+the tree in a SimulatedFileSystem so strategies and worker counts can be
+compared under HDD, SSD or NFS latency models.
+
+Usage:
+    python -m benchmarks.runner --shapes wide deep --workers 1 4 16 --strategies bfs dfs
+    python -m benchmarks.runner --scale 0.2 --output bench.json
+    python -m benchmarks.runner --fs memory --scale 50 --shapes balanced mixed
+    python -m benchmarks.runner --fs memory --latency hdd --workers 1 4 16 --shapes balanced
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.generator import SHAPES, generate_tree
+from utils.filesystem import LOCAL_FS, FileSystem, MemoryFileSystem
+from utils.fs_simulator import LATENCY_MODELS, SimulatedFileSystem
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process in bytes (None if unavailable)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        pass
+    if os.name == "nt":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize
+        except (OSError, AttributeError):
+            pass
+    return None
+
+
+def run_single(tree_root: str, workers: int, strategy: str, db_path: str,
+               cleanup: bool = False, quiet: bool = True,
+               fs: Optional[FileSystem] = None, latency: Optional[str] = None,
+               stall_rate: float = 0.0) -> Dict[str, object]:
+    """Scan one tree in this process and return its measurements.
+
+    Args:
+        tree_root: Root of a generated tree
+        workers: Worker thread count
+        strategy: "bfs", "dfs" or "hybrid"
+        db_path: SQLite file for this run (replaced if present)
+        cleanup: Also time a dry-run cleanup phase
+        quiet: Discard the engine's console output
+        fs: In-memory filesystem holding the tree (default: the real disk)
+        latency: Simulate this device (a LATENCY_MODELS name) on top of the tree
+        stall_rate: Probability of an injected stall per filesystem call
+
+    Returns:
+        Result dict with folders, wall/scan/cleanup/startup seconds, folders_per_sec,
+        peak_rss_bytes, db_bytes and db_bytes_per_folder (plus simulated_fs stats
+        when latency is set)
+    """
+    from config.settings import Config
+    from core.engine import Engine
+
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    if latency or stall_rate:
+        model = LATENCY_MODELS[latency or "none"](root=tree_root, stall_rate=stall_rate)
+        fs = SimulatedFileSystem(fs or LOCAL_FS, model)
+
+    args = argparse.Namespace(
+        path=tree_root, delete=False, resume=False, disk="ssd", strategy=strategy, workers=workers,
+        min_depth=0, max_depth=10000, exclude_path=[], exclude_name=[], include_name=[],
+        no_estimate=True,  # Tree-size sampling would add its own directory reads to the measurement
+        no_tuning=True  # Results must not depend on whichever history DB sits in the cwd
+    )
+    # Benchmarks measure the engine, not session log I/O
+    logger = logging.getLogger("VoidWalker.benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    output = open(os.devnull, "w", encoding="utf-8") if quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            created_at = time.time()
+            config = Config(args)
+            config.db_path = db_path
+            engine = Engine(config, logger, fs)
+
+            started = time.perf_counter()
+            engine.scan_only()
+            scan_seconds = time.perf_counter() - started
+            # Config, engine and DB setup up to the moment the first folder is dispatched
+            startup_seconds = engine.scan_start_time - created_at
+
+            cleanup_seconds = None
+            if cleanup:
+                cleanup_started = time.perf_counter()
+                engine.cleanup_only()
+                cleanup_seconds = time.perf_counter() - cleanup_started
+            engine.db.close()
+            wall_seconds = time.perf_counter() - started
+    finally:
+        if quiet:
+            output.close()
+
+    db_bytes = sum(os.path.getsize(db_path + suffix) for suffix in ("", "-wal")
+                   if os.path.exists(db_path + suffix))
+    result = {
+        "workers": workers,
+        "strategy": strategy,
+        "folders": engine.total_scanned,
+        "empty": engine.total_empty,
+        "errors": engine.total_errors,
+        "scan_seconds": round(scan_seconds, 4),
+        "cleanup_seconds": round(cleanup_seconds, 4) if cleanup_seconds is not None else None,
+        "wall_seconds": round(wall_seconds, 4),
+        "folders_per_sec": round(engine.total_scanned / scan_seconds, 1) if scan_seconds > 0 else None,
+        "startup_seconds": round(startup_seconds, 4),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "db_bytes": db_bytes,
+        "db_bytes_per_folder": round(db_bytes / engine.total_scanned, 1) if engine.total_scanned else None,
+    }
+    if isinstance(fs, SimulatedFileSystem):
+        result["simulated_fs"] = fs.stats()
+    return result
+
+
+def _run_isolated(tree_root: str, workers: int, strategy: str, db_path: str, cleanup: bool,
+                  memory_tree: Optional[Dict[str, object]] = None, latency: Optional[str] = None,
+                  stall_rate: float = 0.0) -> Dict[str, object]:
+    """Run one configuration in a child interpreter and parse its JSON result.
+
+    In-memory trees cannot be shared with the child, so it regenerates the
+    tree from the manifest's shape/scale/seed before scanning.
+    """
+    command = [sys.executable, "-m", "benchmarks.runner", "--single", tree_root,
+               "--workers", str(workers), "--strategies", strategy, "--db", db_path]
+    if cleanup:
+        command.append("--cleanup")
+    if memory_tree:
+        command += ["--fs", "memory", "--shapes", memory_tree["shape"],
+                    "--scale", str(memory_tree["scale"]), "--seed", str(memory_tree["seed"])]
+    if latency:
+        command += ["--latency", latency]
+    if stall_rate:
+        command += ["--stall-rate", str(stall_rate)]
+    completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed ({workers} workers, {strategy}):\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_suite(shapes: List[str], worker_counts: List[int], strategies: List[str], work_dir: str,
+              scale: float = 1.0, seed: int = 42, repeat: int = 1, cleanup: bool = False,
+              isolate: bool = True, backend: str = "disk", latency: Optional[str] = None,
+              stall_rate: float = 0.0) -> Dict[str, object]:
+    """Generate trees and benchmark every (shape, workers, strategy) combination.
+
+    Args:
+        shapes: Tree shapes to generate (see benchmarks.generator.SHAPES)
+        worker_counts: Worker counts to try
+        strategies: Strategies to try ("bfs"/"dfs"/"hybrid")
+        work_dir: Directory for generated trees and per-run databases
+        scale: Tree size multiplier
+        seed: Generator seed
+        repeat: Runs per configuration
+        cleanup: Also time a dry-run cleanup phase
+        isolate: Run each configuration in its own subprocess
+        backend: "disk" to write trees under work_dir, "memory" for MemoryFileSystem trees
+        latency: Simulated device latency model (see utils.fs_simulator.LATENCY_MODELS)
+        stall_rate: Probability of an injected stall per filesystem call
+
+    Returns:
+        Report dict with environment info, tree manifests and a list of runs
+    """
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "seed": seed,
+        "fs": backend,
+        "latency": {"model": latency, "stall_rate": stall_rate},
+        # Parameters needed to reproduce this report (used by benchmarks.compare --run)
+        "suite": {"shapes": list(shapes), "workers": list(worker_counts), "strategies": list(strategies),
+                  "repeat": repeat, "cleanup": cleanup},
+        "trees": {},
+        "runs": [],
+    }
+    for shape in shapes:
+        tree_root = os.path.join(work_dir, "trees", shape)
+        fs = MemoryFileSystem() if backend == "memory" else None
+        manifest = generate_tree(tree_root, shape, scale, seed, fs)
+        report["trees"][shape] = manifest
+        for strategy in strategies:
+            for workers in worker_counts:
+                for attempt in range(repeat):
+                    db_path = os.path.join(work_dir, f"bench_{shape}_{strategy}_{workers}.db")
+                    if isolate:
+                        result = _run_isolated(tree_root, workers, strategy, db_path, cleanup,
+                                               manifest if fs else None, latency, stall_rate)
+                    else:
+                        # Cleanup is a dry run, so one in-memory tree serves every run
+                        result = run_single(tree_root, workers, strategy, db_path, cleanup, fs=fs,
+                                            latency=latency, stall_rate=stall_rate)
+                    result.update(shape=shape, attempt=attempt,
+                                  correct=result["folders"] == manifest["folders"]
+                                  and result["empty"] == manifest["empty"])
+                    report["runs"].append(result)
+                    print(f"[*] {shape:<10} {strategy:<3} {workers:>3} workers: "
+                          f"{result['folders_per_sec'] or 0:>10,.1f} folders/s  "
+                          f"{result['scan_seconds']:.2f}s"
+                          + ("" if result["correct"] else "  \033[91m[MISMATCH]\033[0m"),
+                          file=sys.stderr, flush=True)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Void Walker scan benchmarks")
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--strategies", nargs="+", choices=["bfs", "dfs", "hybrid"], default=["bfs", "dfs"])
+    parser.add_argument("--scale", type=float, default=1.0, help="Tree size multiplier (default: 1.0)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per configuration")
+    parser.add_argument("--cleanup", action="store_true", help="Also time a dry-run cleanup phase")
+    parser.add_argument("--work-dir", help="Where trees and databases are created (default: temp dir)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--no-isolate", action="store_true", help="Run all configurations in this process")
+    parser.add_argument("--fs", choices=["disk", "memory"], default="disk",
+                        help="Filesystem backend for generated trees (default: disk)")
+    parser.add_argument("--latency", choices=[name for name in LATENCY_MODELS if name != "none"],
+                        help="Simulate device latency on top of the tree (hdd, ssd, nfs)")
+    parser.add_argument("--stall-rate", type=float, default=0.0,
+                        help="Probability that a filesystem call stalls (default: 0)")
+    # Internal: one configuration, JSON result on stdout (used for isolation)
+    parser.add_argument("--single", metavar="TREE", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        fs = None
+        if args.fs == "memory":
+            fs = MemoryFileSystem()
+            generate_tree(args.single, args.shapes[0], args.scale, args.seed, fs)
+        result = run_single(args.single, args.workers[0], args.strategies[0], args.db, args.cleanup, fs=fs,
+                            latency=args.latency, stall_rate=args.stall_rate)
+        print(json.dumps(result))
+        return 0
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="void_walker_bench_")
+    report = run_suite(args.shapes, args.workers, args.strategies, work_dir, args.scale, args.seed,
+                       args.repeat, args.cleanup, isolate=not args.no_isolate, backend=args.fs,
+                       latency=args.latency, stall_rate=args.stall_rate)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"[OK] Report written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0 if all(run["correct"] for run in report["runs"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
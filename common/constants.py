@@ -38,6 +38,7 @@ class ScanStrategy(Enum):
     AUTO = "auto"  # Match disk type
     BFS = "bfs"    # Breadth-first search (best for SSD)
     DFS = "dfs"    # Depth-first search (best for HDD)
+    HYBRID = "hybrid"  # BFS until every worker has subtrees, then DFS
 
 
 class FolderStatus(Enum):
@@ -74,6 +75,8 @@ class EnginePhase(Enum):
 DEFAULT_DB_PATH = "void_walker_history.db"
 DB_COMMIT_INTERVAL = 10  # seconds between automatic commits
 DB_WAL_MODE = True
+DB_INVALIDATION_WORKERS = 16  # Threads for existence checks when resuming
+DB_INVALIDATION_BATCH_SIZE = 1000  # Pending rows checked per batch
 
 
 # =============================================================================
@@ -82,6 +85,11 @@ DB_WAL_MODE = True
 DASHBOARD_UPDATE_FPS = 5  # Frames per second (updates/sec)
 DASHBOARD_UPDATE_INTERVAL = 0.2  # Seconds between refreshes (1/FPS)
 DASHBOARD_SPINNER_CHARS = ["|", "/", "-", "\\"]
+DASHBOARD_HISTORY_SECONDS = 300  # Per-second samples kept for rates and sparkline
+DASHBOARD_RATE_WINDOW_SHORT = 10  # Seconds for the displayed scan rate
+DASHBOARD_RATE_WINDOW_LONG = 60  # Seconds for the trend rate and ETA
+DASHBOARD_EWMA_ALPHA = 0.3  # Smoothing for the per-second EWMA rate
+DASHBOARD_SPARKLINE_WIDTH = 20  # Seconds shown in the throughput sparkline
 
 
 # =============================================================================
@@ -92,6 +100,14 @@ WORKERS_HDD = 4
 MIN_WORKERS = 1
 MAX_WORKERS = 32
 QUEUE_BATCH_SIZE = 2  # Multiple of workers for queue processing
+CALIBRATION_WORKER_COUNTS = (1, 2, 4, 8, 16, 32)  # Worker counts tried by --calibrate
+CALIBRATION_TRIAL_SECONDS = 5.0  # Time box per calibration trial
+CALIBRATION_TRIAL_FOLDERS = 20000  # Folder cap per calibration trial
+CALIBRATION_SUBTREES_PER_TRIAL = 4  # Disjoint subtrees sampled by each trial
+CALIBRATION_TIE_TOLERANCE = 0.05  # Within 5% of the best throughput, fewer workers win
+TUNING_HISTORY_SESSIONS = 200  # Recent completed sessions consulted for learned tuning
+TUNING_MIN_FOLDERS = 1000  # Smaller sessions are too short to rank configurations
+TUNING_MIN_SECONDS = 5.0  # ...as are sessions that finished faster than this
 
 
 # =============================================================================
@@ -122,6 +138,8 @@ DEFAULT_EXCLUDE_NAMES = [
 # =============================================================================
 CONFIG_FILE = "void_walker_config.json"
 LOG_DIRECTORY = "logs"
+LOG_MAX_BYTES = 50 * 1024 * 1024  # Rotate session logs at 50 MB
+LOG_BACKUP_COUNT = 10  # Rotated log files kept per session
 CACHE_DIRECTORY = ".cache"
 
 
@@ -141,6 +159,51 @@ ENGINE_COMMIT_INTERVAL = 10  # Seconds between database commits
 ENGINE_PROGRESS_UPDATE_INTERVAL = 50  # Items processed between progress updates
 ENGINE_WORKER_CAPACITY_MULTIPLIER = 2  # Futures queue = workers * multiplier
 ENGINE_QUEUE_POLL_SLEEP = 0.01  # Seconds between queue checks
+ENGINE_RESUME_PAGE_SIZE = 10000  # Pending folders loaded per page when resuming
+ENGINE_HYBRID_SUBTREES_PER_WORKER = 4  # Hybrid goes depth-first once the frontier holds this many per worker
+PRIORITY_MAX_SUBTREES = 500000  # Prior-session subtrees with empties loaded for --prioritize
+PRIORITY_CHANGED_WEIGHT = 1.0  # Score of a folder modified since the prior scan (as one expected empty)
+ESTIMATOR_MIN_PROBES = 32  # Random root-to-leaf probes before a tree-size estimate is shown
+ESTIMATOR_MAX_PROBES = 4000  # Probing stops here even if the interval is still wide
+ESTIMATOR_TARGET_PRECISION = 0.05  # Probing pauses once the 95% half-width is within 5% of the total
+ESTIMATOR_REFRESH_SECONDS = 1.0  # Seconds between re-estimates from the live frontier
+ESTIMATOR_PROBE_PAUSE = 0.005  # Sleep between probes so the scan keeps the disk
+ESTIMATOR_Z = 1.96  # Normal quantile for the 95% confidence interval
+
+
+# =============================================================================
+# METRICS EXPORT
+# =============================================================================
+METRICS_HTTP_HOST = "127.0.0.1"  # Exporter only listens on localhost
+METRICS_TEXTFILE_INTERVAL = 15  # Seconds between textfile-collector writes
+METRICS_LATENCY_BUCKET_START = 0.00001  # 10us: first latency histogram bound
+METRICS_LATENCY_BUCKET_FACTOR = 2  # Each bound doubles the previous one
+METRICS_LATENCY_BUCKET_COUNT = 22  # 10us .. ~21s
+METRICS_ENTRY_BUCKET_COUNT = 21  # Entry-count histogram bounds 1 .. 2^20
+PROFILE_TOP_DIRECTORIES = 5  # Slowest/largest directories listed in the final summary
+PROFILE_REPORT_LINES = 40  # Rows in --profile text reports
+PROFILE_TRACEMALLOC_FRAMES = 1  # Stack depth kept per allocation (1 = per line)
+TRACE_MAX_EVENTS_PER_THREAD = 500000  # --trace buffer cap per thread (later spans are dropped)
+TRACE_MIN_LOCK_WAIT_NS = 10000  # Lock waits shorter than 10us are not traced
+
+
+# =============================================================================
+# FILESYSTEM LATENCY SIMULATION (benchmarks / strategy evaluation)
+# =============================================================================
+SIM_HDD_FULL_SEEK_MS = 16.0  # Full-stroke seek; shorter seeks scale with sqrt(distance)
+SIM_HDD_SETTLE_MS = 0.8  # Head settle / track-to-track seek
+SIM_HDD_ROTATION_MS = 8.33  # One revolution at 7200 rpm (half is the average wait)
+SIM_HDD_BLOCK_READ_MS = 0.05  # Each further directory block, read sequentially
+SIM_HDD_CHILD_SPAN = 0.05  # Fraction of its parent's disk region a subdirectory occupies
+SIM_CACHED_OP_MS = 0.02  # Metadata already in the page cache (lstat/exists/rmdir on local disks)
+SIM_DIR_ENTRIES_PER_BLOCK = 100  # Directory entries per 4K block
+SIM_SSD_READ_MS = 0.08  # Random 4K read
+SIM_SSD_QUEUE_DEPTH = 32  # Requests the device serves in parallel
+SIM_NFS_RTT_MS = 1.0  # Round trip per RPC
+SIM_NFS_JITTER_MS = 0.5  # Uniform jitter added to each RPC
+SIM_NFS_ENTRIES_PER_RPC = 100  # Entries returned per READDIRPLUS call
+SIM_NFS_MAX_INFLIGHT = 16  # RPC slots on the client transport
+SIM_STALL_SECONDS = 0.5  # Length of an injected stall (server hiccup, SMR flush, etc.)
 
 
 # =============================================================================
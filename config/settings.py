@@ -4,12 +4,31 @@ import platform
 import subprocess
 import sys
 from datetime import datetime
+from common.constants import WORKERS_SSD, WORKERS_HDD, ENGINE_COMMIT_INTERVAL, TUNING_HISTORY_SESSIONS
+from config.tuning import describe_learned, learn_from_history
+from utils.scan_profile import device_id
 from utils.validators import normalize_path
 
 class Config:
     def __init__(self, args):
         self.args = args
         
+        # Metrics export, profiling, tracing and log level are per-run, so it is never loaded from a resumed session
+        self.metrics_port = getattr(args, 'metrics_port', 0)
+        self.metrics_textfile = getattr(args, 'metrics_textfile', None)
+        self.profile_memory = getattr(args, 'profile_memory', False)
+        self.profile = getattr(args, 'profile', False) or self.profile_memory
+        self.trace = getattr(args, 'trace', False)
+        self.lock_stats = getattr(args, 'lock_stats', False)
+        self.log_level = getattr(args, 'log_level', 'INFO')
+        self.estimate = not getattr(args, 'no_estimate', False)  # Tree-size sampling for the ETA
+        self.time_budget = getattr(args, 'time_budget', 0) or 0  # Seconds this run may scan (0 = unlimited)
+        self.unattended_delete = getattr(args, 'unattended_delete', False)  # Rolling cycles may delete without a prompt
+        self.use_tuning = not getattr(args, 'no_tuning', False)  # Calibrated profile and session history (off = reproducible)
+        self.tuning_profile = None  # Calibrated workers/strategy applied to this run, if any
+        self.learned_tuning = None  # Best configuration from past sessions, if any was applied
+        self.tuning_source = {}  # Setting -> where its value came from (shown by the controller)
+        
         # CRITICAL: Resume mode should NOT accept a path argument
         if args.resume and args.path:
             raise ValueError("Cannot specify path with --resume flag. Path is loaded from resume state.")
@@ -49,22 +68,7 @@ class Config:
             except OSError as e:
                 raise ValueError(f"Cannot access resume path: {self.root_path}\n  Error: {e}")
             
-            # Load saved config values
-            saved = last_session['config']
-            self.delete_mode = saved.get('delete_mode', args.delete)
-            self.min_depth = saved.get('min_depth', args.min_depth)
-            self.max_depth = saved.get('max_depth', args.max_depth)
-            self.exclude_paths = saved.get('exclude_paths', args.exclude_path)
-            self.exclude_names = saved.get('exclude_names', args.exclude_name + [".git", "$RECYCLE.BIN", "System Volume Information"])
-            self.include_names = saved.get('include_names', args.include_name)
-            self.disk_type = saved.get('disk_type', 'auto')
-            self.strategy = saved.get('strategy', 'BFS')
-            self.workers = saved.get('workers', 16)
-            
-            # Don't create new session, we're resuming
-            self.timestamp = last_session['timestamp']
-            self.db_path = "void_walker_history.db"
-            self.resume_mode = True
+            self._restore_session(last_session, args)
             return
         
         # Normal mode - create new session
@@ -74,8 +78,21 @@ class Config:
         else:
             self.root_path = None
         
+        # Rolling scans (--time-budget) continue this root's unfinished cycle
+        if self.time_budget and self.root_path:
+            from data.database import Database
+            unfinished = Database.get_last_incomplete_session("void_walker_history.db", self.root_path)
+            if unfinished and unfinished['config'].get('rolling'):
+                print(f"\033[93m[*] Continuing rolling scan (cycle {unfinished['config'].get('cycle', 1)}): "
+                      f"{unfinished['session_id']}\033[0m")
+                print(f"    Started: {unfinished['timestamp']}\n")
+                self._restore_session(unfinished, args)
+                return
+        
         self.delete_mode = args.delete
         self.resume_mode = args.resume
+        self.rolling = bool(self.time_budget)
+        self.cycle = 1
         
         # Filters
         self.min_depth = args.min_depth
@@ -83,27 +100,109 @@ class Config:
         self.exclude_paths = args.exclude_path
         self.exclude_names = args.exclude_name + [".git", "$RECYCLE.BIN", "System Volume Information"]
         self.include_names = args.include_name
+        self.prioritize = getattr(args, 'prioritize', False)
 
         # Session
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.session_id = f"session_{self.timestamp}"
         self.db_path = "void_walker_history.db"
-
+        if self.rolling and self.root_path:
+            from data.database import Database
+            # The root's previous cycle finished, so this run wraps around to the top of the tree
+            self.cycle = Database.get_last_rolling_cycle(self.db_path, self.root_path) + 1
+        
         # Hardware Strategy
         self.disk_type = self._detect_disk(args.disk)
         
-        # Scan Strategy - explicit or auto-derived
-        if hasattr(args, 'strategy') and args.strategy and args.strategy != "auto":
+        explicit_strategy = hasattr(args, 'strategy') and args.strategy and args.strategy != "auto"
+        explicit_workers = args.workers > 0
+        explicit_interval = getattr(args, 'commit_interval', 0) > 0
+        calibrated = learned = None
+        if self.use_tuning and self.root_path and not (explicit_strategy and explicit_workers and explicit_interval):
+            # Precedence per setting: flag > --calibrate profile > session history > disk-type default
+            from data.database import Database
+            device = device_id(self.root_path)
+            if not (explicit_strategy and explicit_workers):
+                calibrated = Database.get_tuning_profile(self.db_path, device)
+            # History only fills settings that are still open, from sessions matching the fixed ones
+            fixed_workers = args.workers if explicit_workers else (calibrated or {}).get('workers')
+            fixed_strategy = args.strategy.upper() if explicit_strategy else (calibrated or {}).get('strategy')
+            learned = learn_from_history(
+                Database.get_session_history(self.db_path, TUNING_HISTORY_SESSIONS), self.root_path, device,
+                workers=fixed_workers, strategy=fixed_strategy,
+                commit_interval=args.commit_interval if explicit_interval else None
+            )
+        
+        # Scan Strategy - explicit, calibrated, learned or auto-derived
+        if explicit_strategy:
             self.strategy = args.strategy.upper()
+            self.tuning_source['strategy'] = "--strategy"
+        elif calibrated:
+            self.strategy = calibrated['strategy']
+            self.tuning_profile = calibrated
+            self.tuning_source['strategy'] = f"calibrated {calibrated['updated_at']}"
+        elif learned:
+            self.strategy = learned['strategy']
+            self.learned_tuning = learned
+            self.tuning_source['strategy'] = describe_learned(learned)
         else:
             self.strategy = "BFS" if self.disk_type == "ssd" else "DFS"
+            self.tuning_source['strategy'] = f"{self.disk_type.upper()} default"
         
         # Concurrency Tuning
-        if args.workers > 0:
+        if explicit_workers:
             self.workers = args.workers
+            self.tuning_source['workers'] = "--workers"
+        elif calibrated:
+            self.workers = calibrated['workers']
+            self.tuning_profile = calibrated
+            self.tuning_source['workers'] = f"calibrated {calibrated['updated_at']}"
+        elif learned:
+            self.workers = learned['workers']
+            self.learned_tuning = learned
+            self.tuning_source['workers'] = describe_learned(learned)
         else:
             # SSD = High threads, HDD = Low threads
-            self.workers = 16 if self.disk_type == "ssd" else 4
+            self.workers = WORKERS_SSD if self.disk_type == "ssd" else WORKERS_HDD
+            self.tuning_source['workers'] = f"{self.disk_type.upper()} default"
+        
+        # Seconds between database commits / checkpoints
+        if explicit_interval:
+            self.commit_interval = args.commit_interval
+            self.tuning_source['commit_interval'] = "--commit-interval"
+        elif learned:
+            self.commit_interval = learned['commit_interval']
+            self.learned_tuning = learned
+            self.tuning_source['commit_interval'] = describe_learned(learned)
+        else:
+            self.commit_interval = ENGINE_COMMIT_INTERVAL
+            self.tuning_source['commit_interval'] = "default"
+    
+    def _restore_session(self, last_session, args):
+        """Load a saved session's config to continue it (--resume or the next --time-budget window)."""
+        self.session_id = last_session['session_id']
+        self.root_path = last_session['root_path']
+        # Load saved config values
+        saved = last_session['config']
+        self.delete_mode = saved.get('delete_mode', args.delete)
+        self.min_depth = saved.get('min_depth', args.min_depth)
+        self.max_depth = saved.get('max_depth', args.max_depth)
+        self.exclude_paths = saved.get('exclude_paths', args.exclude_path)
+        self.exclude_names = saved.get('exclude_names', args.exclude_name + [".git", "$RECYCLE.BIN", "System Volume Information"])
+        self.include_names = saved.get('include_names', args.include_name)
+        self.disk_type = saved.get('disk_type', 'auto')
+        self.strategy = saved.get('strategy', 'BFS')
+        self.workers = saved.get('workers', 16)
+        self.commit_interval = saved.get('commit_interval', ENGINE_COMMIT_INTERVAL)
+        self.prioritize = saved.get('prioritize', False)
+        self.tuning_source = {setting: "resumed session" for setting in ('strategy', 'workers', 'commit_interval')}
+        self.rolling = saved.get('rolling', False)
+        self.cycle = saved.get('cycle', 1)
+        
+        # Don't create new session, we're resuming
+        self.timestamp = last_session['timestamp']
+        self.db_path = "void_walker_history.db"
+        self.resume_mode = True
 
     def _detect_disk(self, user_choice):
         """Enhanced disk detection using Windows PowerShell or platform heuristics"""
@@ -166,6 +265,11 @@ class Config:
             'include_names': self.include_names,
             'disk_type': self.disk_type,
             'strategy': self.strategy,
-            'workers': self.workers
+            'workers': self.workers,
+            'commit_interval': self.commit_interval,
+            'prioritize': self.prioritize,
+            'rolling': self.rolling,
+            'cycle': self.cycle,
+            'device_id': device_id(self.root_path) if self.root_path else None
         }
         db.save_config(config_dict, self.root_path) 
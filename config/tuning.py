@@ -0,0 +1,86 @@
+"""
+Learned tuning from session history.
+
+Past fully scanned sessions record their workers, strategy and commit
+interval (in the saved config) and their elapsed scan time (in the last
+checkpoint). learn_from_history ranks the configurations used on the same
+root -- or, failing that, the same device -- by median throughput.
+"""
+import statistics
+from typing import Any, Dict, List, Optional
+
+from common.constants import ENGINE_COMMIT_INTERVAL, TUNING_MIN_FOLDERS, TUNING_MIN_SECONDS
+from utils.scan_profile import device_id
+
+
+def learn_from_history(sessions: List[Dict[str, Any]], root_path: str, device: str,
+                       workers: Optional[int] = None, strategy: Optional[str] = None,
+                       commit_interval: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Pick the best-performing configuration from past sessions.
+
+    Args:
+        sessions: Rows from Database.get_session_history
+        root_path: Root of the upcoming scan
+        device: Device id of root_path (see utils.scan_profile.device_id)
+        workers: Only consider sessions with this worker count (explicit --workers)
+        strategy: Only consider sessions with this strategy (explicit --strategy)
+        commit_interval: Only consider sessions with this commit interval (explicit flag)
+
+    Returns:
+        Dict with workers, strategy, commit_interval, folders_per_sec (median of the
+        winning configuration), samples (its session count), sessions (sessions
+        considered) and scope ("root" or "device"); None when no session qualifies
+    """
+    eligible = []
+    for session in sessions:
+        config = session['config']
+        if session['scanned'] < TUNING_MIN_FOLDERS or session['elapsed_seconds'] < TUNING_MIN_SECONDS:
+            continue
+        if 'workers' not in config or 'strategy' not in config:
+            continue
+        setting = (config['workers'], config['strategy'], config.get('commit_interval', ENGINE_COMMIT_INTERVAL))
+        if ((workers is not None and setting[0] != workers)
+                or (strategy is not None and setting[1] != strategy)
+                or (commit_interval is not None and setting[2] != commit_interval)):
+            continue
+        eligible.append((session, setting))
+
+    scope = "root"
+    pool = [(session, setting) for session, setting in eligible if session['root_path'] == root_path]
+    if not pool:
+        scope = "device"
+        # Sessions saved before device ids were recorded are resolved from their root
+        devices: Dict[str, str] = {}
+        for session, setting in eligible:
+            session_device = session['config'].get('device_id')
+            if not session_device and session['root_path']:
+                if session['root_path'] not in devices:
+                    devices[session['root_path']] = device_id(session['root_path'])
+                session_device = devices[session['root_path']]
+            if session_device == device:
+                pool.append((session, setting))
+    if not pool:
+        return None
+
+    rates: Dict[tuple, List[float]] = {}
+    for session, setting in pool:
+        rates.setdefault(setting, []).append(session['scanned'] / session['elapsed_seconds'])
+    # Highest median throughput; more supporting sessions break ties
+    (best_workers, best_strategy, best_interval), best_rates = max(
+        rates.items(), key=lambda item: (statistics.median(item[1]), len(item[1]))
+    )
+    return {
+        'workers': best_workers,
+        'strategy': best_strategy,
+        'commit_interval': best_interval,
+        'folders_per_sec': round(statistics.median(best_rates), 1),
+        'samples': len(best_rates),
+        'sessions': len(pool),
+        'scope': scope,
+    }
+
+
+def describe_learned(learned: Dict[str, Any]) -> str:
+    """Provenance label, e.g. 'history: best of 5 sessions on this root, 812.3 folders/s'."""
+    where = "this root" if learned['scope'] == "root" else "this device"
+    return f"history: best of {learned['sessions']} sessions on {where}, {learned['folders_per_sec']:,.1f} folders/s"
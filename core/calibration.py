@@ -0,0 +1,202 @@
+"""
+Worker/strategy calibration for a target volume (main.py --calibrate PATH).
+
+Runs short, time-boxed trial scans for each worker count and strategy and
+keeps the configuration with the best throughput. Each trial starts from
+its own disjoint set of subtrees, so later trials are not flattered by
+directory metadata the earlier ones pulled into the page cache.
+"""
+import argparse
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from common.constants import (
+    CALIBRATION_WORKER_COUNTS,
+    CALIBRATION_TRIAL_SECONDS,
+    CALIBRATION_TRIAL_FOLDERS,
+    CALIBRATION_SUBTREES_PER_TRIAL,
+    CALIBRATION_TIE_TOLERANCE,
+    DEFAULT_MAX_DEPTH,
+    MAX_WORKERS
+)
+from utils.filesystem import LOCAL_FS
+
+
+def _histogram_quantile(snapshot: Dict[tuple, Dict[str, object]], bounds: List[float], q: float) -> Optional[float]:
+    """Upper bound of the bucket holding quantile q across all label sets."""
+    merged = None
+    for data in snapshot.values():
+        merged = list(data['buckets']) if merged is None else [a + b for a, b in zip(merged, data['buckets'])]
+    if not merged or not sum(merged):
+        return None
+    target = q * sum(merged)
+    seen = 0
+    for bound, count in zip(bounds + [float('inf')], merged):
+        seen += count
+        if seen >= target:
+            return bound
+    return None
+
+
+class Calibrator:
+    """Finds the fastest workers/strategy combination for one volume.
+
+    Args:
+        root_path: Directory on the volume to sample
+        fs: Filesystem backend (the real disk unless injected)
+        worker_counts: Worker counts to try (capped at MAX_WORKERS)
+        strategies: Strategies to try ("BFS"/"DFS"/"HYBRID")
+        trial_seconds: Time box per trial
+        trial_folders: Folder cap per trial
+        exclude_names: Folder name globs skipped during trials
+        exclude_paths: Path globs skipped during trials
+    """
+
+    def __init__(self, root_path: str, fs=None,
+                 worker_counts: Sequence[int] = CALIBRATION_WORKER_COUNTS,
+                 strategies: Sequence[str] = ("BFS", "DFS"),
+                 trial_seconds: float = CALIBRATION_TRIAL_SECONDS,
+                 trial_folders: int = CALIBRATION_TRIAL_FOLDERS,
+                 exclude_names: Sequence[str] = (), exclude_paths: Sequence[str] = ()):
+        self.root_path = root_path
+        self.fs = fs or LOCAL_FS
+        self.worker_counts = [w for w in worker_counts if 1 <= w <= MAX_WORKERS]
+        self.strategies = [s.upper() for s in strategies]
+        self.trial_seconds = trial_seconds
+        self.trial_folders = trial_folders
+        self.exclude_names = list(exclude_names)
+        self.exclude_paths = list(exclude_paths)
+        self.disjoint = True  # False when the tree is too small to give every trial its own subtrees
+        # Trial engines log nothing; only the calibration summary matters
+        self.logger = logging.getLogger("VoidWalker.calibration")
+        self.logger.addHandler(logging.NullHandler())
+        self.logger.propagate = False
+
+    def _sample_roots(self, trials: int) -> List[List[Tuple[str, int]]]:
+        """Split the shallowest level with enough directories into one subtree set per trial."""
+        needed = trials * CALIBRATION_SUBTREES_PER_TRIAL
+        level = [(self.root_path, 0)]
+        while len(level) < needed:
+            children = []
+            for path, depth in level:
+                try:
+                    with self.fs.scandir(path) as it:
+                        children.extend((entry.path, depth + 1) for entry in it
+                                        if entry.is_dir(follow_symlinks=False) and not entry.is_symlink())
+                except OSError:
+                    continue
+            if not children:
+                break
+            level = children
+        if len(level) < trials:
+            self.disjoint = False
+            return [level for _ in range(trials)]
+        return [level[i::trials] for i in range(trials)]
+
+    def _run_trial(self, workers: int, strategy: str, starts: List[Tuple[str, int]], work_dir: str) -> Dict[str, object]:
+        """Scan from `starts` until the time box or folder cap and measure throughput."""
+        from config.settings import Config
+        from core.engine import Engine
+
+        args = argparse.Namespace(
+            path=self.root_path, delete=False, resume=False, disk="ssd", strategy=strategy.lower(),
+            workers=workers, min_depth=0, max_depth=DEFAULT_MAX_DEPTH,
+            exclude_path=self.exclude_paths, exclude_name=self.exclude_names, include_name=[],
+            no_estimate=True,  # Trials time the scan alone, without ETA sampling
+            no_tuning=True  # Each trial runs exactly the workers/strategy under test
+        )
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            config = Config(args)
+            config.db_path = os.path.join(work_dir, f"trial_{strategy}_{workers}.db")
+            engine = Engine(config, self.logger, self.fs)
+            engine.dashboard.active = False
+            engine.db.setup()
+            for path, depth in starts:
+                engine.db.add_folder(path, depth)
+                engine._enqueue(path, depth)
+
+            stop = threading.Event()
+
+            def watchdog():
+                deadline = time.perf_counter() + self.trial_seconds
+                while not stop.wait(0.02):
+                    if time.perf_counter() >= deadline or engine.total_scanned >= self.trial_folders:
+                        with engine.state_lock:
+                            engine.running = False
+                        return
+
+            timer = threading.Thread(target=watchdog, name="CalibrationWatchdog", daemon=True)
+            started = time.perf_counter()
+            timer.start()
+            try:
+                engine._process_queue()
+            finally:
+                stop.set()
+                timer.join()
+                engine.db.close()
+            elapsed = time.perf_counter() - started
+
+        enumerate_hist = engine.profile.phase_latency["enumerate"]
+        snapshot = enumerate_hist.snapshot()
+        count = sum(data['count'] for data in snapshot.values())
+        total = sum(data['sum'] for data in snapshot.values())
+        p95 = _histogram_quantile(snapshot, enumerate_hist.bounds, 0.95)
+        return {
+            "workers": workers,
+            "strategy": strategy,
+            "folders": engine.total_scanned,
+            "seconds": round(elapsed, 3),
+            "folders_per_sec": round(engine.total_scanned / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency_ms": round(total / count * 1000, 3) if count else None,
+            "p95_latency_ms": round(p95 * 1000, 3) if p95 is not None else None,
+        }
+
+    @staticmethod
+    def choose(trials: List[Dict[str, object]]) -> Dict[str, object]:
+        """Best trial: highest throughput, preferring fewer workers within the tie tolerance."""
+        best_rate = max(trial["folders_per_sec"] for trial in trials)
+        contenders = [t for t in trials if t["folders_per_sec"] >= best_rate * (1 - CALIBRATION_TIE_TOLERANCE)]
+        return min(contenders, key=lambda t: (t["workers"], -t["folders_per_sec"]))
+
+    def run(self) -> Dict[str, object]:
+        """Run every trial and return the chosen profile.
+
+        Returns:
+            Profile dict: root_path, workers, strategy, folders_per_sec, latency_ms,
+            p95_latency_ms and trials (all per-trial results)
+        """
+        combos = [(w, s) for s in self.strategies for w in self.worker_counts]
+        samples = self._sample_roots(len(combos))
+        print(f"\033[96m[*] Calibrating {self.root_path}: {len(combos)} trials of up to "
+              f"{self.trial_seconds:g}s / {self.trial_folders:,} folders\033[0m")
+        if not self.disjoint:
+            print("\033[93m    [!] Tree too small for disjoint samples; later trials may hit a warm cache\033[0m")
+
+        trials = []
+        work_dir = tempfile.mkdtemp(prefix="void_walker_calibrate_")
+        try:
+            for (workers, strategy), starts in zip(combos, samples):
+                result = self._run_trial(workers, strategy, starts, work_dir)
+                trials.append(result)
+                latency = f"{result['latency_ms']:.2f} ms" if result['latency_ms'] is not None else "-"
+                print(f"    {strategy:<3} {workers:>3} workers: {result['folders_per_sec']:>10,.1f} folders/s  "
+                      f"avg {latency}  ({result['folders']:,} folders)", flush=True)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        best = self.choose(trials)
+        return {
+            "root_path": self.root_path,
+            "workers": best["workers"],
+            "strategy": best["strategy"],
+            "folders_per_sec": best["folders_per_sec"],
+            "latency_ms": best["latency_ms"],
+            "p95_latency_ms": best["p95_latency_ms"],
+            "trials": trials,
+        }
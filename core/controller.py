@@ -1,6 +1,7 @@
 import threading
 import time
 import sys
+from datetime import timedelta
 from common.constants import CONTROLLER_POLL_INTERVAL, CONTROLLER_PAUSE_CHECK_INTERVAL
 
 class Controller:
@@ -36,9 +37,17 @@ class Controller:
         print("="*60)
         print(f" Root Path:    {cfg.root_path}")
         print(f" Mode:         {'DELETE' if cfg.delete_mode else 'DRY RUN'}")
-        print(f" Strategy:     {cfg.strategy}")
+        sources = getattr(cfg, 'tuning_source', {})
+        print(f" Strategy:     {cfg.strategy}" + (f"  ({sources['strategy']})" if 'strategy' in sources else ""))
         print(f" Disk Type:    {cfg.disk_type.upper()}")
-        print(f" Workers:      {cfg.workers}")
+        print(f" Workers:      {cfg.workers}" + (f"  ({sources['workers']})" if 'workers' in sources else ""))
+        commit_interval = getattr(cfg, 'commit_interval', self.engine.commit_interval)
+        print(f" Commit Every: {commit_interval}s" + (f"  ({sources['commit_interval']})" if 'commit_interval' in sources else ""))
+        if self.engine.priorities:
+            print(f" Prioritised:  by {self.engine.priorities.session_id} ({len(self.engine.priority_queue):,} queued)")
+        if self.engine.deadline is not None:
+            left = timedelta(seconds=max(0, int(self.engine.deadline - time.time())))
+            print(f" Time Budget:  {left} left (rolling cycle {getattr(cfg, 'cycle', 1)})")
         print(f" Min Depth:    {cfg.min_depth}")
         print(f" Max Depth:    {cfg.max_depth}")
         print(f" Excludes:     {', '.join(cfg.exclude_names[:5])}...")
@@ -1,6 +1,9 @@
 import os
 import sys
 import time
+import heapq
+import calendar
+import itertools
 import threading
 from concurrent.futures import ThreadPoolExecutor
 from collections import deque
@@ -12,11 +15,22 @@ from data.database import Database
 from ui.dashboard import Dashboard
 from ui.reporter import Reporter
 from .controller import Controller
+from .priority import SubtreePriorities
+from utils.prometheus import MetricsExporter
+from utils.scan_profile import ScanProfile
+from utils.profiling import PhaseProfiler, profiled_phase
+from utils.tracing import Tracer, NULL_TRACER
+from utils.lock_profiler import LockProfiler
+from utils.filesystem import LOCAL_FS
+from utils.tree_estimator import TreeSizeEstimator
 from common.constants import (
     ENGINE_COMMIT_INTERVAL,
     ENGINE_PROGRESS_UPDATE_INTERVAL,
     ENGINE_WORKER_CAPACITY_MULTIPLIER,
-    ENGINE_QUEUE_POLL_SLEEP
+    ENGINE_QUEUE_POLL_SLEEP,
+    ENGINE_RESUME_PAGE_SIZE,
+    ENGINE_HYBRID_SUBTREES_PER_WORKER,
+    PRIORITY_MAX_SUBTREES
 )
 import signal
 
@@ -31,20 +45,32 @@ class Engine:
         controller: Keyboard input handler for runtime controls
         queue: Thread-safe deque for pending folders
         executor: ThreadPoolExecutor for concurrent worker management
+        fs: Filesystem backend for scan and cleanup (the real disk unless injected)
     """
     
-    def __init__(self, config, logger):
+    def __init__(self, config, logger, fs=None):
         self.config = config
         self.logger = logger
+        self.fs = fs or LOCAL_FS
         self.db = Database(config.db_path, config.session_id)
         self.dashboard = Dashboard(config)
+        self.profile = ScanProfile()  # Per-directory timing breakdown
         self.controller = Controller(self) 
         self.queue = deque()
+        # --prioritize: folders expected to hold empties, popped before the deque (guarded by queue_lock)
+        self.priorities = None
+        self.priority_queue = []
+        self._priority_seq = itertools.count()
         self.queue_lock = threading.Lock()
+        self.estimator = None  # Background TreeSizeEstimator while scanning
         self.lock = threading.Lock()
         self.state_lock = threading.Lock()  # Protects paused/running flags
         self.paused = False
         self.running = True
+        # --time-budget: scan time for this run; the frontier is checkpointed when it runs out
+        self.time_budget = getattr(config, 'time_budget', 0)
+        self.deadline = None  # Set when scanning starts, so resume setup does not eat into the window
+        self.cycle_complete = False  # True once the scan drained the whole frontier
         self.executor = None
         self.last_commit_time = time.time()
         self.scan_start_time = None
@@ -52,12 +78,98 @@ class Engine:
         self.total_empty = 0
         self.total_errors = 0
         self.total_deleted = 0
+        self.total_bytes = 0
+        
+        # Checkpoint state: folders currently being scanned (path -> depth), guarded by self.lock
+        self.in_flight = {}
+        # Folders that were in flight at the last checkpoint before an interruption.
+        # Their children may already be recorded, so rescans only enqueue new ones.
+        self._resumed_in_flight = frozenset()
+        self._elapsed_offset = 0.0  # Scan time accumulated by earlier runs of this session
         
         # Use configurable intervals with fallback to constants
         self.commit_interval = getattr(config, 'commit_interval', ENGINE_COMMIT_INTERVAL)
         self.progress_update_interval = ENGINE_PROGRESS_UPDATE_INTERVAL
         self.worker_capacity_multiplier = ENGINE_WORKER_CAPACITY_MULTIPLIER
         self.queue_poll_sleep = ENGINE_QUEUE_POLL_SLEEP
+        self.hybrid_frontier = config.workers * ENGINE_HYBRID_SUBTREES_PER_WORKER
+        
+        # Resume paging state: pending rows are streamed from the DB in pages
+        self.resume_page_size = ENGINE_RESUME_PAGE_SIZE
+        self._resume_cursor = None  # (depth, rowid) of the last pending row loaded
+        self._resume_max_rowid = None  # Rows inserted after resume began are not paged
+        self._resume_exhausted = True  # No pages left to load (True unless resuming)
+        
+        self.exporter = None  # Optional Prometheus endpoint / textfile writer
+        
+        # Optional cProfile/tracemalloc profiling of scan and cleanup phases
+        self.profiler = None
+        self._scan_task = self._scan_folder
+        if getattr(config, 'profile', False):
+            self.profiler = PhaseProfiler(config.session_id, memory=getattr(config, 'profile_memory', False))
+            self._scan_task = self.profiler.wrap(self._scan_folder)
+        
+        # Optional Chrome trace-event timeline of worker activity
+        self.tracer = NULL_TRACER
+        if getattr(config, 'trace', False):
+            self.tracer = Tracer()
+            self.db.enable_tracing(self.tracer)
+        
+        # Optional lock contention profiling (wraps the locks above, so it must come last)
+        self.lock_profiler = None
+        if getattr(config, 'lock_stats', False):
+            self._instrument_locks()
+
+    def start_exporters(self):
+        """Start metrics export if --metrics-port or --metrics-textfile was given"""
+        port = getattr(self.config, 'metrics_port', 0)
+        textfile = getattr(self.config, 'metrics_textfile', None)
+        if not port and not textfile:
+            return
+        self.exporter = MetricsExporter(self, port=port, textfile=textfile)
+        self.exporter.start()
+        if port:
+            print(f"\033[90m    > Metrics: http://127.0.0.1:{self.exporter.port}/metrics\033[0m")
+            self.logger.info(f"Metrics endpoint listening on port {self.exporter.port}")
+        if textfile:
+            self.logger.info(f"Writing metrics textfile to {textfile}")
+
+    def stop_exporters(self):
+        if self.exporter:
+            self.exporter.stop()
+            self.exporter = None
+
+    def _instrument_locks(self):
+        """Replace the engine, database and dashboard locks with instrumented proxies"""
+        self.lock_profiler = LockProfiler()
+        self.lock = self.lock_profiler.wrap(self.lock, "Engine.lock")
+        self.queue_lock = self.lock_profiler.wrap(self.queue_lock, "Engine.queue_lock")
+        self.state_lock = self.lock_profiler.wrap(self.state_lock, "Engine.state_lock")
+        self.db.lock = self.lock_profiler.wrap(self.db.lock, "Database.lock")
+        self.dashboard.lock = self.lock_profiler.wrap(self.dashboard.lock, "Dashboard.lock")
+
+    def print_lock_report(self):
+        """Print the --lock-stats contention table (no-op when lock profiling is off)"""
+        if not self.lock_profiler:
+            return
+        lines = self.lock_profiler.format_report()
+        if not lines:
+            return
+        print("\n" + "="*112)
+        print(" " + f"LOCK CONTENTION ({self.config.workers} workers)".center(110))
+        print("="*112)
+        for line in lines:
+            print(line)
+        print("="*112)
+        self.logger.info("Lock contention:\n" + "\n".join(lines))
+
+    def write_trace(self):
+        """Write the --trace timeline to logs/ and return its path (None when tracing is off)"""
+        if not self.tracer.enabled:
+            return None
+        path = self.tracer.write(os.path.join("logs", f"{self.config.session_id}_trace.json"))
+        self.logger.info(f"Trace written to {path}")
+        return path
 
     def start(self):
         # Register signal handlers for graceful shutdown
@@ -88,6 +200,7 @@ class Engine:
 
         self.logger.info("Phase 1: Scanning")
         self.dashboard.set_phase("SCANNING")
+        self._load_priorities()
         
         if not self.config.resume_mode:
             print(f"\033[92m[OK] Ready! Starting scan from: {self.config.root_path}\033[0m", flush=True)
@@ -98,26 +211,31 @@ class Engine:
         else:
             print("\033[93m[*] Loading resume state from cache...\033[0m", flush=True)
             self._load_resume_state()
-            print(f"\033[92m[OK] Resuming with {self._queue_size()} pending folders\033[0m", flush=True)
+            pending = self.db.get_statistics().get('total_pending', self._queue_size())
+            print(f"\033[92m[OK] Resuming with {pending} pending folders\033[0m", flush=True)
             print("")
 
+        self._start_estimator()
         self._process_queue()
+        self._stop_estimator()
         
-        # Scan complete - show summary but keep dashboard for cleanup phase
-        print(f"\n\033[92m[OK] Scan Complete!\033[0m", flush=True)
-        print(f"    Folders scanned: {self.total_scanned}", flush=True)
-        print(f"    Empty found: {self.total_empty}", flush=True)
-        print(f"    Errors: {self.total_errors}\n", flush=True)
+        # Scan complete - show summary but keep dashboard for cleanup phase.
+        # A stopped or budget-expired scan skips cleanup: the empty list is incomplete.
+        if self.cycle_complete:
+            print(f"\n\033[92m[OK] Scan Complete!\033[0m", flush=True)
+            print(f"    Folders scanned: {self.total_scanned}", flush=True)
+            print(f"    Empty found: {self.total_empty}", flush=True)
+            print(f"    Errors: {self.total_errors}\n", flush=True)
 
-        self.logger.info("Phase 2: Cleanup")
-        print("\033[96m[*] Phase 2: Analyzing empty folders...\033[0m", flush=True)
-        self.dashboard.set_phase("CLEANUP")
-        self._process_cleanup()
-        
-        print("\033[92m[OK] All phases complete\033[0m\n", flush=True)
+            self.logger.info("Phase 2: Cleanup")
+            print("\033[96m[*] Phase 2: Analyzing empty folders...\033[0m", flush=True)
+            self.dashboard.set_phase("CLEANUP")
+            self._process_cleanup()
+            
+            print("\033[92m[OK] All phases complete\033[0m\n", flush=True)
         
         # Show comprehensive final summary with top 3 root folders
-        reporter = Reporter(self.config, self.db)
+        reporter = Reporter(self.config, self.db, self.profile)
         reporter.show_final_summary()
         
         # Stop dashboard AFTER all work is done
@@ -130,6 +248,7 @@ class Engine:
         except Exception as e:
             self.logger.error(f"Error closing database: {e}")
     
+    @profiled_phase("scan")
     def scan_only(self):
         """Phase 1: Scanning only - does not perform cleanup"""
         print("\033[90m    > Setting up database...\033[0m")
@@ -146,6 +265,7 @@ class Engine:
 
         self.logger.info("Phase 1: Scanning")
         self.dashboard.set_phase("SCANNING")
+        self._load_priorities()
         
         if not self.config.resume_mode:
             print(f"\033[92m[OK] Ready! Starting scan from: {self.config.root_path}\033[0m", flush=True)
@@ -156,22 +276,27 @@ class Engine:
         else:
             print("\033[93m[*] Loading resume state from cache...\033[0m", flush=True)
             self._load_resume_state()
-            print(f"\033[92m[OK] Resuming with {self._queue_size()} pending folders\033[0m", flush=True)
+            pending = self.db.get_statistics().get('total_pending', self._queue_size())
+            print(f"\033[92m[OK] Resuming with {pending} pending folders\033[0m", flush=True)
             print("")
 
+        self._start_estimator()
         self._process_queue()
+        self._stop_estimator()
         
-        # Scan complete - show summary
-        print(f"\n\033[92m[OK] Scan Complete!\033[0m", flush=True)
-        print(f"    Folders scanned: {self.total_scanned}", flush=True)
-        print(f"    Empty found: {self.total_empty}", flush=True)
-        print(f"    Errors: {self.total_errors}\n", flush=True)
+        # Scan complete - show summary (a stopped scan was already reported by _process_queue)
+        if self.cycle_complete:
+            print(f"\n\033[92m[OK] Scan Complete!\033[0m", flush=True)
+            print(f"    Folders scanned: {self.total_scanned}", flush=True)
+            print(f"    Empty found: {self.total_empty}", flush=True)
+            print(f"    Errors: {self.total_errors}\n", flush=True)
         
         # Stop dashboard and controller after scan
         self.dashboard.stop()
         self.controller.stop()
         self.logger.info("Scan phase complete - controller and dashboard stopped")
     
+    @profiled_phase("cleanup")
     def cleanup_only(self):
         """Phase 2: Cleanup only - assumes scanning already completed"""
         self.logger.info("Phase 2: Cleanup")
@@ -190,34 +315,184 @@ class Engine:
         self.dashboard.stop()
         self.controller.stop()
 
+    def _load_priorities(self):
+        """Load the prior session's subtree rollups for --prioritize (no-op without one)."""
+        if not getattr(self.config, 'prioritize', False):
+            return
+        prior = self.db.get_prior_subtree_empties(self.config.root_path, PRIORITY_MAX_SUBTREES)
+        if not prior:
+            print("\033[90m    > No earlier completed session on this root; scanning in normal order\033[0m", flush=True)
+            self.logger.info("Prioritize: no prior session for this root")
+            return
+        try:
+            since = calendar.timegm(time.strptime(prior['timestamp'], "%Y-%m-%d %H:%M:%S"))
+        except (TypeError, ValueError):
+            since = float('inf')  # Unknown scan time: rank by prior empties only
+        self.priorities = SubtreePriorities(prior['empties'], since, prior['session_id'])
+        print(f"\033[90m    > Prioritising {len(prior['empties']):,} subtrees with empties from "
+              f"{prior['session_id']}, then folders changed since\033[0m", flush=True)
+        self.logger.info(f"Prioritize: {len(prior['empties'])} subtrees from {prior['session_id']}")
+
+    def _start_estimator(self):
+        """Start background tree-size sampling for the dashboard ETA (unless --no-estimate)."""
+        if not getattr(self.config, 'estimate', True):
+            return
+        self.estimator = TreeSizeEstimator(self.config.root_path, fs=self.fs, is_filtered=self._is_filtered,
+                                           progress=self._frontier_snapshot)
+        self.estimator.on_update = self._on_estimate
+        self._estimate_logged = False
+        self.estimator.start()
+
+    def _on_estimate(self, estimate):
+        """Estimator callback: feed the dashboard and log the first estimate."""
+        self.dashboard.set_size_estimate(estimate)
+        if not self._estimate_logged:
+            self._estimate_logged = True
+            self.logger.info(
+                f"Tree size estimate: ~{estimate['total']:,.0f} folders "
+                f"(95% CI {estimate['low']:,.0f}-{estimate['high']:,.0f}, {estimate['probes']} probes)"
+            )
+
+    def _stop_estimator(self):
+        """Stop sampling and log the final estimate against the real count."""
+        if not self.estimator:
+            return
+        estimate = self.estimator.stop()
+        self.dashboard.set_size_estimate(None)
+        if estimate:
+            self.logger.info(
+                f"Tree size estimate at end: ~{estimate['total']:,.0f} folders "
+                f"({estimate['probes']} probes); actual {self.total_scanned:,}"
+            )
+        self.estimator = None
+
+    def _frontier_snapshot(self):
+        """(folders scanned, {depth: pending folders}) for the tree-size estimator.
+        
+        Pending rows cover queued and in-flight folders as well as resume pages
+        not yet loaded into memory, so a resumed frontier is counted in full.
+        """
+        pending = self.db.get_pending_depths()
+        with self.lock:
+            return self.total_scanned, pending
+
     def _load_resume_state(self):
         # Invalidate stale cache entries before resuming
         print("\033[90m    > Validating cache integrity...\033[0m", flush=True)
-        invalidated = self.db.invalidate_missing_paths()
+        invalidated = self.db.invalidate_missing_paths(exists=self.fs.exists)
         if invalidated > 0:
             print(f"\033[93m    > Removed {invalidated} stale cache entries (paths no longer exist)\033[0m", flush=True)
         
-        pending = self.db.get_pending()
-        for path, depth in pending:
-            with self.queue_lock:
-                self.queue.append((path, depth))
+        self._restore_checkpoint()
+        
+        # Stream pending work: load the first page now, the rest as the frontier drains
+        self._resume_max_rowid = self.db.get_max_rowid()
+        self._resume_cursor = None
+        self._resume_exhausted = False
+        self._load_resume_page()
+
+    def _load_resume_page(self) -> int:
+        """Append the next depth-ordered page of pending folders to the queue."""
+        rows = self.db.get_pending_page(self._resume_cursor, self.resume_page_size, self._resume_max_rowid)
+        if len(rows) < self.resume_page_size:
+            self._resume_exhausted = True
+        if rows:
+            last_rowid, _path, last_depth = rows[-1]
+            self._resume_cursor = (last_depth, last_rowid)
+            if self.priorities:
+                for _rowid, path, depth in rows:
+                    self._enqueue(path, depth)
+            else:
+                with self.queue_lock:
+                    self.queue.extend((path, depth) for _rowid, path, depth in rows)
+        return len(rows)
+
+    def _restore_checkpoint(self):
+        """Restore counters, elapsed time and in-flight folders from the last checkpoint.
+        
+        The checkpoint is snapshotted inside the commit that writes the folder
+        rows, so all counters come from it. Sessions without one (interrupted
+        before their first commit) fall back to the session counters.
+        """
+        checkpoint = self.db.load_checkpoint()
+        if checkpoint is None:
+            stats = self.db.get_statistics()
+            checkpoint = {'scanned': stats.get('total_scanned', 0), 'empty': stats.get('total_empty', 0),
+                          'errors': stats.get('total_errors', 0), 'deleted': stats.get('total_deleted', 0),
+                          'bytes': stats.get('total_bytes', 0)}
+        with self.lock:
+            self.total_scanned = checkpoint.get('scanned', 0)
+            self.total_empty = checkpoint.get('empty', 0)
+            self.total_bytes = checkpoint.get('bytes', 0)
+            self.total_errors = checkpoint.get('errors', 0)
+            self.total_deleted = checkpoint.get('deleted', 0)
+        self._elapsed_offset = checkpoint.get('elapsed_seconds', 0.0)
+        self._resumed_in_flight = frozenset(path for path, _depth in checkpoint.get('in_flight', []))
+        
+        self.dashboard.restore_progress(
+            scanned=self.total_scanned,
+            empty=self.total_empty,
+            errors=self.total_errors,
+            total_size_bytes=self.total_bytes,
+            elapsed_seconds=self._elapsed_offset
+        )
+        if checkpoint.get('in_flight') is not None:
+            self.logger.info(
+                f"Restored checkpoint: {self.total_scanned} scanned, {self.total_errors} errors, "
+                f"{len(self._resumed_in_flight)} in flight, {self._elapsed_offset:.0f}s elapsed"
+            )
+
+    def _checkpoint_state(self) -> dict:
+        """Snapshot of engine progress; Database.commit calls it inside the commit's critical section."""
+        elapsed = time.time() - self.scan_start_time if self.scan_start_time else self._elapsed_offset
+        with self.lock:
+            return {
+                'elapsed_seconds': elapsed,
+                'scanned': self.total_scanned,
+                'empty': self.total_empty,
+                'errors': self.total_errors,
+                'deleted': self.total_deleted,
+                'bytes': self.total_bytes,
+                'in_flight': list(self.in_flight.items())
+            }
 
     def _queue_size(self):
         with self.queue_lock:
-            return len(self.queue)
+            return len(self.queue) + len(self.priority_queue)
 
     def _pop_next(self) -> Optional[Tuple[str, int]]:
         with self.queue_lock:
-            if not self.queue:
+            if self.priority_queue:
+                _key, path, depth = heapq.heappop(self.priority_queue)
+            elif not self.queue:
                 return None
-            if self.config.strategy == "BFS":
-                return self.queue.popleft()
-            return self.queue.pop()
+            elif self.config.strategy == "BFS":
+                path, depth = self.queue.popleft()
+            elif self.config.strategy == "HYBRID" and len(self.queue) < self.hybrid_frontier:
+                # Too few independent subtrees to keep every worker busy: widen from the shallow end
+                path, depth = self.queue.popleft()
+            else:
+                path, depth = self.queue.pop()
+            return path, depth
 
-    def _enqueue(self, path: str, depth: int) -> int:
+    def _enqueue(self, path: str, depth: int, mtime: float = 0.0) -> int:
+        """Queue a folder; with --prioritize, promising ones go to the priority heap.
+        
+        Args:
+            path: Folder path
+            depth: Folder depth
+            mtime: Folder modification time (only used with --prioritize)
+            
+        Returns:
+            Frontier size after queueing
+        """
         with self.queue_lock:
-            self.queue.append((path, depth))
-            return len(self.queue)
+            if self.priorities and self.priorities.score(path, mtime) > 0:
+                key = self.priorities.key(path, depth, mtime, next(self._priority_seq))
+                heapq.heappush(self.priority_queue, (key, path, depth))
+            else:
+                self.queue.append((path, depth))
+            return len(self.queue) + len(self.priority_queue)
 
     def _is_filtered(self, path: str, name: str, depth: int) -> bool:
         """Check if path should be filtered. Thread-safe: config is immutable after initialization."""
@@ -233,7 +508,11 @@ class Engine:
 
     def _process_queue(self):
         """Concurrent queue processing with ThreadPoolExecutor"""
-        self.scan_start_time = time.time()
+        # Elapsed time carries over from earlier runs of a resumed session
+        self.scan_start_time = time.time() - self._elapsed_offset
+        if self.time_budget:
+            self.deadline = time.time() + self.time_budget
+            self.dashboard.deadline = self.deadline
         futures = []
         items_processed = 0
         
@@ -247,7 +526,7 @@ class Engine:
                         break
                     is_paused = self.paused
                 
-                while is_paused:
+                while is_paused and not self._budget_expired():
                     self.dashboard.set_status("PAUSED")
                     time.sleep(0.5)
                     with self.state_lock:
@@ -255,10 +534,17 @@ class Engine:
                             break
                         is_paused = self.paused
                 
+                if self._budget_expired():
+                    self._stop_for_budget()
+                
                 with self.state_lock:
                     if not self.running:
                         break
                 
+                # Page in more resume work once the in-memory frontier runs low
+                if not self._resume_exhausted and self._queue_size() <= self.resume_page_size // 2:
+                    self._load_resume_page()
+                
                 # Submit work while queue has items and we have capacity
                 while len(futures) < self.config.workers * self.worker_capacity_multiplier:
                     with self.state_lock:
@@ -268,7 +554,9 @@ class Engine:
                     if not item:
                         break
                     path, depth = item
-                    future = executor.submit(self._scan_folder, path, depth)
+                    with self.lock:
+                        self.in_flight[path] = depth
+                    future = executor.submit(self._scan_task, path, depth)
                     futures.append(future)
                     self.dashboard.set_queue_depth(self._queue_size())
                 
@@ -285,44 +573,82 @@ class Engine:
                             try:
                                 future.result()  # Raises exception if worker failed
                             except Exception as e:
-                                self.logger.error(f"Worker error: {e}")
+                                self.logger.error("Worker error: %s", e)
                     
                     # Periodic commits for resume capability
                     if time.time() - self.last_commit_time >= self.commit_interval:
-                        self.db.commit()
+                        self.db.commit(checkpoint=self._checkpoint_state)
                         self.last_commit_time = time.time()
+                        if self.profiler:
+                            self.profiler.snapshot_memory()
                         self.logger.info(f"Progress saved: {self.total_scanned} folders scanned")
                         # Show progress to console every commit interval
                         print(f"[*] Progress: {self.total_scanned} folders scanned, {self.total_empty} empty found...", flush=True)
                 
                 # Check if we're done
-                if self._queue_size() == 0 and not futures:
+                if self._queue_size() == 0 and not futures and self._resume_exhausted:
                     break
                 
                 # Progress update to show activity
                 if items_processed > 0 and items_processed % self.progress_update_interval == 0:
                     print(f"\r[*] Progress: {self.total_scanned} folders | {self.total_empty} empty | Queue: {self._queue_size()}", end='', flush=True)
                 
-                time.sleep(self.queue_poll_sleep)  # Small sleep to prevent busy-wait
+                with self.tracer.span("poll_sleep", "scheduler"):
+                    time.sleep(self.queue_poll_sleep)  # Small sleep to prevent busy-wait
             
             # Shut down executor and wait for all workers to complete
             executor.shutdown(wait=True)
             
             # Final commit
-            self.db.commit()
+            self.db.commit(checkpoint=self._checkpoint_state)
             self.executor = None
         
-        # Show scan completion summary
-        print(f"\n\033[92m[OK] Scan Complete!\033[0m")
-        print(f"    Scanned: {self.total_scanned} folders")
-        print(f"    Empty: {self.total_empty} folders")
-        print(f"    Errors: {self.total_errors}\n")
+        # Roll up per-directory subtree totals once the whole tree has been walked
+        self.cycle_complete = self._queue_size() == 0 and self._resume_exhausted
+        if self.cycle_complete:
+            rolled_up = self.db.build_subtree_rollups()
+            self.logger.info(f"Subtree rollups built for {rolled_up} folders")
         
-        # Mark session as completed
-        self.db.mark_completed()
-        self.logger.info(f"Session completed successfully")
+        # Mark session as completed; a stopped scan keeps its pending folders for the next run
+        if self.cycle_complete:
+            print(f"\n\033[92m[OK] Scan Complete!\033[0m")
+            print(f"    Scanned: {self.total_scanned} folders")
+            print(f"    Empty: {self.total_empty} folders")
+            print(f"    Errors: {self.total_errors}\n")
+            self.db.mark_completed()
+            self.logger.info(f"Session completed successfully")
+        else:
+            self._print_stopped()
+
+    def _print_stopped(self):
+        """Report a scan that stopped before the frontier was drained (budget or quit)."""
+        pending = self.db.get_statistics().get('total_pending', self._queue_size())
+        next_run = "the next --time-budget run on this path" if self.time_budget else "--resume"
+        reason = "Time budget reached" if self._budget_expired() else "Scan stopped"
+        print(f"\n\033[93m[*] {reason}: {self.total_scanned} folders scanned this run, "
+              f"{pending:,} pending; {next_run} continues from here\033[0m", flush=True)
+        self.logger.info(f"{reason} with {pending} folders pending; session left open for resume")
+
+    def _budget_expired(self):
+        """True once this run's --time-budget has been used up."""
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def _stop_for_budget(self):
+        """Stop submitting work; in-flight folders finish and the frontier is checkpointed."""
+        with self.state_lock:
+            if not self.running:
+                return
+            self.running = False
+        self.dashboard.set_status("BUDGET REACHED")
+        print(f"\n\033[93m[*] Time budget reached: {self._queue_size()} folders queued, saving frontier...\033[0m", flush=True)
+        self.logger.info(f"Time budget reached after {self.total_scanned} folders scanned")
 
     def _scan_folder(self, path, depth):
+        """Scan a single folder (traced as one span per directory when --trace is on)."""
+        with self.tracer.span("scan", "engine", path=path, depth=depth):
+            self._scan_folder_untraced(path, depth)
+
+    def _scan_folder_untraced(self, path, depth):
         """Scan a single folder and enqueue subdirectories.
         
         Args:
@@ -337,22 +663,29 @@ class Engine:
         try:
             # Check for Junctions/Reparse Points (WinError 1920 cause)
             try:
-                # Use os.path.islink for reliable cross-platform symlink detection
-                if os.path.islink(path):
-                    self.logger.debug(f"Skipping symlink/junction: {path}")
+                # islink gives reliable cross-platform symlink detection
+                if self.fs.is_link(path):
+                    self.logger.debug("Skipping symlink/junction: %s", path)
                     return
             except Exception as e:
                 # If we can't determine if it's a symlink, skip it for safety
-                self.logger.debug(f"Error checking symlink status for {path}: {e}, skipping for safety")
+                self.logger.debug("Error checking symlink status for %s: %s, skipping for safety", path, e)
                 return
 
+            rescan_after_resume = path in self._resumed_in_flight
             queue_depth = self._queue_size()
             self.dashboard.update_current(path)
             self.dashboard.set_queue_depth(queue_depth)
             
-            # OPTIMIZED: Single os.scandir pass for both size and scanning
-            with os.scandir(path) as it:
+            # OPTIMIZED: Single scandir pass for both size and scanning
+            # DB and filter calls are timed individually; the rest is enumeration
+            perf_counter = time.perf_counter
+            scan_started = perf_counter()
+            db_time = 0.0
+            filter_time = 0.0
+            with self.fs.scandir(path) as it:
                 entry_count = 0
+                file_count = 0
                 folder_size = 0
                 
                 for entry in it:
@@ -368,52 +701,82 @@ class Engine:
                             
                         if entry.is_file():
                             entry_count += 1
+                            file_count += 1
                         elif entry.is_dir():
                             entry_count += 1
-                            if not self._is_filtered(entry.path, entry.name, depth + 1):
-                                queue_depth = self._enqueue(entry.path, depth + 1)
-                                self.dashboard.set_queue_depth(queue_depth)
-                                self.db.add_folder(entry.path, depth + 1)
+                            mark = perf_counter()
+                            filtered = self._is_filtered(entry.path, entry.name, depth + 1)
+                            filter_time += perf_counter() - mark
+                            if not filtered:
+                                # Only --prioritize ranks by mtime; skip the extra stat otherwise
+                                mtime = entry.stat(follow_symlinks=False).st_mtime if self.priorities else 0.0
+                                if rescan_after_resume:
+                                    # Children recorded before the interruption are already queued
+                                    mark = perf_counter()
+                                    is_new = self.db.add_folder_if_new(entry.path, depth + 1)
+                                    db_time += perf_counter() - mark
+                                    if is_new:
+                                        queue_depth = self._enqueue(entry.path, depth + 1, mtime)
+                                        self.dashboard.set_queue_depth(queue_depth)
+                                else:
+                                    # Record the row before queueing so a worker that picks the
+                                    # child up immediately has a row to mark SCANNED
+                                    mark = perf_counter()
+                                    self.db.add_folder(entry.path, depth + 1)
+                                    db_time += perf_counter() - mark
+                                    queue_depth = self._enqueue(entry.path, depth + 1, mtime)
+                                    self.dashboard.set_queue_depth(queue_depth)
                     except PermissionError:
-                        self.db.log_error(entry.path, "Access Denied")
+                        self.db.log_error(entry.path, "Access Denied", on_write=self._count_error)
                         self.dashboard.increment_errors()
-                        with self.lock:
-                            self.total_errors += 1
                     except OSError as e:
-                        self.db.log_error(entry.path, str(e))
+                        self.db.log_error(entry.path, str(e), on_write=self._count_error)
                         self.dashboard.increment_errors()
-                        with self.lock:
-                            self.total_errors += 1
                 
                 # Update dashboard with folder size after scanning complete
                 self.dashboard.add_processed_size(folder_size)
                 
-                self.db.update_folder_stats(path, entry_count)
+                # Totals are bumped inside the row write so a checkpoint never splits them
+                mark = perf_counter()
+                self.db.update_folder_stats(path, entry_count, folder_size, file_count,
+                                            on_write=lambda: self._count_scanned(folder_size, entry_count == 0))
+                db_time += perf_counter() - mark
+                
+                enumerate_time = perf_counter() - scan_started - db_time - filter_time
+                self.profile.record(path, depth, entry_count, enumerate_time, db_time, filter_time)
                 
                 # Track if this folder is empty (no files, no folders)
                 if entry_count == 0:
                     self.dashboard.increment_empty()
-                    with self.lock:
-                        self.total_empty += 1
                 
                 self.dashboard.increment_scanned(self.scan_start_time)
-                with self.lock:
-                    self.total_scanned += 1
                 
         except PermissionError:
-            self.db.log_error(path, "Access Denied")
+            self.db.log_error(path, "Access Denied", on_write=self._count_error)
             self.dashboard.increment_errors()
-            with self.lock:
-                self.total_errors += 1
         except OSError as e:
-            self.db.log_error(path, str(e))
+            self.db.log_error(path, str(e), on_write=self._count_error)
             self.dashboard.increment_errors()
+        finally:
             with self.lock:
-                self.total_errors += 1
+                self.in_flight.pop(path, None)
+
+    def _count_scanned(self, folder_size, empty):
+        """Add one scanned folder to the totals (runs under the DB lock with its row write)."""
+        with self.lock:
+            self.total_scanned += 1
+            self.total_bytes += folder_size
+            if empty:
+                self.total_empty += 1
+
+    def _count_error(self):
+        """Add one error to the totals (runs under the DB lock with its row write)."""
+        with self.lock:
+            self.total_errors += 1
 
     def save_state(self):
         """Manual state save triggered by user"""
-        self.db.commit()
+        self.db.commit(checkpoint=self._checkpoint_state)
         pending = self._queue_size()
         # Read shared state atomically under lock
         with self.lock:
@@ -443,56 +806,63 @@ class Engine:
         processed = 0
         for path in candidates:
             if path == self.config.root_path: continue
+            if self._budget_expired():
+                # Unvisited candidates are found again by the next cycle's scan
+                print(f"\n\033[93m[*] Time budget reached during cleanup ({processed} folders handled)\033[0m", flush=True)
+                self.logger.info(f"Cleanup stopped by time budget after {processed} folders")
+                break
             
             # SAFETY: Triple verification that folder is truly empty
             try:
-                if not os.path.exists(path): continue
+                with self.tracer.span("cleanup_verify", "cleanup", path=path):
+                    if not self.fs.exists(path): continue
                 
-                # First check: os.listdir (primary guard)
-                contents = os.listdir(path)
-                if contents:
-                    # NOT EMPTY - skip this folder
-                    self.logger.warning(f"Skipped {path}: contains {len(contents)} items")
-                    continue
+                    # First check: listdir (primary guard)
+                    contents = self.fs.listdir(path)
+                    if contents:
+                        # NOT EMPTY - skip this folder
+                        self.logger.warning("Skipped %s: contains %d items", path, len(contents))
+                        continue
                 
-                # Second check: Verify ACTUAL DISK SIZE is exactly 0 bytes (not just count)
-                try:
-                    actual_size = 0
-                    entry_count = 0
-                    # Use os.scandir for accurate size check
-                    for entry in os.scandir(path):
-                        # This should never execute for truly empty folder
-                        entry_count += 1  # Count all entries (files or folders)
-                        if entry.is_file(follow_symlinks=False):
-                            actual_size += entry.stat(follow_symlinks=False).st_size
+                    # Second check: Verify ACTUAL DISK SIZE is exactly 0 bytes (not just count)
+                    try:
+                        actual_size = 0
+                        entry_count = 0
+                        # Use scandir for accurate size check
+                        for entry in self.fs.scandir(path):
+                            # This should never execute for truly empty folder
+                            entry_count += 1  # Count all entries (files or folders)
+                            if entry.is_file(follow_symlinks=False):
+                                actual_size += entry.stat(follow_symlinks=False).st_size
                     
-                    # SAFETY CHECK: Explicit validation (not assertion - can't be disabled)
-                    if entry_count > 0:
-                        error_msg = f"Safety check failed: Folder not empty: {path} has {entry_count} items, {actual_size} bytes"
-                        self.logger.error(error_msg)
-                        self.dashboard.increment_errors()
-                        continue
+                        # SAFETY CHECK: Explicit validation (not assertion - can't be disabled)
+                        if entry_count > 0:
+                            self.logger.error("Safety check failed: Folder not empty: %s has %d items, %d bytes",
+                                              path, entry_count, actual_size)
+                            self.dashboard.increment_errors()
+                            continue
                     
-                    # Third check: Verify with os.stat that folder itself is minimal size
-                    try:
-                        folder_stat = os.stat(path)
-                        # Empty folders should be minimal size (typically 0-4096 bytes for metadata)
-                        # We verify size is 0 CONTENT bytes by the scandir check above
-                        if not self.config.delete_mode:
-                            # Track that this folder has 0 content bytes
-                            total_size_bytes += 0  # Confirmed empty
-                    except OSError:
-                        pass  # stat failed, but we already verified with scandir
+                        # Third check: Verify with stat that folder itself is minimal size
+                        try:
+                            folder_stat = self.fs.stat(path)
+                            # Empty folders should be minimal size (typically 0-4096 bytes for metadata)
+                            # We verify size is 0 CONTENT bytes by the scandir check above
+                            if not self.config.delete_mode:
+                                # Track that this folder has 0 content bytes
+                                total_size_bytes += 0  # Confirmed empty
+                        except OSError:
+                            pass  # stat failed, but we already verified with scandir
                     
-                except OSError as e:
-                    self.logger.error(f"Error verifying folder size {path}: {e}")
-                    self.dashboard.increment_errors()
-                    continue
+                    except OSError as e:
+                        self.logger.error("Error verifying folder size %s: %s", path, e)
+                        self.dashboard.increment_errors()
+                        continue
                 
                 # Only proceed if ALL checks pass
                 if self.config.delete_mode:
                     # PRODUCTION: Delete only after all safety checks pass
-                    os.rmdir(path)  # Will raise OSError if not truly empty
+                    with self.tracer.span("rmdir", "cleanup", path=path):
+                        self.fs.rmdir(path)  # Will raise OSError if not truly empty
                     self.db.mark_deleted(path)
                     self.dashboard.increment_deleted()
                     with self.lock:
@@ -512,10 +882,10 @@ class Engine:
                         print(f"\r[*] Verified: {verified_empty}/{len(candidates)} empty folders (0 bytes each)", end='', flush=True)
                     
             except NotADirectoryError as e:
-                self.logger.error(f"Not a directory {path}: {e}")
+                self.logger.error("Not a directory %s: %s", path, e)
                 self.dashboard.increment_errors()
             except OSError as e:
-                self.logger.error(f"Cannot delete {path}: {e}")
+                self.logger.error("Cannot delete %s: %s", path, e)
                 self.dashboard.increment_errors()
         
         # Persist delete/would-delete statuses
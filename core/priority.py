@@ -0,0 +1,34 @@
+"""
+Prioritised frontier ordering from a prior session of the same root (--prioritize).
+
+The previous completed scan's subtree rollups say which directories held
+empty folders; directories modified since that scan started may hold new
+ones. Both are scanned ahead of the rest of the frontier, so the results an
+operator is after show up early in a long scan.
+"""
+from typing import Dict, Tuple
+
+from common.constants import PRIORITY_CHANGED_WEIGHT
+
+
+class SubtreePriorities:
+    """Expected-value scores for folders entering the frontier.
+
+    Args:
+        empties: Path -> empty folders in its subtree in the prior session
+        since: Epoch start time of the prior session (newer mtimes count as changed)
+        session_id: Prior session the scores come from
+    """
+
+    def __init__(self, empties: Dict[str, int], since: float, session_id: str):
+        self.empties = empties
+        self.since = since
+        self.session_id = session_id
+
+    def score(self, path: str, mtime: float = 0.0) -> float:
+        """Prior empties in the subtree, plus PRIORITY_CHANGED_WEIGHT if modified since the prior scan."""
+        return self.empties.get(path, 0) + (PRIORITY_CHANGED_WEIGHT if mtime > self.since else 0)
+
+    def key(self, path: str, depth: int, mtime: float, seq: int) -> Tuple[float, float, int, int]:
+        """Heap key: highest score, then most recently changed, then shallowest, then FIFO."""
+        return (-self.score(path, mtime), -mtime if mtime > self.since else 0.0, depth, seq)
@@ -1,12 +1,79 @@
 import sqlite3
 import json
+import os
 import threading
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Tuple, Dict, Any, Callable, TypeVar
 
+from common.constants import (
+    DB_INVALIDATION_WORKERS,
+    DB_INVALIDATION_BATCH_SIZE,
+    METRICS_LATENCY_BUCKET_START,
+    METRICS_LATENCY_BUCKET_FACTOR,
+    METRICS_LATENCY_BUCKET_COUNT
+)
+from utils.metrics import ShardedHistogram, log_buckets
+from utils.tracing import NULL_TRACER, TracedLock
+
 # Type variable for generic database operation
 T = TypeVar('T')
 
+# Per-session counters materialized in the sessions table: (column, DDL type)
+SESSION_STAT_COLUMNS = [
+    ("scanned_count", "INTEGER DEFAULT 0"),
+    ("pending_count", "INTEGER DEFAULT 0"),
+    ("empty_count", "INTEGER DEFAULT 0"),
+    ("error_count", "INTEGER DEFAULT 0"),
+    ("deleted_count", "INTEGER DEFAULT 0"),
+    ("would_delete_count", "INTEGER DEFAULT 0"),
+    ("total_bytes", "INTEGER DEFAULT 0"),
+    ("stats_ready", "INTEGER DEFAULT 0"),
+]
+
+# Columns added to the folders table after the original schema
+FOLDER_EXTRA_COLUMNS = [
+    ("size_bytes", "INTEGER DEFAULT 0"),
+    ("top_folder", "TEXT"),
+    ("direct_files", "INTEGER DEFAULT 0"),
+]
+
+# Subtree rollup metrics that get_top_subtrees may rank by
+SUBTREE_METRICS = ("folders", "files", "bytes", "empty", "errors")
+
+# Rows written per executemany while building subtree rollups
+SUBTREE_BATCH_SIZE = 1000
+
+
+def top_level_folder(path: str) -> str:
+    """Return the first-level directory a path belongs to ('' if it has none).
+    
+    C:\\Users\\x -> C:\\Users, /data/x -> /data, rel/x -> rel
+    """
+    parts = os.path.normpath(path).split(os.sep)
+    if len(parts) < 2:
+        return ''
+    if os.name == 'nt' and parts[0].endswith(':'):
+        # Windows: C:\folder1 -> root is C:\folder1
+        return os.sep.join(parts[:2])
+    # Unix or relative: /folder1 or folder1
+    return parts[0] if parts[0] else os.sep.join(parts[:2])
+
+# Folder status -> sessions counter column
+STATUS_COUNTER = {
+    'SCANNED': 'scanned_count',
+    'PENDING': 'pending_count',
+    'ERROR': 'error_count',
+    'DELETED': 'deleted_count',
+    'WOULD_DELETE': 'would_delete_count',
+}
+
+# Known (status, file_count, size_bytes) of a row before a status change, letting
+# _set_status guard its UPDATE instead of reading the row first
+PENDING_ROW = ('PENDING', -1, 0)  # Queued and not yet scanned (column defaults)
+EMPTY_SCANNED_ROW = ('SCANNED', 0, 0)  # Cleanup candidate
+
 class Database:
     def __init__(self, db_path, session_id):
         self.path = db_path
@@ -16,17 +83,37 @@ class Database:
         self.lock = threading.Lock()
         self.error_count = 0
         self.last_error = None
+        # Session counter deltas accumulated since the last commit
+        self._stat_deltas = {}
+        # Latency histograms (seconds) for metrics export
+        latency_bounds = log_buckets(METRICS_LATENCY_BUCKET_START, METRICS_LATENCY_BUCKET_FACTOR,
+                                     METRICS_LATENCY_BUCKET_COUNT)
+        self.write_latency = ShardedHistogram(latency_bounds)  # Includes lock wait
+        self.commit_latency = ShardedHistogram(latency_bounds)
+        self.tracer = NULL_TRACER
+    
+    def enable_tracing(self, tracer) -> None:
+        """Record DB writes, commits and lock waits as spans on `tracer`.
+        
+        Must be called before worker threads start using the database.
+        """
+        self.tracer = tracer
+        self.lock = TracedLock(self.lock, tracer, "db.lock_wait")
     
     def _execute_safe(self, operation_name: str, func: Callable[[], T], path: Optional[str] = None) -> Optional[T]:
         """Execute database operation with comprehensive error handling."""
+        start = time.perf_counter()
         try:
-            return func()
+            with self.tracer.span(operation_name, "db"):
+                return func()
         except sqlite3.Error as e:
             self._record_error(operation_name, e, path)
             return None
         except Exception as e:
             self._record_error(operation_name, e, path)
             return None
+        finally:
+            self.write_latency.observe(time.perf_counter() - start)
 
     def _record_error(self, action, error, path=None):
         self.error_count += 1
@@ -78,31 +165,215 @@ class Database:
                 )
             """)
 
+            # Index backing keyset pagination over a session's results
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_folders_session_status_depth
+                ON folders (session_id, status, depth)
+            """)
+
+            # Add columns introduced after the original schema
+            self._ensure_columns(self.cursor, "sessions", SESSION_STAT_COLUMNS)
+            self._ensure_columns(self.cursor, "folders", FOLDER_EXTRA_COLUMNS)
+
+            # Covering index for top-level rollups of empty folders
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_folders_top_folder
+                ON folders (session_id, status, file_count, top_folder)
+            """)
+
+            # Table: Subtree rollups (per directory, including the directory itself)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS subtree_stats (
+                    session_id TEXT,
+                    path TEXT,
+                    parent_path TEXT,
+                    depth INTEGER,
+                    folders INTEGER,
+                    files INTEGER,
+                    bytes INTEGER,
+                    empty INTEGER,
+                    errors INTEGER,
+                    PRIMARY KEY (session_id, path)
+                )
+            """)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_subtree_parent
+                ON subtree_stats (session_id, parent_path)
+            """)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_subtree_depth
+                ON subtree_stats (session_id, depth)
+            """)
+
+            # Table: Checkpoints (engine state written with each periodic commit)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    session_id TEXT PRIMARY KEY,
+                    updated_at TEXT,
+                    elapsed_seconds REAL,
+                    scanned INTEGER,
+                    empty INTEGER,
+                    errors INTEGER,
+                    deleted INTEGER,
+                    bytes INTEGER,
+                    in_flight TEXT
+                )
+            """)
+
             # Register Session
             self.cursor.execute(
                 "INSERT OR IGNORE INTO sessions (id, timestamp) VALUES (?, datetime('now'))",
                 (self.session_id,)
             )
-            self.conn.commit()
+            self._backfill_session_stats(self.cursor, self.session_id)
+            self._commit_locked()
 
             # Count existing sessions for user info
             self.cursor.execute("SELECT COUNT(*) FROM sessions")
             total_sessions = self.cursor.fetchone()[0]
         print(f"\033[90m       Database ready ({total_sessions} total sessions)\033[0m")
 
+    @staticmethod
+    def _ensure_columns(cursor, table: str, columns: List[Tuple[str, str]]) -> None:
+        """Add any missing columns to an existing table (caller holds the lock)."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, ddl in columns:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+    @staticmethod
+    def _backfill_session_stats(cursor, session_id: str) -> None:
+        """Compute materialized counters once for a session created before they existed."""
+        cursor.execute("SELECT stats_ready FROM sessions WHERE id=?", (session_id,))
+        row = cursor.fetchone()
+        if row is None or row[0]:
+            return
+        cursor.execute("""
+            SELECT
+                SUM(CASE WHEN status='SCANNED' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status='PENDING' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status='SCANNED' AND file_count=0 THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status='ERROR' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status='DELETED' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status='WOULD_DELETE' THEN 1 ELSE 0 END),
+                SUM(COALESCE(size_bytes, 0))
+            FROM folders WHERE session_id=?
+        """, (session_id,))
+        counts = [value or 0 for value in cursor.fetchone()]
+        cursor.execute("""
+            UPDATE sessions SET scanned_count=?, pending_count=?, empty_count=?, error_count=?,
+                deleted_count=?, would_delete_count=?, total_bytes=?, stats_ready=1
+            WHERE id=?
+        """, (*counts, session_id))
+
+    def _add_delta(self, column: str, amount: int) -> None:
+        """Accumulate a session counter change (caller holds the lock)."""
+        if amount:
+            self._stat_deltas[column] = self._stat_deltas.get(column, 0) + amount
+
+    def _set_status(self, path: str, status: str, file_count: Optional[int] = None,
+                    size_bytes: Optional[int] = None, error_msg: Optional[str] = None,
+                    direct_files: int = 0, expected: Optional[Tuple[str, int, int]] = None) -> None:
+        """Change a folder's status and record the matching counter deltas (caller holds the lock).
+        
+        With `expected` (the row's known prior status, file_count, size_bytes) the
+        UPDATE is guarded by it and no lookup is needed; the row is only read
+        first when the guard misses (row changed, e.g. a rescan, or missing).
+        """
+        if expected is not None:
+            old_count, old_size = expected[1], expected[2]
+            new_count = old_count if file_count is None else file_count
+            new_size = old_size if size_bytes is None else size_bytes
+            guard = " AND status=? AND file_count=? AND COALESCE(size_bytes, 0)=?"
+            if self._write_status(path, status, new_count, new_size, error_msg, direct_files, guard, expected):
+                self._record_status_change(expected, status, new_count, new_size)
+                return
+
+        self.cursor.execute(
+            "SELECT status, file_count, size_bytes FROM folders WHERE path=? AND session_id=?",
+            (path, self.session_id)
+        )
+        row = self.cursor.fetchone()
+        if row is None:
+            return
+        old_count, old_size = row[1], row[2] or 0
+        new_count = old_count if file_count is None else file_count
+        new_size = old_size if size_bytes is None else size_bytes
+        self._write_status(path, status, new_count, new_size, error_msg, direct_files)
+        self._record_status_change(row, status, new_count, new_size)
+
+    def _write_status(self, path: str, status: str, new_count: int, new_size: int, error_msg: Optional[str],
+                      direct_files: int, guard: str = "", guard_values: tuple = ()) -> bool:
+        """UPDATE one folder row (optionally only if `guard` matches); True if a row changed."""
+        where = "WHERE path=? AND session_id=?" + guard
+        key = (path, self.session_id, *guard_values)
+        if status == 'SCANNED':
+            self.cursor.execute(
+                f"UPDATE folders SET file_count=?, size_bytes=?, direct_files=?, status='SCANNED' {where}",
+                (new_count, new_size, direct_files, *key)
+            )
+        elif status == 'ERROR':
+            self.cursor.execute(f"UPDATE folders SET status='ERROR', error_msg=? {where}", (error_msg, *key))
+        else:
+            self.cursor.execute(f"UPDATE folders SET status=? {where}", (status, *key))
+        return self.cursor.rowcount == 1
+
+    def _record_status_change(self, old_row: Tuple[str, int, int], status: str, new_count: int, new_size: int) -> None:
+        """Counter deltas for one folder moving from old_row (status, file_count, size_bytes)."""
+        old_status, old_count, old_size = old_row
+        if old_status in STATUS_COUNTER:
+            self._add_delta(STATUS_COUNTER[old_status], -1)
+        self._add_delta(STATUS_COUNTER[status], 1)
+        was_empty = old_status == 'SCANNED' and old_count == 0
+        is_empty = status == 'SCANNED' and new_count == 0
+        self._add_delta('empty_count', int(is_empty) - int(was_empty))
+        self._add_delta('total_bytes', new_size - (old_size or 0))
+
+    def _commit_locked(self) -> None:
+        """Flush counter deltas into the sessions row and commit (caller holds the lock)."""
+        start = time.perf_counter()
+        with self.tracer.span("commit", "db"):
+            if self._stat_deltas:
+                columns = list(self._stat_deltas)
+                assignments = ", ".join(f"{col} = {col} + ?" for col in columns)
+                self.cursor.execute(
+                    f"UPDATE sessions SET {assignments} WHERE id=?",
+                    [self._stat_deltas[col] for col in columns] + [self.session_id]
+                )
+                self._stat_deltas = {}
+            self.conn.commit()
+        self.commit_latency.observe(time.perf_counter() - start)
+
     def add_folder(self, path: str, depth: int) -> bool:
         """Add folder to database with error handling."""
         def execute():
             with self.lock:
                 self.cursor.execute(
-                    "INSERT OR IGNORE INTO folders (path, session_id, depth) VALUES (?, ?, ?)",
-                    (path, self.session_id, depth)
+                    "INSERT OR IGNORE INTO folders (path, session_id, depth, top_folder) VALUES (?, ?, ?, ?)",
+                    (path, self.session_id, depth, top_level_folder(path))
                 )
+                self._add_delta('pending_count', self.cursor.rowcount)
             return True
         
         result = self._execute_safe("add_folder", execute, path)
         return result if result is not None else False
     
+    def add_folder_if_new(self, path: str, depth: int) -> bool:
+        """Add folder to database. Returns True only if it was not already recorded."""
+        def execute():
+            with self.lock:
+                self.cursor.execute(
+                    "INSERT OR IGNORE INTO folders (path, session_id, depth, top_folder) VALUES (?, ?, ?, ?)",
+                    (path, self.session_id, depth, top_level_folder(path))
+                )
+                inserted = self.cursor.rowcount
+                self._add_delta('pending_count', inserted)
+            return inserted == 1
+        
+        result = self._execute_safe("add_folder_if_new", execute, path)
+        return bool(result)
+    
     def add_folders_batch(self, folders: List[Tuple[str, int]]) -> int:
         """
         Add multiple folders in a single transaction for performance.
@@ -119,61 +390,93 @@ class Database:
         def execute():
             with self.lock:
                 # Prepare batch data with session_id
-                batch_data = [(path, self.session_id, depth) for path, depth in folders]
+                batch_data = [(path, self.session_id, depth, top_level_folder(path)) for path, depth in folders]
                 self.cursor.executemany(
-                    "INSERT OR IGNORE INTO folders (path, session_id, depth) VALUES (?, ?, ?)",
+                    "INSERT OR IGNORE INTO folders (path, session_id, depth, top_folder) VALUES (?, ?, ?, ?)",
                     batch_data
                 )
+                self._add_delta('pending_count', self.cursor.rowcount)
                 return len(folders)
         
         result = self._execute_safe("add_folders_batch", execute)
         return result if result is not None else 0
 
-    def update_folder_stats(self, path, file_count):
+    def update_folder_stats(self, path, file_count, size_bytes=0, direct_files=0, on_write=None):
+        """Mark a folder SCANNED with its counts.
+        
+        on_write runs while the lock is still held, so caller-side counters it
+        updates land in the same commit (and checkpoint) as the row.
+        """
         def execute():
             with self.lock:
-                self.cursor.execute(
-                    "UPDATE folders SET file_count=?, status='SCANNED' WHERE path=? AND session_id=?",
-                    (file_count, path, self.session_id)
-                )
+                self._set_status(path, 'SCANNED', file_count=file_count, size_bytes=size_bytes,
+                                 direct_files=direct_files, expected=PENDING_ROW)
+                if on_write:
+                    on_write()
         return self._execute_safe("update_folder_stats", execute, path)
         # Commit periodically in engine, or here
 
-    def log_error(self, path, msg):
+    def log_error(self, path, msg, on_write=None):
+        """Mark a folder ERROR (on_write as in update_folder_stats)."""
         def execute():
             with self.lock:
-                self.cursor.execute(
-                    "UPDATE folders SET status='ERROR', error_msg=? WHERE path=? AND session_id=?",
-                    (msg, path, self.session_id)
-                )
+                self._set_status(path, 'ERROR', error_msg=msg, expected=PENDING_ROW)
+                if on_write:
+                    on_write()
         return self._execute_safe("log_error", execute, path)
 
     def mark_deleted(self, path):
         def execute():
             with self.lock:
-                self.cursor.execute(
-                    "UPDATE folders SET status='DELETED' WHERE path=? AND session_id=?",
-                    (path, self.session_id)
-                )
+                self._set_status(path, 'DELETED', expected=EMPTY_SCANNED_ROW)
         return self._execute_safe("mark_deleted", execute, path)
 
     def mark_would_delete(self, path):
         def execute():
             with self.lock:
-                self.cursor.execute(
-                    "UPDATE folders SET status='WOULD_DELETE' WHERE path=? AND session_id=?",
-                    (path, self.session_id)
-                )
+                self._set_status(path, 'WOULD_DELETE', expected=EMPTY_SCANNED_ROW)
         return self._execute_safe("mark_would_delete", execute, path)
 
-    def get_pending(self) -> List[Tuple[str, int]]:
+    def get_max_rowid(self) -> int:
+        """Highest folder rowid so far; rows inserted later get larger rowids."""
         with self.lock:
-            self.cursor.execute(
-                "SELECT path, depth FROM folders WHERE status='PENDING' AND session_id=? ORDER BY depth ASC",
-                (self.session_id,)
-            )
+            self.cursor.execute("SELECT MAX(rowid) FROM folders")
+            return self.cursor.fetchone()[0] or 0
+
+    def get_pending_page(self, after: Optional[Tuple[int, int]] = None, limit: int = 10000,
+                         max_rowid: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        """Fetch one depth-ordered page of pending folders using keyset pagination.
+        
+        Args:
+            after: (depth, rowid) of the last row of the previous page, or None for the first page
+            limit: Maximum number of rows to return
+            max_rowid: Ignore rows inserted after this rowid (e.g. children found during a resume)
+            
+        Returns:
+            List of (rowid, path, depth) tuples ordered by depth, then rowid
+        """
+        last_depth, last_rowid = after if after is not None else (-1, 0)
+        with self.lock:
+            self.cursor.execute("""
+                SELECT rowid, path, depth FROM folders
+                WHERE session_id=? AND status='PENDING' AND rowid <= ?
+                  AND (depth > ? OR (depth = ? AND rowid > ?))
+                ORDER BY depth ASC, rowid ASC
+                LIMIT ?
+            """, (self.session_id, max_rowid if max_rowid is not None else sys.maxsize,
+                  last_depth, last_depth, last_rowid, limit))
             return self.cursor.fetchall()
 
+    def get_pending_depths(self) -> Dict[int, int]:
+        """Count pending folders per depth (served by the session/status/depth index)."""
+        with self.lock:
+            self.cursor.execute("""
+                SELECT depth, COUNT(*) FROM folders
+                WHERE session_id=? AND status='PENDING'
+                GROUP BY depth
+            """, (self.session_id,))
+            return dict(self.cursor.fetchall())
+
     def get_empty_candidates(self, min_depth: int) -> List[str]:
         # We want folders processed, with 0 files, ordered deep to shallow
         with self.lock:
@@ -184,12 +487,75 @@ class Database:
             """, (self.session_id, min_depth))
             return [r[0] for r in self.cursor.fetchall()]
 
-    def get_errors(self) -> List[Tuple[str, str]]:
+    def count_empty_candidates(self, min_depth: int) -> int:
+        """Count empty folder candidates without materialising their paths."""
+        with self.lock:
+            self.cursor.execute("""
+                SELECT COUNT(*) FROM folders
+                WHERE session_id=? AND status='SCANNED' AND file_count=0 AND depth >= ?
+            """, (self.session_id, min_depth))
+            return self.cursor.fetchone()[0]
+
+    def get_empty_candidates_page(self, min_depth: int, after: Optional[Tuple[int, int]] = None,
+                                  limit: int = 20) -> List[Tuple[int, str, int, int]]:
+        """Fetch one page of empty folder candidates using keyset pagination.
+        
+        Rows are ordered deep to shallow (same order as get_empty_candidates),
+        with rowid as a tie-breaker so the ordering is total.
+        
+        Args:
+            min_depth: Minimum depth of candidates to include
+            after: (depth, rowid) of the last row of the previous page, or None for the first page
+            limit: Maximum number of rows to return
+            
+        Returns:
+            List of (rowid, path, depth, file_count) tuples
+        """
+        with self.lock:
+            if after is None:
+                self.cursor.execute("""
+                    SELECT rowid, path, depth, file_count FROM folders
+                    WHERE session_id=? AND status='SCANNED' AND file_count=0 AND depth >= ?
+                    ORDER BY depth DESC, rowid ASC
+                    LIMIT ?
+                """, (self.session_id, min_depth, limit))
+            else:
+                last_depth, last_rowid = after
+                self.cursor.execute("""
+                    SELECT rowid, path, depth, file_count FROM folders
+                    WHERE session_id=? AND status='SCANNED' AND file_count=0 AND depth >= ?
+                      AND (depth < ? OR (depth = ? AND rowid > ?))
+                    ORDER BY depth DESC, rowid ASC
+                    LIMIT ?
+                """, (self.session_id, min_depth, last_depth, last_depth, last_rowid, limit))
+            return self.cursor.fetchall()
+
+    def count_errors(self) -> int:
+        """Count folders that failed to scan in this session."""
         with self.lock:
             self.cursor.execute(
-                "SELECT path, error_msg FROM folders WHERE status='ERROR' AND session_id=?",
+                "SELECT COUNT(*) FROM folders WHERE status='ERROR' AND session_id=?",
                 (self.session_id,)
             )
+            return self.cursor.fetchone()[0]
+
+    def get_errors_page(self, after: Optional[int] = None, limit: int = 20) -> List[Tuple[int, str, str]]:
+        """Fetch one page of errors using keyset pagination on rowid.
+        
+        Args:
+            after: rowid of the last row of the previous page, or None for the first page
+            limit: Maximum number of rows to return
+            
+        Returns:
+            List of (rowid, path, error_msg) tuples
+        """
+        with self.lock:
+            self.cursor.execute("""
+                SELECT rowid, path, error_msg FROM folders
+                WHERE status='ERROR' AND session_id=? AND rowid > ?
+                ORDER BY rowid ASC
+                LIMIT ?
+            """, (self.session_id, after if after is not None else 0, limit))
             return self.cursor.fetchall()
 
     def save_config(self, config_dict, root_path):
@@ -200,43 +566,67 @@ class Database:
                     "UPDATE sessions SET config=?, root_path=? WHERE id=?",
                     (json.dumps(config_dict), root_path, self.session_id)
                 )
-                self.conn.commit()
+                self._commit_locked()
         except sqlite3.Error as e:
             self._record_error("save_config", e, root_path)
         except Exception as e:
             self._record_error("save_config", e, root_path)
 
-    def invalidate_missing_paths(self) -> int:
-        """Remove cached entries for paths that no longer exist. Returns count of invalidated entries."""
+    def invalidate_missing_paths(self, workers: int = DB_INVALIDATION_WORKERS,
+                                 batch_size: int = DB_INVALIDATION_BATCH_SIZE,
+                                 exists: Callable[[str], bool] = os.path.exists) -> int:
+        """Remove cached entries for paths that no longer exist. Returns count of invalidated entries.
+        
+        Pending rows are read in rowid-keyset batches. Existence checks run on a
+        thread pool without holding the database lock (they dominate on network
+        shares), and missing rows are removed with one executemany per batch.
+        `exists` is the scanned filesystem's existence check (os.path.exists by default).
+        """
+        invalid_count = 0
+        last_rowid = 0
         try:
-            with self.lock:
-                # Get all pending paths for this session
-                self.cursor.execute(
-                    "SELECT path FROM folders WHERE session_id=? AND status='PENDING'",
-                    (self.session_id,)
-                )
-                pending_paths = [row[0] for row in self.cursor.fetchall()]
-                
-                # Check which paths no longer exist
-                import os
-                invalid_count = 0
-                for path in pending_paths:
-                    if not os.path.exists(path):
-                        self.cursor.execute(
-                            "DELETE FROM folders WHERE path=? AND session_id=?",
-                            (path, self.session_id)
-                        )
-                        invalid_count += 1
-                
-                if invalid_count > 0:
-                    self.conn.commit()
-                return invalid_count
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                while True:
+                    with self.lock:
+                        self.cursor.execute("""
+                            SELECT rowid, path FROM folders
+                            WHERE session_id=? AND status='PENDING' AND rowid > ?
+                            ORDER BY rowid ASC
+                            LIMIT ?
+                        """, (self.session_id, last_rowid, batch_size))
+                        rows = self.cursor.fetchall()
+                    if not rows:
+                        break
+                    last_rowid = rows[-1][0]
+                    
+                    paths = [path for _rowid, path in rows]
+                    missing = [
+                        (path, self.session_id)
+                        for path, present in zip(paths, executor.map(exists, paths))
+                        if not present
+                    ]
+                    if missing:
+                        with self.lock:
+                            self.cursor.executemany(
+                                "DELETE FROM folders WHERE path=? AND session_id=? AND status='PENDING'",
+                                missing
+                            )
+                            removed = self.cursor.rowcount
+                            self._add_delta('pending_count', -removed)
+                        invalid_count += removed
+            
+            if invalid_count > 0:
+                with self.lock:
+                    self._commit_locked()
+            return invalid_count
         except Exception as e:
             # Rollback any partial changes to maintain database consistency
-            try:
-                self.conn.rollback()
-            except Exception:
-                pass  # Rollback failure is non-critical
+            with self.lock:
+                try:
+                    self.conn.rollback()
+                except Exception:
+                    pass  # Rollback failure is non-critical
+                self._stat_deltas = {}  # Rolled-back changes must not reach the counters
             self._record_error("invalidate_missing_paths", e)
             return 0
     
@@ -248,25 +638,27 @@ class Database:
                     "UPDATE sessions SET completed=1 WHERE id=?",
                     (self.session_id,)
                 )
-                self.conn.commit()
+                self._commit_locked()
         except sqlite3.Error as e:
             self._record_error("mark_completed", e)
         except Exception as e:
             self._record_error("mark_completed", e)
 
     @staticmethod
-    def get_last_incomplete_session(db_path: str) -> Optional[Dict[str, Any]]:
-        """Get the most recent incomplete session for resume"""
+    def get_last_incomplete_session(db_path: str, root_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the most recent incomplete session for resume (optionally only for root_path)"""
+        if not os.path.exists(db_path):
+            return None
         # Use context manager to ensure connection is closed even if exception occurs
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, config, root_path, timestamp
                 FROM sessions
-                WHERE completed=0
+                WHERE completed=0 AND (? IS NULL OR root_path=?)
                 ORDER BY timestamp DESC
                 LIMIT 1
-            """)
+            """, (root_path, root_path))
             result = cursor.fetchone()
 
             if result:
@@ -280,83 +672,466 @@ class Database:
                 }
             return None
 
+    @staticmethod
+    def get_last_rolling_cycle(db_path: str, root_path: str) -> int:
+        """Get the highest finished --time-budget cycle on root_path (0 if none)"""
+        if not os.path.exists(db_path):
+            return 0
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute(
+                "SELECT config FROM sessions WHERE completed=1 AND root_path=? AND config IS NOT NULL",
+                (root_path,)
+            ).fetchall()
+        cycles = [config.get('cycle', 1) for config in (json.loads(config_json) for (config_json,) in rows)
+                  if config.get('rolling')]
+        return max(cycles, default=0)
+
     def get_statistics(self) -> Dict[str, Any]:
-        """Get session statistics including counts and sizes."""
+        """Get session statistics from the materialized counters in the sessions table.
+        
+        Counters are maintained incrementally, so this is a single-row lookup
+        regardless of how many folders the session contains.
+        """
         try:
             with self.lock:
-                # Count total scanned and empty folders
-                self.cursor.execute(
-                    "SELECT COUNT(*) FROM folders WHERE session_id=? AND status='SCANNED'",
-                    (self.session_id,)
-                )
-                total_scanned = self.cursor.fetchone()[0]
-                
-                self.cursor.execute(
-                    "SELECT COUNT(*) FROM folders WHERE session_id=? AND status='SCANNED' AND file_count=0",
-                    (self.session_id,)
-                )
-                total_empty = self.cursor.fetchone()[0]
-                
-                self.cursor.execute(
-                    "SELECT COUNT(*) FROM folders WHERE session_id=? AND status='ERROR'",
-                    (self.session_id,)
-                )
-                total_errors = self.cursor.fetchone()[0]
+                self.cursor.execute("""
+                    SELECT scanned_count, pending_count, empty_count, error_count,
+                           deleted_count, would_delete_count, total_bytes
+                    FROM sessions WHERE id=?
+                """, (self.session_id,))
+                row = self.cursor.fetchone() or (0,) * 7
+                counts = dict(zip(
+                    ['scanned_count', 'pending_count', 'empty_count', 'error_count',
+                     'deleted_count', 'would_delete_count', 'total_bytes'],
+                    [value or 0 for value in row]
+                ))
+                # Include changes not yet flushed by commit()
+                for column, delta in self._stat_deltas.items():
+                    counts[column] += delta
                 
                 return {
-                    'total_scanned': total_scanned,
-                    'total_empty': total_empty,
-                    'total_errors': total_errors
+                    'total_scanned': counts['scanned_count'],
+                    'total_empty': counts['empty_count'],
+                    'total_errors': counts['error_count'],
+                    'total_pending': counts['pending_count'],
+                    'total_deleted': counts['deleted_count'],
+                    'total_would_delete': counts['would_delete_count'],
+                    'total_bytes': counts['total_bytes']
                 }
         except Exception as e:
             self._record_error("get_statistics", e)
             return {'total_scanned': 0, 'total_empty': 0, 'total_errors': 0}
+
+    @staticmethod
+    def get_recent_sessions(db_path: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recent sessions with their materialized counters.
+        
+        Sessions recorded before counters existed are backfilled once and
+        persisted, so later calls only read the sessions table.
+        """
+        with sqlite3.connect(db_path) as conn:
+            cursor = conn.cursor()
+            Database._ensure_columns(cursor, "sessions", SESSION_STAT_COLUMNS)
+            Database._ensure_columns(cursor, "folders", FOLDER_EXTRA_COLUMNS)
+            
+            cursor.execute("SELECT id FROM sessions ORDER BY timestamp DESC LIMIT ?", (limit,))
+            session_ids = [row[0] for row in cursor.fetchall()]
+            for session_id in session_ids:
+                Database._backfill_session_stats(cursor, session_id)
+            conn.commit()
+            
+            cursor.execute("""
+                SELECT id, timestamp, root_path, completed, scanned_count, pending_count,
+                       empty_count, error_count, deleted_count, would_delete_count, total_bytes
+                FROM sessions ORDER BY timestamp DESC LIMIT ?
+            """, (limit,))
+            keys = ['session_id', 'timestamp', 'root_path', 'completed', 'scanned', 'pending',
+                    'empty', 'errors', 'deleted', 'would_delete', 'total_bytes']
+            sessions = [dict(zip(keys, row)) for row in cursor.fetchall()]
+            
+            for session in sessions:
+                if not session['root_path']:
+                    # Sessions saved before root_path was recorded: use the shallowest folder
+                    cursor.execute(
+                        "SELECT path FROM folders WHERE session_id=? ORDER BY depth ASC LIMIT 1",
+                        (session['session_id'],)
+                    )
+                    root = cursor.fetchone()
+                    session['root_path'] = root[0] if root else None
+            return sessions
+    
+    @staticmethod
+    def get_session_history(db_path: str, limit: int = 200) -> List[Dict[str, Any]]:
+        """Get the most recent fully scanned sessions with their config and scan time.
+        
+        Only completed sessions with no pending folders and a checkpoint (which
+        carries the elapsed scan time) are returned, newest first.
+        """
+        if not os.path.exists(db_path):
+            return []
+        try:
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute("""
+                    SELECT s.id, s.timestamp, s.root_path, s.config, s.scanned_count, c.elapsed_seconds
+                    FROM sessions s JOIN checkpoints c ON c.session_id = s.id
+                    WHERE s.completed = 1 AND s.pending_count = 0 AND s.config IS NOT NULL
+                    ORDER BY s.timestamp DESC
+                    LIMIT ?
+                """, (limit,)).fetchall()
+        except sqlite3.OperationalError:
+            return []  # Database predates checkpoints / session counters
+        return [
+            {
+                'session_id': session_id,
+                'timestamp': timestamp,
+                'root_path': root_path,
+                'config': json.loads(config_json),
+                'scanned': scanned or 0,
+                'elapsed_seconds': elapsed or 0.0,
+            }
+            for session_id, timestamp, root_path, config_json, scanned, elapsed in rows
+        ]
+
+    @staticmethod
+    def save_tuning_profile(db_path: str, device: str, profile: Dict[str, Any]) -> None:
+        """Store the calibrated workers/strategy for a device (replacing any earlier profile).
+        
+        Args:
+            db_path: History database path
+            device: Device id (see utils.scan_profile.device_id)
+            profile: Dict with root_path, workers, strategy, folders_per_sec,
+                latency_ms, p95_latency_ms and trials (list of per-trial results)
+        """
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tuning_profiles (
+                    device_id TEXT PRIMARY KEY,
+                    updated_at TEXT,
+                    root_path TEXT,
+                    workers INTEGER,
+                    strategy TEXT,
+                    folders_per_sec REAL,
+                    latency_ms REAL,
+                    p95_latency_ms REAL,
+                    trials TEXT
+                )
+            """)
+            conn.execute("""
+                INSERT OR REPLACE INTO tuning_profiles
+                    (device_id, updated_at, root_path, workers, strategy, folders_per_sec,
+                     latency_ms, p95_latency_ms, trials)
+                VALUES (?, datetime('now'), ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                device,
+                profile.get('root_path'),
+                profile['workers'],
+                profile['strategy'],
+                profile.get('folders_per_sec'),
+                profile.get('latency_ms'),
+                profile.get('p95_latency_ms'),
+                json.dumps(profile.get('trials', []))
+            ))
+
+    @staticmethod
+    def get_tuning_profile(db_path: str, device: str) -> Optional[Dict[str, Any]]:
+        """Get the calibrated profile for a device (None if it was never calibrated)."""
+        if not os.path.exists(db_path):
+            return None
+        try:
+            with sqlite3.connect(db_path) as conn:
+                row = conn.execute("""
+                    SELECT updated_at, root_path, workers, strategy, folders_per_sec,
+                           latency_ms, p95_latency_ms, trials
+                    FROM tuning_profiles WHERE device_id=?
+                """, (device,)).fetchone()
+        except sqlite3.OperationalError:
+            return None  # No calibration has been run against this database
+        if not row:
+            return None
+        keys = ['updated_at', 'root_path', 'workers', 'strategy', 'folders_per_sec',
+                'latency_ms', 'p95_latency_ms', 'trials']
+        profile = dict(zip(keys, row))
+        profile['device_id'] = device
+        profile['trials'] = json.loads(profile['trials'] or "[]")
+        return profile
     
     def get_top_root_folders(self, limit: int = 3) -> List[Tuple[str, int]]:
         """Get top N root folders with most empty subfolders.
         
+        Uses the top_folder column computed at insert time, so this is a single
+        GROUP BY over the covering index instead of a scan in Python.
+        
         Returns:
             List of (root_folder, empty_count) tuples sorted by count descending.
         """
         try:
             with self.lock:
-                # Get all empty folder paths and extract top-level directories
+                self._backfill_top_folders()
                 self.cursor.execute("""
-                    SELECT path FROM folders
-                    WHERE session_id=? AND status='SCANNED' AND file_count=0
-                """, (self.session_id,))
-                
-                empty_paths = [row[0] for row in self.cursor.fetchall()]
-                
-                # Count empty folders under each root (first level directory)
-                import os
-                from collections import Counter
-                root_counts = Counter()
-                
-                for path in empty_paths:
-                    # Extract root folder (first directory component)
-                    parts = os.path.normpath(path).split(os.sep)
-                    if len(parts) >= 2:
-                        # For absolute paths like C:\Users\..., root is C:\Users
-                        # For relative paths, root is first directory
-                        if os.name == 'nt' and parts[0].endswith(':'):
-                            # Windows: C:\folder1 -> root is C:\folder1
-                            root = os.sep.join(parts[:2]) if len(parts) > 1 else parts[0]
-                        else:
-                            # Unix or relative: /folder1 or folder1
-                            root = parts[0] if parts[0] else os.sep.join(parts[:2])
-                        root_counts[root] += 1
-                
-                # Return top N
-                return root_counts.most_common(limit)
+                    SELECT top_folder, COUNT(*) AS empty_count FROM folders
+                    WHERE session_id=? AND status='SCANNED' AND file_count=0 AND top_folder <> ''
+                    GROUP BY top_folder
+                    ORDER BY empty_count DESC, top_folder ASC
+                    LIMIT ?
+                """, (self.session_id, limit))
+                return self.cursor.fetchall()
         except Exception as e:
             self._record_error("get_top_root_folders", e)
             return []
     
-    def commit(self):
+    def get_top_folders_under(self, parent: str, limit: int = 3) -> List[Tuple[str, int]]:
+        """Get the direct children of parent with the most empty folders beneath them.
+        
+        Works at any level (e.g. "top N under /data/projects"). The descendant
+        rows are found with a range scan on the path primary key, and grouped by
+        their child-of-parent prefix in SQL.
+        
+        Returns:
+            List of (child_folder, empty_count) tuples sorted by count descending.
+        """
+        prefix = parent.rstrip("\\/") + os.sep
+        # Every path starting with prefix sorts in [prefix, upper)
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        try:
+            with self.lock:
+                self.cursor.execute("""
+                    SELECT ? || CASE WHEN instr(rest, ?) > 0
+                                     THEN substr(rest, 1, instr(rest, ?) - 1)
+                                     ELSE rest END AS child,
+                           COUNT(*) AS empty_count
+                    FROM (
+                        SELECT substr(path, ?) AS rest FROM folders
+                        WHERE path >= ? AND path < ? AND session_id=?
+                          AND status='SCANNED' AND file_count=0
+                    )
+                    GROUP BY child
+                    ORDER BY empty_count DESC, child ASC
+                    LIMIT ?
+                """, (prefix, os.sep, os.sep, len(prefix) + 1, prefix, upper, self.session_id, limit))
+                return self.cursor.fetchall()
+        except Exception as e:
+            self._record_error("get_top_folders_under", e, parent)
+            return []
+    
+    def _backfill_top_folders(self) -> None:
+        """Fill top_folder for rows written before the column existed (caller holds the lock)."""
+        self.cursor.execute(
+            """SELECT path FROM folders
+               WHERE session_id=? AND status='SCANNED' AND file_count=0 AND top_folder IS NULL""",
+            (self.session_id,)
+        )
+        rows = [(top_level_folder(path), path, self.session_id) for (path,) in self.cursor.fetchall()]
+        if rows:
+            self.cursor.executemany(
+                "UPDATE folders SET top_folder=? WHERE path=? AND session_id=?",
+                rows
+            )
+    
+    def build_subtree_rollups(self) -> int:
+        """Compute per-directory subtree totals in one deepest-first pass.
+        
+        Each directory's row in subtree_stats holds the number of folders,
+        files, bytes, empty folders and errors in its subtree, including the
+        directory itself. Folders are streamed in depth-descending order and
+        each finished subtree is folded into its parent, so only the current
+        frontier of partial sums is held in memory.
+        
+        Returns:
+            Number of directories rolled up (0 on error)
+        """
+        try:
+            with self.lock:
+                self.cursor.execute("DELETE FROM subtree_stats WHERE session_id=?", (self.session_id,))
+                reader = self.conn.cursor()
+                reader.execute("""
+                    SELECT path, depth, status, file_count, direct_files, size_bytes
+                    FROM folders WHERE session_id=?
+                    ORDER BY depth DESC
+                """, (self.session_id,))
+                
+                # path -> [folders, files, bytes, empty, errors] accumulated from finished children
+                partial = {}
+                batch = []
+                total = 0
+                for path, depth, status, file_count, direct_files, size_bytes in reader:
+                    is_empty = status in ('SCANNED', 'WOULD_DELETE', 'DELETED') and file_count == 0
+                    sums = partial.pop(path, None) or [0, 0, 0, 0, 0]
+                    sums[0] += 1
+                    sums[1] += direct_files or 0
+                    sums[2] += size_bytes or 0
+                    sums[3] += int(is_empty)
+                    sums[4] += int(status == 'ERROR')
+                    
+                    parent = os.path.dirname(path)
+                    batch.append((self.session_id, path, parent, depth, *sums))
+                    if parent != path:
+                        parent_sums = partial.setdefault(parent, [0, 0, 0, 0, 0])
+                        for i in range(5):
+                            parent_sums[i] += sums[i]
+                    
+                    if len(batch) >= SUBTREE_BATCH_SIZE:
+                        self._insert_subtree_batch(batch)
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    self._insert_subtree_batch(batch)
+                    total += len(batch)
+                reader.close()
+                self._commit_locked()
+                return total
+        except Exception as e:
+            try:
+                self.conn.rollback()
+            except Exception:
+                pass  # Rollback failure is non-critical
+            self._record_error("build_subtree_rollups", e)
+            return 0
+    
+    def _insert_subtree_batch(self, batch: List[Tuple]) -> None:
+        """Write a batch of subtree rollup rows (caller holds the lock)."""
+        self.cursor.executemany("""
+            INSERT OR REPLACE INTO subtree_stats
+                (session_id, path, parent_path, depth, folders, files, bytes, empty, errors)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+    
+    def get_subtree_stats(self, path: str) -> Optional[Dict[str, int]]:
+        """Get the subtree rollup for a single directory (None if not rolled up)."""
+        with self.lock:
+            self.cursor.execute("""
+                SELECT folders, files, bytes, empty, errors FROM subtree_stats
+                WHERE session_id=? AND path=?
+            """, (self.session_id, path))
+            row = self.cursor.fetchone()
+        return dict(zip(SUBTREE_METRICS, row)) if row else None
+    
+    def get_top_subtrees(self, metric: str = "empty", parent: Optional[str] = None,
+                         depth: Optional[int] = None, limit: int = 10) -> List[Tuple[str, int]]:
+        """Get the subtrees ranking highest on a rollup metric.
+        
+        A parent or depth is required: the rows come from the idx_subtree_parent
+        or idx_subtree_depth range, so only that slice is sorted, never the
+        whole session.
+        
+        Args:
+            metric: One of SUBTREE_METRICS
+            parent: Only consider direct children of this directory
+            depth: Only consider directories at this depth
+            limit: Maximum number of rows to return
+            
+        Returns:
+            List of (path, metric_value) tuples sorted by value descending.
+        """
+        if metric not in SUBTREE_METRICS:
+            raise ValueError(f"Unknown subtree metric: {metric}")
+        if parent is None and depth is None:
+            raise ValueError("get_top_subtrees needs a parent or a depth")
+        
+        query = f"SELECT path, {metric} FROM subtree_stats WHERE session_id=?"
+        params: List[Any] = [self.session_id]
+        if parent is not None:
+            query += " AND parent_path=?"
+            params.append(parent)
+        if depth is not None:
+            query += " AND depth=?"
+            params.append(depth)
+        query += f" ORDER BY {metric} DESC, path ASC LIMIT ?"
+        params.append(limit)
+        
+        with self.lock:
+            self.cursor.execute(query, params)
+            return self.cursor.fetchall()
+    
+    def get_prior_subtree_empties(self, root_path: str, limit: int = 500000) -> Optional[Dict[str, Any]]:
+        """Get the empty-folder rollups of the latest earlier completed session on the same root.
+        
+        Args:
+            root_path: Root of the current scan
+            limit: Maximum subtrees to return (those with the most empties first)
+            
+        Returns:
+            Dict with session_id, timestamp (UTC, as stored) and empties
+            ({path: empty folders in its subtree}, only subtrees with any),
+            or None if no earlier session on this root has rollups
+        """
+        try:
+            with self.lock:
+                self.cursor.execute("""
+                    SELECT s.id, s.timestamp FROM sessions s
+                    WHERE s.root_path=? AND s.id<>? AND s.completed=1
+                      AND EXISTS (SELECT 1 FROM subtree_stats t WHERE t.session_id=s.id)
+                    ORDER BY s.timestamp DESC LIMIT 1
+                """, (root_path, self.session_id))
+                row = self.cursor.fetchone()
+                if not row:
+                    return None
+                session_id, timestamp = row
+                self.cursor.execute("""
+                    SELECT path, empty FROM subtree_stats
+                    WHERE session_id=? AND empty > 0
+                    ORDER BY empty DESC LIMIT ?
+                """, (session_id, limit))
+                empties = dict(self.cursor.fetchall())
+            return {'session_id': session_id, 'timestamp': timestamp, 'empties': empties}
+        except sqlite3.Error as e:
+            self._record_error("get_prior_subtree_empties", e)
+            return None
+    
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Get the last checkpoint written for this session (None if there is none)."""
+        try:
+            with self.lock:
+                self.cursor.execute("""
+                    SELECT elapsed_seconds, scanned, empty, errors, deleted, bytes, in_flight
+                    FROM checkpoints WHERE session_id=?
+                """, (self.session_id,))
+                row = self.cursor.fetchone()
+            if not row:
+                return None
+            elapsed, scanned, empty, errors, deleted, size_bytes, in_flight = row
+            return {
+                'elapsed_seconds': elapsed or 0.0,
+                'scanned': scanned or 0,
+                'empty': empty or 0,
+                'errors': errors or 0,
+                'deleted': deleted or 0,
+                'bytes': size_bytes or 0,
+                'in_flight': [tuple(item) for item in json.loads(in_flight or "[]")]
+            }
+        except Exception as e:
+            self._record_error("load_checkpoint", e)
+            return None
+    
+    def commit(self, checkpoint: Optional[Any] = None):
+        """Commit pending writes, optionally recording an engine checkpoint in the same transaction.
+        
+        Args:
+            checkpoint: Dict with elapsed_seconds, scanned, empty, errors, deleted,
+                bytes and in_flight ([(path, depth), ...]) to persist for resume, or a
+                callable returning one. A callable is invoked while holding the lock,
+                so no worker can record a folder between the snapshot and the commit.
+        """
         try:
             with self.lock:
-                self.conn.commit()
+                if callable(checkpoint):
+                    checkpoint = checkpoint()
+                if checkpoint is not None:
+                    self.cursor.execute("""
+                        INSERT OR REPLACE INTO checkpoints
+                            (session_id, updated_at, elapsed_seconds, scanned, empty, errors,
+                             deleted, bytes, in_flight)
+                        VALUES (?, datetime('now'), ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        self.session_id,
+                        checkpoint.get('elapsed_seconds', 0.0),
+                        checkpoint.get('scanned', 0),
+                        checkpoint.get('empty', 0),
+                        checkpoint.get('errors', 0),
+                        checkpoint.get('deleted', 0),
+                        checkpoint.get('bytes', 0),
+                        json.dumps(checkpoint.get('in_flight', []))
+                    ))
+                self._commit_locked()
         except sqlite3.Error as e:
             self._record_error("commit", e)
         except Exception as e:
@@ -365,7 +1140,7 @@ class Database:
     def close(self):
         try:
             with self.lock:
-                self.conn.commit()
+                self._commit_locked()
                 self.conn.close()
         except sqlite3.Error as e:
             self._record_error("close", e)
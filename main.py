@@ -1,7 +1,6 @@
 import sys
 import os
 import argparse
-import sqlite3
 
 # Ensure local imports work
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -9,10 +8,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from common.constants import DEFAULT_MAX_DEPTH
 
 from config.settings import Config
+from config.tuning import describe_learned
 from core.engine import Engine
+from core.calibration import Calibrator
+from data.database import Database
 from ui.menu import Menu
 from ui.reporter import Reporter
-from utils.logger import setup_logger
+from utils.logger import setup_logger, shutdown_logger, LOG_LEVELS
+from utils.scan_profile import device_id
+from utils.validators import normalize_path, parse_duration, validate_target_path
 
 def show_cache_status(db_path="void_walker_history.db"):
     """Display cached session information"""
@@ -21,69 +25,90 @@ def show_cache_status(db_path="void_walker_history.db"):
         return
     
     try:
-        # Use context manager to ensure connection is closed even if exception occurs
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get all sessions
-            cursor.execute("SELECT id, timestamp FROM sessions ORDER BY timestamp DESC LIMIT 10")
-            sessions = cursor.fetchall()
-            
-            if not sessions:
-                print("[!] No previous sessions found.")
-                return
+        # Counters are materialized in the sessions table, so this is one query
+        sessions = Database.get_recent_sessions(db_path, limit=10)
+        
+        if not sessions:
+            print("[!] No previous sessions found.")
+            return
+        
+        print("\n" + "="*70)
+        print(" CACHED SESSIONS")
+        print("="*70)
+        
+        for session in sessions:
+            scanned = session['scanned'] or 0
+            pending = session['pending'] or 0
+            errors = session['errors'] or 0
+            deleted = session['deleted'] or 0
+            would_delete = session['would_delete'] or 0
+            total = scanned + pending + errors + deleted + would_delete
+            root_path = session['root_path'] or "Unknown"
             
-            print("\n" + "="*70)
-            print(" CACHED SESSIONS")
-            print("="*70)
+            completion = (scanned / total * 100) if total > 0 else 0
             
-            for session_id, timestamp in sessions:
-                # Get session stats
-                cursor.execute("""
-                    SELECT 
-                        COUNT(*) as total,
-                        SUM(CASE WHEN status='SCANNED' THEN 1 ELSE 0 END) as scanned,
-                        SUM(CASE WHEN status='PENDING' THEN 1 ELSE 0 END) as pending,
-                        SUM(CASE WHEN status='ERROR' THEN 1 ELSE 0 END) as errors,
-                        SUM(CASE WHEN status='DELETED' THEN 1 ELSE 0 END) as deleted,
-                        SUM(CASE WHEN status='WOULD_DELETE' THEN 1 ELSE 0 END) as would_delete
-                    FROM folders WHERE session_id=?
-                """, (session_id,))
-                
-                stats = cursor.fetchone()
-                total = stats[0] or 0
-                scanned = stats[1] or 0
-                pending = stats[2] or 0
-                errors = stats[3] or 0
-                deleted = stats[4] or 0
-                would_delete = stats[5] or 0
-                
-                # Get root path
-                cursor.execute("SELECT path FROM folders WHERE session_id=? ORDER BY depth ASC LIMIT 1", (session_id,))
-                root = cursor.fetchone()
-                root_path = root[0] if root else "Unknown"
-                
-                completion = (scanned / total * 100) if total > 0 else 0
-                
-                print(f"\n Session: {session_id}")
-                print(f" Time:    {timestamp}")
-                print(f" Root:    {root_path}")
-                print(f" Status:  {scanned}/{total} scanned ({completion:.1f}% complete)")
-                if pending > 0:
-                    print(f" [!] {pending} folders pending (can resume with --resume)")
-                if deleted > 0:
-                    print(f" [OK] {deleted} folders deleted")
-                if would_delete > 0:
-                    print(f" [OK] {would_delete} empty folders identified (dry run)")
-                if errors > 0:
-                    print(f" ✗ {errors} errors")
-                print("-"*70)
+            print(f"\n Session: {session['session_id']}")
+            print(f" Time:    {session['timestamp']}")
+            print(f" Root:    {root_path}")
+            print(f" Status:  {scanned}/{total} scanned ({completion:.1f}% complete)")
+            if pending > 0:
+                print(f" [!] {pending} folders pending (can resume with --resume)")
+            if deleted > 0:
+                print(f" [OK] {deleted} folders deleted")
+            if would_delete > 0:
+                print(f" [OK] {would_delete} empty folders identified (dry run)")
+            if errors > 0:
+                print(f" ✗ {errors} errors")
+            print("-"*70)
         
         print("\n")
         
     except Exception as e:
         print(f"[!] Error reading cache: {e}")
 
+def run_calibration(args, db_path="void_walker_history.db"):
+    """Time-boxed trial scans of PATH; stores the best workers/strategy for its volume"""
+    valid, message = validate_target_path(args.calibrate)
+    if not valid:
+        print(f"\033[91m[!] {message}\033[0m")
+        return
+    root = normalize_path(args.calibrate)
+    device = device_id(root)
+    profile = Calibrator(root, exclude_names=args.exclude_name + [".git", "$RECYCLE.BIN", "System Volume Information"],
+                         exclude_paths=args.exclude_path).run()
+    Database.save_tuning_profile(db_path, device, profile)
+    print(f"\n\033[92m[OK] Best: {profile['workers']} workers, {profile['strategy']} "
+          f"({profile['folders_per_sec']:,.1f} folders/s)\033[0m")
+    print(f"\033[90m    Saved for {device}; used by runs with --workers 0 / --strategy auto on this volume\033[0m")
+
+def finish_rolling_window(config, engine, logger):
+    """End a --time-budget run without prompts: clean up if the cycle finished in time.
+    
+    Deleting without the confirmation prompt needs --unattended-delete; otherwise
+    a --delete cycle only reports (dry run).
+    
+    Returns:
+        True if the cycle is complete, False if the next run continues it
+    """
+    if not engine.cycle_complete:
+        # The engine already reported the pending frontier
+        logger.info(f"Rolling cycle {config.cycle} paused; the next run continues it")
+        return False
+    empty_count = engine.db.count_empty_candidates(config.min_depth)
+    if config.delete_mode and not config.unattended_delete:
+        print("\n\033[93m[!] --delete with --time-budget needs --unattended-delete to delete without confirmation; "
+              "reporting only (dry run)\033[0m")
+        logger.warning("Rolling cycle: deletion skipped (no --unattended-delete)")
+        config.delete_mode = False
+    if empty_count > 0 and not engine._budget_expired():
+        print(f"\n\033[96m[*] Found {empty_count} empty folder(s), cleaning up unattended "
+              f"({'DELETE' if config.delete_mode else 'DRY RUN'} mode)...\033[0m\n")
+        engine.cleanup_only()
+    print(f"\n\033[92m[OK] Cycle {config.cycle} complete; the next run starts cycle {config.cycle + 1} "
+          f"from the top of the tree\033[0m")
+    logger.info(f"Rolling cycle {config.cycle} complete ({empty_count} empty candidates)")
+    return True
+
 def main():
     # 1. Parse Arguments
     parser = argparse.ArgumentParser(description="Void Walker v4: Enterprise Folder Cleaner", formatter_class=argparse.RawTextHelpFormatter)
@@ -93,11 +118,17 @@ def main():
     parser.add_argument("--delete", action="store_true", help="Enable DELETION mode (Default is Dry Run)")
     parser.add_argument("--resume", action="store_true", help="Resume a previous interrupted session")
     parser.add_argument("--show-cache", action="store_true", help="Display cached session status and exit")
+    parser.add_argument("--calibrate", metavar="PATH", help="Sample-scan PATH with several worker counts and BFS/DFS,\nstore the fastest for its volume and exit")
     
     # Hardware Config
     parser.add_argument("--disk", choices=["ssd", "hdd", "auto"], default="auto", help="Optimize strategy for disk type.\nSSD = BFS/High Concurrency\nHDD = DFS/Low Concurrency")
-    parser.add_argument("--strategy", choices=["bfs", "dfs", "auto"], default="auto", help="Scan strategy.\nBFS = Breadth-First (SSD)\nDFS = Depth-First (HDD)\nAuto = Match disk type")
+    parser.add_argument("--strategy", choices=["bfs", "dfs", "hybrid", "auto"], default="auto", help="Scan strategy.\nBFS = Breadth-First (SSD)\nDFS = Depth-First (HDD)\nHybrid = BFS until all workers are fed, then DFS\nAuto = Match disk type")
     parser.add_argument("--workers", type=int, default=0, help="Manual thread count override")
+    parser.add_argument("--prioritize", action="store_true", help="Scan subtrees that held empty folders in the last scan\nof this root (or changed since) first")
+    parser.add_argument("--no-tuning", action="store_true", help="Ignore calibrated profiles and session history; auto\nsettings use the disk-type defaults")
+    parser.add_argument("--commit-interval", type=float, default=0, help="Seconds between database commits\n(0 = learned from past sessions, else 10)")
+    parser.add_argument("--unattended-delete", action="store_true", help="With --time-budget --delete: delete a finished cycle's\nempty folders without the confirmation prompt\n(otherwise rolling cycles only report)")
+    parser.add_argument("--time-budget", type=parse_duration, default=0, metavar="DURATION", help="Stop scanning after DURATION (e.g. 30m, 1h30m, 90s), save the\nfrontier and continue on the next run with the same path;\nstarts over after a full pass (cleanup runs unattended,\ndry run unless --unattended-delete)")
     
     # Filters & Depth
     parser.add_argument("--min-depth", type=int, default=0, help="Minimum depth to start deleting")
@@ -106,12 +137,26 @@ def main():
     parser.add_argument("--exclude-name", nargs='*', default=[], help="Glob patterns for folder names to exclude (e.g. .git node_modules)")
     parser.add_argument("--include-name", nargs='*', default=[], help="Strictly include ONLY these folder names")
     
+    # Monitoring
+    parser.add_argument("--log-level", choices=LOG_LEVELS, default="INFO", type=str.upper, help="Session log verbosity (default: INFO)")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics (0 = off)")
+    parser.add_argument("--metrics-textfile", default=None, help="Periodically write Prometheus metrics to this .prom file\n(for node_exporter's textfile collector)")
+    parser.add_argument("--profile", action="store_true", help="Profile scan and cleanup phases with cProfile\n(writes .pstats and a text report to logs/)")
+    parser.add_argument("--profile-memory", action="store_true", help="Also trace allocations with tracemalloc at each commit (implies --profile)")
+    parser.add_argument("--trace", action="store_true", help="Record worker/DB/cleanup spans as Chrome trace JSON in logs/\n(open in https://ui.perfetto.dev)")
+    parser.add_argument("--no-estimate", action="store_true", help="Skip the background tree-size sampling behind the\ndashboard ETA (saves its extra directory reads)")
+    parser.add_argument("--lock-stats", action="store_true", help="Instrument engine/DB/dashboard locks and print a\ncontention table at the end of the session")
+    
     args = parser.parse_args()
 
     # Show cache if requested
     if args.show_cache:
         show_cache_status()
         return
+    
+    if args.calibrate:
+        run_calibration(args)
+        return
 
     # 2. Handle resume mode (doesn't need path or menu)
     if args.resume:
@@ -127,31 +172,46 @@ def main():
     engine = None
     try:
         config = Config(args)
-        logger = setup_logger(config.session_id)
+        logger = setup_logger(config.session_id, config.log_level)
         
         logger.info(f"Initializing Void Walker v4 [Session: {config.session_id}]")
         logger.info(f"Target: {config.root_path} | Mode: {'DELETE' if config.delete_mode else 'DRY RUN'}")
         logger.info(f"Strategy: {config.strategy} | Workers: {config.workers}")
+        if config.tuning_profile:
+            print(f"\033[90m[i] Using calibrated profile for {config.tuning_profile['device_id']}: "
+                  f"{config.workers} workers, {config.strategy}\033[0m")
+            logger.info(f"Calibrated profile from {config.tuning_profile['updated_at']} applied")
+        if config.learned_tuning:
+            print(f"\033[90m[i] Tuned from {describe_learned(config.learned_tuning)}: {config.workers} workers, "
+                  f"{config.strategy}, commit every {config.commit_interval:g}s\033[0m")
+        if not config.use_tuning:
+            print("\033[90m[i] --no-tuning: calibrated profiles and session history ignored\033[0m")
+        logger.info("Tuning: " + ", ".join(f"{setting}={getattr(config, setting)} ({source})"
+                                           for setting, source in config.tuning_source.items()))
 
         # 4. Execution - Scanning Phase
         engine = Engine(config, logger)
+        engine.start_exporters()
         engine.scan_only()  # New method: scan without cleanup
 
         # 4.5. Interactive Review & Confirmation
-        reporter = Reporter(config, engine.db)
+        reporter = Reporter(config, engine.db, engine.profile)
         
-        # Get empty folders before prompting
-        empty_folders = engine.db.get_empty_candidates(config.min_depth)
-        empty_count = len(empty_folders)
+        # Count empty folders before prompting (rows are paged in on demand)
+        empty_count = engine.db.count_empty_candidates(config.min_depth)
         
-        if empty_count > 0:
+        if config.time_budget:
+            # Rolling scans run unattended (e.g. from a nightly scheduler)
+            if not finish_rolling_window(config, engine, logger):
+                return  # Mid-cycle: no summary until the pass is complete
+        elif empty_count > 0:
             # Ask if user wants to scroll through the list
             mode_label = "DELETE" if config.delete_mode else "DRY RUN"
             print(f"\n\033[96m[*] Found {empty_count} empty folder(s)\033[0m")
             scroll_choice = input(f"    Would you like to scroll through the list? (y/N): ").lower().strip()
             
             if scroll_choice == 'y':
-                reporter.scroll_empty_folders(empty_folders)
+                reporter.scroll_empty_folders()
             
             # Ask if user wants to proceed with cleanup/deletion
             action_verb = "delete" if config.delete_mode else "mark for deletion"
@@ -168,6 +228,10 @@ def main():
 
         # 5. Reporting
         reporter.show_summary()
+        if engine.profiler and engine.profiler.written:
+            print("\n\033[96m[*] Profiles written:\033[0m")
+            for profile_path in engine.profiler.written:
+                print(f"    {profile_path}")
         
         # Final completion marker
         print("\n\033[92m[OK] All operations completed successfully\033[0m", flush=True)
@@ -185,6 +249,11 @@ def main():
         # Ensure cleanup happens regardless of exit reason
         if engine:
             try:
+                engine.stop_exporters()
+                trace_path = engine.write_trace()
+                if trace_path:
+                    print(f"\033[90m[i] Trace timeline: {trace_path}\033[0m")
+                engine.print_lock_report()
                 # Stop dashboard if running
                 if hasattr(engine, 'dashboard') and engine.dashboard:
                     engine.dashboard.stop()
@@ -204,6 +273,8 @@ def main():
                     engine.executor.shutdown(wait=False)
             except Exception as cleanup_error:
                 print(f"[!] Cleanup error: {cleanup_error}", file=sys.stderr)
+        # Flush queued log records before exit
+        shutdown_logger()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,139 @@
+"""Tests for the benchmark tree generator and runner"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.compare import compare_reports
+from benchmarks.generator import SHAPES, generate_tree
+from benchmarks.runner import run_single
+
+
+def _listing(root):
+    return sorted(
+        (os.path.relpath(dirpath, root), sorted(dirs), sorted((f, os.path.getsize(os.path.join(dirpath, f)))
+                                                              for f in files))
+        for dirpath, dirs, files in os.walk(root)
+    )
+
+
+class TestTreeGenerator(unittest.TestCase):
+    """Test synthetic trees are deterministic and match their manifests"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="void_walker_bench_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_same_seed_same_tree(self):
+        """Test regenerating with the same seed reproduces the tree exactly"""
+        first = os.path.join(self.work_dir, "a")
+        second = os.path.join(self.work_dir, "b")
+        generate_tree(first, "mixed", scale=0.05, seed=7)
+        generate_tree(second, "mixed", scale=0.05, seed=7)
+        self.assertEqual(_listing(first), _listing(second))
+
+    def test_manifests_match_disk(self):
+        """Test every shape's manifest counts what was written"""
+        for shape in SHAPES:
+            with self.subTest(shape=shape):
+                root = os.path.join(self.work_dir, shape)
+                manifest = generate_tree(root, shape, scale=0.02)
+                walked = list(os.walk(root))
+                self.assertEqual(manifest["folders"], len(walked))
+                self.assertEqual(manifest["files"], sum(len(files) for _, _, files in walked))
+                self.assertGreater(manifest["folders"], 1)
+
+    def test_memory_tree_matches_disk(self):
+        """Test an in-memory tree has the same manifest and contents as the disk one"""
+        from utils.filesystem import MemoryFileSystem
+
+        root = os.path.join(self.work_dir, "mixed")
+        on_disk = generate_tree(root, "mixed", scale=0.05, seed=3)
+        fs = MemoryFileSystem()
+        in_memory = generate_tree(root + "_mem", "mixed", scale=0.05, seed=3, fs=fs)
+
+        for key in ("folders", "files", "bytes", "empty", "max_depth"):
+            self.assertEqual(on_disk[key], in_memory[key], key)
+        self.assertEqual(fs.counts(), {k: on_disk[k] for k in ("folders", "files", "empty")})
+
+    def test_unknown_shape(self):
+        """Test an unknown shape is rejected"""
+        with self.assertRaises(ValueError):
+            generate_tree(os.path.join(self.work_dir, "x"), "spiral")
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+    """Test a single in-process benchmark run"""
+
+    def test_run_single_reports_engine_counts(self):
+        """Test the runner's folder/empty counts agree with the generated tree"""
+        work_dir = tempfile.mkdtemp(prefix="void_walker_bench_test_")
+        try:
+            root = os.path.join(work_dir, "tree")
+            manifest = generate_tree(root, "deep", scale=0.05)
+            result = run_single(root, 2, "bfs", os.path.join(work_dir, "bench.db"))
+
+            self.assertEqual(result["folders"], manifest["folders"])
+            self.assertEqual(result["empty"], manifest["empty"])
+            self.assertGreater(result["db_bytes"], 0)
+            self.assertIsNotNone(result["folders_per_sec"])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _report(*runs, tolerances=None):
+    report = {"runs": [dict({"shape": "deep", "strategy": "bfs", "workers": 4, "folders_per_sec": 1000.0,
+                             "peak_rss_bytes": 50 * 1024 * 1024, "db_bytes_per_folder": 400.0,
+                             "startup_seconds": 0.2}, **run) for run in runs]}
+    if tolerances:
+        report["tolerances"] = tolerances
+    return report
+
+
+def _statuses(rows):
+    return {row["metric"]: row["status"] for row in rows}
+
+
+class TestBenchmarkCompare(unittest.TestCase):
+    """Test the regression gate's comparison rules"""
+
+    def test_within_tolerance_is_ok(self):
+        """Test small changes in either direction pass"""
+        rows = compare_reports(_report({}), _report({"folders_per_sec": 950.0, "db_bytes_per_folder": 410.0}))
+        self.assertEqual(set(_statuses(rows).values()), {"ok"})
+
+    def test_direction_of_each_metric(self):
+        """Test throughput regresses when it drops, resource metrics when they grow"""
+        rows = compare_reports(_report({}), _report({"folders_per_sec": 800.0, "peak_rss_bytes": 30 * 1024 * 1024,
+                                                     "db_bytes_per_folder": 500.0, "startup_seconds": 0.1}))
+        self.assertEqual(_statuses(rows), {"folders_per_sec": "regressed", "peak_rss_bytes": "improved",
+                                           "db_bytes_per_folder": "regressed", "startup_seconds": "improved"})
+
+    def test_median_over_repeats(self):
+        """Test a single slow repeat does not fail the gate"""
+        current = _report({}, {"folders_per_sec": 200.0}, {"folders_per_sec": 990.0})
+        self.assertEqual(_statuses(compare_reports(_report({}), current))["folders_per_sec"], "ok")
+
+    def test_absolute_slack_for_tiny_values(self):
+        """Test millisecond noise on startup time is not a regression"""
+        rows = compare_reports(_report({"startup_seconds": 0.01}), _report({"startup_seconds": 0.03}))
+        self.assertEqual(_statuses(rows)["startup_seconds"], "ok")
+
+    def test_tolerance_overrides(self):
+        """Test baseline and explicit tolerances loosen the gate, explicit ones winning"""
+        current = _report({"folders_per_sec": 800.0})
+        baseline = _report({}, tolerances={"folders_per_sec": 0.25})
+        self.assertEqual(_statuses(compare_reports(baseline, current))["folders_per_sec"], "ok")
+        rows = compare_reports(baseline, current, {"folders_per_sec": 0.1})
+        self.assertEqual(_statuses(rows)["folders_per_sec"], "regressed")
+
+    def test_missing_configuration(self):
+        """Test configurations absent from the current run are reported as missing"""
+        rows = compare_reports(_report({}), _report({"workers": 16}))
+        self.assertEqual(set(_statuses(rows).values()), {"missing"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -82,10 +82,10 @@ class TestCacheErrorHandling(unittest.TestCase):
         db.add_folder("/test/path2", 1)
         db.conn.commit()
         
-        pending = db.get_pending()
+        pending = db.get_pending_page()
         self.assertEqual(len(pending), 2)
-        self.assertEqual(pending[0][0], "/test/path1")
-        self.assertEqual(pending[1][0], "/test/path2")
+        self.assertEqual(pending[0][1], "/test/path1")
+        self.assertEqual(pending[1][1], "/test/path2")
     
     def test_session_count(self):
         """Test that session count increments correctly"""
@@ -102,6 +102,34 @@ class TestCacheErrorHandling(unittest.TestCase):
         
         self.assertEqual(count, 2)
         conn.close()
+    
+    def test_recent_sessions_backfills_legacy_counters(self):
+        """Test sessions written before materialized counters are backfilled once"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE sessions (id TEXT PRIMARY KEY, timestamp TEXT, config TEXT, root_path TEXT, completed INTEGER DEFAULT 0)")
+        cursor.execute("""
+            CREATE TABLE folders (path TEXT, session_id TEXT, depth INTEGER, file_count INTEGER DEFAULT -1,
+                                  status TEXT DEFAULT 'PENDING', error_msg TEXT, PRIMARY KEY (path, session_id))
+        """)
+        cursor.execute("INSERT INTO sessions (id, timestamp) VALUES ('legacy', datetime('now'))")
+        cursor.executemany(
+            "INSERT INTO folders (path, session_id, depth, file_count, status) VALUES (?, 'legacy', ?, ?, ?)",
+            [("/root", 0, 2, "SCANNED"), ("/root/a", 1, 0, "SCANNED"),
+             ("/root/b", 1, -1, "PENDING"), ("/root/c", 1, -1, "ERROR")]
+        )
+        conn.commit()
+        conn.close()
+        
+        sessions = Database.get_recent_sessions(self.db_path)
+        
+        self.assertEqual(len(sessions), 1)
+        session = sessions[0]
+        self.assertEqual(session['root_path'], "/root")
+        self.assertEqual(session['scanned'], 2)
+        self.assertEqual(session['empty'], 1)
+        self.assertEqual(session['pending'], 1)
+        self.assertEqual(session['errors'], 1)
 
 
 class TestConfigInitialization(unittest.TestCase):
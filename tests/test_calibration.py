@@ -0,0 +1,110 @@
+"""Tests for --calibrate trial scans and stored tuning profiles"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.generator import generate_tree
+from config.settings import Config
+from core.calibration import Calibrator
+from data.database import Database
+from tests.test_config import MockArgs
+from utils.filesystem import MemoryFileSystem
+from utils.fs_simulator import NfsLatency, SimulatedFileSystem
+from utils.scan_profile import device_id
+
+MEM_ROOT = os.path.join(os.sep, "vw_calibration_root")
+
+
+class TestCalibrator(unittest.TestCase):
+    """Test trial sampling, selection and an end-to-end calibration"""
+
+    def setUp(self):
+        self.fs = MemoryFileSystem()
+        generate_tree(MEM_ROOT, "balanced", scale=1.0, fs=self.fs)
+
+    def test_trials_sample_disjoint_subtrees(self):
+        """Test every trial starts from its own subtrees at one level"""
+        samples = Calibrator(MEM_ROOT, fs=self.fs)._sample_roots(4)
+        starts = [path for sample in samples for path, _depth in sample]
+        self.assertEqual(len(starts), len(set(starts)))
+        self.assertEqual({depth for sample in samples for _path, depth in sample}, {2})
+        self.assertTrue(all(len(sample) == 4 for sample in samples))
+
+    def test_small_tree_reuses_samples(self):
+        """Test a tree with fewer subtrees than trials falls back to shared samples"""
+        fs = MemoryFileSystem(MEM_ROOT)
+        fs.mkdir(os.path.join(MEM_ROOT, "only"))
+        calibrator = Calibrator(MEM_ROOT, fs=fs)
+        samples = calibrator._sample_roots(3)
+        self.assertFalse(calibrator.disjoint)
+        self.assertEqual(len(samples), 3)
+
+    def test_choose_prefers_fewer_workers_on_ties(self):
+        """Test a near-tie goes to the configuration with fewer workers"""
+        trials = [
+            {"workers": 16, "strategy": "BFS", "folders_per_sec": 1000.0},
+            {"workers": 4, "strategy": "DFS", "folders_per_sec": 970.0},
+            {"workers": 1, "strategy": "DFS", "folders_per_sec": 500.0},
+        ]
+        self.assertEqual(Calibrator.choose(trials)["workers"], 4)
+
+    def test_network_share_favours_more_workers(self):
+        """Test calibration on a simulated NFS share picks the parallel configuration"""
+        share = SimulatedFileSystem(self.fs, NfsLatency(seed=1))
+        calibrator = Calibrator(MEM_ROOT, fs=share, worker_counts=(1, 8), strategies=("BFS",),
+                                trial_seconds=0.5)
+        profile = calibrator.run()
+
+        self.assertEqual(profile["workers"], 8)
+        self.assertEqual(profile["strategy"], "BFS")
+        self.assertEqual(len(profile["trials"]), 2)
+        self.assertTrue(all(trial["folders"] > 0 for trial in profile["trials"]))
+        self.assertIsNotNone(profile["latency_ms"])
+
+
+class TestTuningProfiles(unittest.TestCase):
+    """Test tuning profiles are stored per device and applied by Config"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp(prefix="void_walker_tuning_")
+        os.chdir(self.temp_dir)
+        self.device = device_id(self.temp_dir)
+        self.profile = {"root_path": self.temp_dir, "workers": 6, "strategy": "DFS", "folders_per_sec": 1234.5,
+                        "latency_ms": 0.4, "p95_latency_ms": 1.0, "trials": [{"workers": 6}]}
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_profile_round_trip(self):
+        """Test a saved profile is returned for its device only"""
+        self.assertIsNone(Database.get_tuning_profile("void_walker_history.db", self.device))
+        Database.save_tuning_profile("void_walker_history.db", self.device, self.profile)
+
+        stored = Database.get_tuning_profile("void_walker_history.db", self.device)
+        self.assertEqual((stored["workers"], stored["strategy"]), (6, "DFS"))
+        self.assertEqual(stored["trials"], [{"workers": 6}])
+        self.assertIsNone(Database.get_tuning_profile("void_walker_history.db", "other-device"))
+
+    def test_config_uses_profile_for_auto(self):
+        """Test --workers 0 --strategy auto take the calibrated values, explicit flags win"""
+        Database.save_tuning_profile("void_walker_history.db", self.device, self.profile)
+
+        config = Config(MockArgs(path=self.temp_dir, disk="ssd", strategy="auto", workers=0))
+        self.assertEqual((config.workers, config.strategy), (6, "DFS"))
+        self.assertIsNotNone(config.tuning_profile)
+
+        config = Config(MockArgs(path=self.temp_dir, disk="ssd", strategy="bfs", workers=3))
+        self.assertEqual((config.workers, config.strategy), (3, "BFS"))
+        self.assertIsNone(config.tuning_profile)
+
+    def test_config_defaults_without_profile(self):
+        """Test uncalibrated volumes keep the disk-type defaults"""
+        config = Config(MockArgs(path=self.temp_dir, disk="ssd", strategy="auto", workers=0))
+        self.assertEqual((config.workers, config.strategy), (16, "BFS"))
+
+
+if __name__ == '__main__':
+    unittest.main()
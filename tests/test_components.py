@@ -1,10 +1,12 @@
-"""Tests for UI components (Banner and Dialog)"""
+"""Tests for UI components (Banner and Dialog) and the report pager"""
+import sqlite3
 import unittest
 from unittest.mock import patch, MagicMock
 import sys
 from io import StringIO
 from ui.components.banner import Banner
 from ui.components.dialog import Dialog
+from ui.reporter import KeysetPager
 
 
 class TestBanner(unittest.TestCase):
@@ -159,5 +161,28 @@ class TestDialog(unittest.TestCase):
         mock_input.assert_called_once()
 
 
+class TestKeysetPager(unittest.TestCase):
+    """Test keyset paging with background prefetch"""
+
+    def test_pages_follow_cursor(self):
+        """Test each page starts after the previous page's last row"""
+        rows = list(range(5))
+        pager = KeysetPager(lambda after, limit: [r for r in rows if after is None or r > after][:limit],
+                            cursor_of=lambda row: row, page_size=2)
+        self.assertEqual([pager.get_page(i) for i in range(3)], [[0, 1], [2, 3], [4]])
+
+    def test_prefetch_error_reaches_reader(self):
+        """Test a failed prefetch query is raised when that page is read, not swallowed"""
+        def fetch(after, limit):
+            if after is not None:
+                raise sqlite3.OperationalError("database is locked")
+            return [0, 1]
+
+        pager = KeysetPager(fetch, cursor_of=lambda row: row, page_size=2)
+        self.assertEqual(pager.get_page(0), [0, 1])
+        with self.assertRaises(sqlite3.OperationalError):
+            pager.get_page(1)
+
+
 if __name__ == '__main__':
     unittest.main()
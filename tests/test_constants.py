@@ -26,6 +26,7 @@ class TestEnums(unittest.TestCase):
         self.assertEqual(ScanStrategy.AUTO.value, "auto")
         self.assertEqual(ScanStrategy.BFS.value, "bfs")
         self.assertEqual(ScanStrategy.DFS.value, "dfs")
+        self.assertEqual(ScanStrategy.HYBRID.value, "hybrid")
     
     def test_folder_status_values(self):
         """Test FolderStatus enum values"""
@@ -2,6 +2,7 @@
 import unittest
 import os
 import tempfile
+import threading
 from data.database import Database
 
 
@@ -117,23 +118,23 @@ class TestDatabase(unittest.TestCase):
         
         self.assertEqual(result[0], 'WOULD_DELETE')
     
-    def test_get_pending(self):
-        """Test retrieving pending folders"""
-        paths = [
-            ("C:\\Test\\Path1", 1),
-            ("C:\\Test\\Path2", 2),
-            ("C:\\Test\\Path3", 1)
-        ]
-        
-        for path, depth in paths:
-            self.db.add_folder(path, depth)
-        self.db.commit()
-        
-        pending = self.db.get_pending()
-        
-        self.assertEqual(len(pending), 3)
-        # Should be ordered by depth ASC
-        self.assertEqual(pending[0][1], 1)
+    def test_invalidate_missing_paths(self):
+        """Test pending rows for vanished paths are removed in batches"""
+        existing_dir = tempfile.mkdtemp()
+        try:
+            self.db.add_folder(existing_dir, 0)
+            for i in range(5):
+                self.db.add_folder(os.path.join(existing_dir, f"gone_{i}"), 1)
+            self.db.commit()
+            
+            removed = self.db.invalidate_missing_paths(workers=4, batch_size=2)
+            
+            self.assertEqual(removed, 5)
+            self.assertEqual([(path, depth) for _, path, depth in self.db.get_pending_page()],
+                             [(existing_dir, 0)])
+            self.assertEqual(self.db.get_statistics()['total_pending'], 1)
+        finally:
+            os.rmdir(existing_dir)
     
     def test_get_empty_candidates(self):
         """Test retrieving empty folder candidates"""
@@ -158,21 +159,202 @@ class TestDatabase(unittest.TestCase):
         self.assertIn("C:\\Test\\Empty2", candidates)
         self.assertNotIn("C:\\Test\\Shallow", candidates)
     
-    def test_get_errors(self):
-        """Test retrieving error list"""
-        errors = [
-            ("C:\\Test\\Error1", "Access Denied"),
-            ("C:\\Test\\Error2", "WinError 1920")
+    def test_statistics_match_folder_rows(self):
+        """Test materialized session counters track every status change"""
+        self.db.add_folder("C:\\Root", 0)
+        self.db.add_folder("C:\\Root\\Empty", 1)
+        self.db.add_folder("C:\\Root\\Full", 1)
+        self.db.add_folder("C:\\Root\\Denied", 1)
+        self.db.add_folder("C:\\Root\\Pending", 1)
+        self.db.add_folder("C:\\Root\\Empty", 1)  # Duplicate insert is ignored
+        self.db.update_folder_stats("C:\\Root", 4, 100)
+        self.db.update_folder_stats("C:\\Root\\Empty", 0)
+        self.db.update_folder_stats("C:\\Root\\Full", 2, 50)
+        self.db.log_error("C:\\Root\\Denied", "Access Denied")
+        self.db.commit()
+        
+        stats = self.db.get_statistics()
+        self.assertEqual(stats['total_scanned'], 3)
+        self.assertEqual(stats['total_empty'], 1)
+        self.assertEqual(stats['total_errors'], 1)
+        self.assertEqual(stats['total_pending'], 1)
+        self.assertEqual(stats['total_bytes'], 150)
+        
+        # Uncommitted changes are included, and cleanup moves folders out of SCANNED
+        self.db.mark_would_delete("C:\\Root\\Empty")
+        stats = self.db.get_statistics()
+        self.assertEqual(stats['total_scanned'], 2)
+        self.assertEqual(stats['total_empty'], 0)
+        self.assertEqual(stats['total_would_delete'], 1)
+        
+        self.db.commit()
+        self.db.cursor.execute(
+            "SELECT scanned_count, empty_count, would_delete_count FROM sessions WHERE id=?",
+            (self.session_id,)
+        )
+        self.assertEqual(self.db.cursor.fetchone(), (2, 0, 1))
+    
+    def test_get_top_root_folders(self):
+        """Test top-level rollup counts empty folders per first-level directory"""
+        sep = os.sep
+        folders = [
+            (f"{sep}alpha{sep}a", 0), (f"{sep}alpha{sep}b", 0), (f"{sep}alpha{sep}c", 3),
+            (f"{sep}beta{sep}a", 0), (f"{sep}gamma{sep}x{sep}y", 0), (f"{sep}gamma{sep}x{sep}z", 0),
+            (f"{sep}gamma{sep}w", 0),
         ]
+        for path, file_count in folders:
+            self.db.add_folder(path, path.count(sep))
+            self.db.update_folder_stats(path, file_count)
+        self.db.commit()
+        
+        top = self.db.get_top_root_folders(limit=2)
+        self.assertEqual(top, [(f"{sep}gamma", 3), (f"{sep}alpha", 2)])
         
-        for path, msg in errors:
+        under = self.db.get_top_folders_under(f"{sep}gamma", limit=5)
+        self.assertEqual(under, [(f"{sep}gamma{sep}x", 2), (f"{sep}gamma{sep}w", 1)])
+    
+    def test_build_subtree_rollups(self):
+        """Test deepest-first rollup of folders, files, bytes, empties and errors"""
+        join = os.path.join
+        root = join(os.sep, "root")
+        # (path, depth, entry_count, direct_files, size_bytes)
+        scanned = [
+            (root, 0, 3, 1, 10),
+            (join(root, "a"), 1, 2, 1, 20),
+            (join(root, "a", "empty"), 2, 0, 0, 0),
+            (join(root, "a", "deep"), 2, 1, 1, 5),
+            (join(root, "b"), 1, 0, 0, 0),
+        ]
+        for path, depth, entry_count, files, size in scanned:
+            self.db.add_folder(path, depth)
+            self.db.update_folder_stats(path, entry_count, size, files)
+        self.db.add_folder(join(root, "denied"), 1)
+        self.db.log_error(join(root, "denied"), "Access Denied")
+        self.db.commit()
+        
+        self.assertEqual(self.db.build_subtree_rollups(), 6)
+        
+        self.assertEqual(self.db.get_subtree_stats(root),
+                         {'folders': 6, 'files': 3, 'bytes': 35, 'empty': 2, 'errors': 1})
+        self.assertEqual(self.db.get_subtree_stats(join(root, "a")),
+                         {'folders': 3, 'files': 2, 'bytes': 25, 'empty': 1, 'errors': 0})
+        self.assertEqual(self.db.get_top_subtrees("bytes", parent=root, limit=1),
+                         [(join(root, "a"), 25)])
+        self.assertEqual(self.db.get_top_subtrees("empty", depth=1, limit=2),
+                         [(join(root, "a"), 1), (join(root, "b"), 1)])
+        with self.assertRaises(ValueError):
+            self.db.get_top_subtrees("empty")  # Unscoped would sort every subtree in the session
+    
+    def test_prior_subtree_empties(self):
+        """Test the latest earlier completed session on the same root supplies empty rollups"""
+        join = os.path.join
+        root = join(os.sep, "root")
+        for path, depth, entry_count in [(root, 0, 2), (join(root, "a"), 1, 1),
+                                         (join(root, "a", "empty"), 2, 0), (join(root, "full"), 1, 3)]:
+            self.db.add_folder(path, depth)
+            self.db.update_folder_stats(path, entry_count)
+        self.db.save_config({}, root)
+        self.db.commit()
+        self.db.build_subtree_rollups()
+        self.assertIsNone(Database(self.db_path, "test_session_002").get_prior_subtree_empties(root))
+        self.db.mark_completed()
+        
+        current = Database(self.db_path, "test_session_002")
+        try:
+            prior = current.get_prior_subtree_empties(root)
+            self.assertEqual(prior['session_id'], self.session_id)
+            self.assertEqual(prior['empties'], {root: 1, join(root, "a"): 1, join(root, "a", "empty"): 1})
+            self.assertEqual(current.get_prior_subtree_empties(root, limit=1)['empties'], {root: 1})
+            self.assertIsNone(current.get_prior_subtree_empties(join(os.sep, "other")))
+            # A session never counts as its own prior
+            self.assertIsNone(self.db.get_prior_subtree_empties(root))
+        finally:
+            current.close()
+    
+    def test_get_empty_candidates_page(self):
+        """Test keyset pagination walks all candidates deep to shallow"""
+        for i in range(7):
+            path = f"C:\\Test\\Empty{i}"
+            self.db.add_folder(path, i % 3 + 1)
+            self.db.update_folder_stats(path, 0)
+        self.db.add_folder("C:\\Test\\NotEmpty", 2)
+        self.db.update_folder_stats("C:\\Test\\NotEmpty", 3)
+        self.db.commit()
+        
+        self.assertEqual(self.db.count_empty_candidates(0), 7)
+        
+        seen = []
+        after = None
+        while True:
+            page = self.db.get_empty_candidates_page(0, after, limit=3)
+            if not page:
+                break
+            self.assertLessEqual(len(page), 3)
+            seen.extend(page)
+            after = (page[-1][2], page[-1][0])
+        
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len({row[1] for row in seen}), 7)
+        depths = [row[2] for row in seen]
+        self.assertEqual(depths, sorted(depths, reverse=True))
+        self.assertEqual({row[1] for row in seen}, set(self.db.get_empty_candidates(0)))
+    
+    def test_get_errors_page(self):
+        """Test keyset pagination over errors"""
+        for i in range(5):
+            path = f"C:\\Test\\Error{i}"
             self.db.add_folder(path, 1)
-            self.db.log_error(path, msg)
+            self.db.log_error(path, "Access Denied")
         self.db.commit()
         
-        error_list = self.db.get_errors()
+        self.assertEqual(self.db.count_errors(), 5)
+        first = self.db.get_errors_page(limit=2)
+        second = self.db.get_errors_page(first[-1][0], limit=2)
+        third = self.db.get_errors_page(second[-1][0], limit=2)
         
-        self.assertEqual(len(error_list), 2)
+        self.assertEqual([len(first), len(second), len(third)], [2, 2, 1])
+        paths = [row[1] for row in first + second + third]
+        self.assertEqual(len(set(paths)), 5)
+
+    def test_commit_snapshots_checkpoint_under_lock(self):
+        """Test a checkpoint callable runs while the commit holds the database lock"""
+        lock_free = []
+
+        def snapshot():
+            probe = threading.Thread(target=lambda: lock_free.append(self.db.lock.acquire(blocking=False)))
+            probe.start()
+            probe.join()
+            return {'elapsed_seconds': 1.0, 'scanned': 2, 'in_flight': [("C:\\Busy", 1)]}
+
+        self.db.commit(checkpoint=snapshot)
+        self.assertEqual(lock_free, [False])
+        checkpoint = self.db.load_checkpoint()
+        self.assertEqual((checkpoint['scanned'], checkpoint['in_flight']), (2, [("C:\\Busy", 1)]))
+
+    def test_get_pending_depths(self):
+        """Test pending folders are counted per depth; scanned ones drop out"""
+        for path, depth in (("C:\\A", 1), ("C:\\B", 1), ("C:\\A\\C", 2)):
+            self.db.add_folder(path, depth)
+        self.db.update_folder_stats("C:\\B", 0)
+        self.assertEqual(self.db.get_pending_depths(), {1: 1, 2: 1})
+
+    def test_status_changes_skip_row_lookup(self):
+        """Test scan and cleanup status changes are a single guarded UPDATE; rescans fall back to a lookup"""
+        self.db.add_folder("C:\\Empty", 1)
+        self.db.add_folder("C:\\Full", 1)
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        self.db.update_folder_stats("C:\\Empty", 0)
+        self.db.update_folder_stats("C:\\Full", 2, size_bytes=10)
+        self.db.mark_would_delete("C:\\Empty")
+        self.db.conn.set_trace_callback(None)
+        self.assertFalse([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")])
+
+        # A rescan of an already scanned folder misses the guard and still keeps the counters right
+        self.db.update_folder_stats("C:\\Full", 3, size_bytes=4)
+        stats = self.db.get_statistics()
+        self.assertEqual((stats['total_scanned'], stats['total_would_delete'], stats['total_pending']), (1, 1, 0))
+        self.assertEqual(stats['total_bytes'], 4)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,333 @@
+"""Tests for filesystem backends and scanning an in-memory tree"""
+import argparse
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from common.constants import SIM_NFS_JITTER_MS, SIM_NFS_RTT_MS
+from utils.filesystem import LOCAL_FS, FileSystem, LocalFileSystem, MemoryFileSystem
+from utils.fs_simulator import HddLatency, LatencyModel, NfsLatency, SimulatedFileSystem, SsdLatency
+from utils.tree_estimator import TreeSizeEstimator
+
+MEM_ROOT = os.path.join(os.sep, "vw_memory_root")
+
+
+def _build_tree():
+    """Same layout as the integration tests' mock filesystem, plus a symlink"""
+    fs = MemoryFileSystem(MEM_ROOT)
+    for folder in ("empty1", "empty2", "with_file", "nested/empty_deep", "nested/with_file_deep",
+                   "multi_level/level1/level2/level3/empty_deep_nested"):
+        fs.makedirs(os.path.join(MEM_ROOT, *folder.split("/")))
+    fs.add_file(os.path.join(MEM_ROOT, "with_file", "file.txt"), 7)
+    fs.add_file(os.path.join(MEM_ROOT, "nested", "with_file_deep", "data.dat"), 6)
+    fs.symlink(os.path.join(MEM_ROOT, "link_to_empty1"))
+    return fs
+
+
+class TestMemoryFileSystem(unittest.TestCase):
+    """Test MemoryFileSystem mirrors the os calls the engine relies on"""
+
+    def setUp(self):
+        self.fs = _build_tree()
+
+    def test_scandir_entries(self):
+        """Test entry kinds, paths and file sizes"""
+        with self.fs.scandir(MEM_ROOT) as it:
+            entries = {entry.name: entry for entry in it}
+        self.assertTrue(entries["empty1"].is_dir())
+        self.assertEqual(entries["empty1"].path, os.path.join(MEM_ROOT, "empty1"))
+        self.assertTrue(entries["link_to_empty1"].is_symlink())
+        self.assertFalse(entries["link_to_empty1"].is_dir())
+
+        files = list(self.fs.scandir(os.path.join(MEM_ROOT, "with_file")))
+        self.assertTrue(files[0].is_file(follow_symlinks=False))
+        self.assertEqual(files[0].stat(follow_symlinks=False).st_size, 7)
+
+    def test_errors_match_os(self):
+        """Test missing, non-directory and denied paths raise the os exception types"""
+        with self.assertRaises(FileNotFoundError):
+            self.fs.listdir(os.path.join(MEM_ROOT, "missing"))
+        with self.assertRaises(NotADirectoryError):
+            self.fs.scandir(os.path.join(MEM_ROOT, "with_file", "file.txt"))
+        self.fs.deny(os.path.join(MEM_ROOT, "nested"))
+        with self.assertRaises(PermissionError):
+            self.fs.scandir(os.path.join(MEM_ROOT, "nested"))
+        with self.assertRaises(OSError):
+            self.fs.rmdir(os.path.join(MEM_ROOT, "with_file"))
+
+    def test_rmdir_and_counts(self):
+        """Test removing an empty folder updates existence and totals"""
+        self.assertEqual(self.fs.counts(), {"folders": 12, "files": 2, "empty": 4})
+        level3 = os.path.join(MEM_ROOT, "multi_level", "level1", "level2", "level3")
+        self.fs.rmdir(os.path.join(level3, "empty_deep_nested"))
+        self.assertFalse(self.fs.exists(os.path.join(level3, "empty_deep_nested")))
+        self.assertEqual(self.fs.listdir(level3), [])
+        self.assertEqual(self.fs.counts(), {"folders": 11, "files": 2, "empty": 4})
+
+    def test_local_backend_delegates_to_os(self):
+        """Test the disk backend sees a real directory"""
+        root = tempfile.mkdtemp(prefix="void_walker_fs_")
+        try:
+            os.mkdir(os.path.join(root, "child"))
+            self.assertEqual(LOCAL_FS.listdir(root), ["child"])
+            LOCAL_FS.rmdir(os.path.join(root, "child"))
+            self.assertFalse(LOCAL_FS.exists(os.path.join(root, "child")))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    def test_incomplete_backend_rejected(self):
+        """Test a backend missing an operation fails when created, not mid-scan"""
+        class ReadOnly(LocalFileSystem):
+            rmdir = FileSystem.rmdir  # Still abstract
+
+        class ScandirOnly(FileSystem):
+            def scandir(self, path):
+                return LOCAL_FS.scandir(path)
+
+        for backend in (ReadOnly, ScandirOnly, FileSystem):
+            with self.assertRaises(TypeError):
+                backend()
+
+
+class TestEngineOnMemoryFileSystem(unittest.TestCase):
+    """Test the engine scans and cleans an injected in-memory tree"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="void_walker_memfs_")
+        self.fs = _build_tree()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _engine(self, delete, fs=None, strategy="bfs", workers=2, root=MEM_ROOT, session_id=None, prioritize=False,
+                scan=True):
+        from config.settings import Config
+        from core.engine import Engine
+
+        args = argparse.Namespace(
+            path=root, delete=delete, resume=False, disk="ssd", strategy=strategy, workers=workers,
+            min_depth=0, max_depth=100, exclude_path=[], exclude_name=[], include_name=[]
+        )
+        config = Config(args)
+        config.db_path = os.path.join(self.work_dir, "memfs.db")
+        config.session_id = session_id or config.session_id
+        config.prioritize = prioritize
+        logger = logging.getLogger("VoidWalker.test_memfs")
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+        engine = Engine(config, logger, fs=fs or self.fs)
+        engine.dashboard.active = False
+        engine.db.setup()
+        config.save_to_db(engine.db)
+        engine._load_priorities()
+        engine._enqueue(root, 0)
+        engine.db.add_folder(root, 0)
+        if scan:
+            engine._process_queue()
+        return engine
+
+    def test_scan_finds_empty_folders(self):
+        """Test counts and empty candidates come from the injected tree"""
+        engine = self._engine(delete=False)
+        try:
+            self.assertEqual(engine.total_scanned, 12)  # The symlink is not followed
+            self.assertEqual(engine.total_empty, 4)
+            self.assertEqual(engine.total_bytes, 13)
+            self.assertEqual(len(engine.db.get_empty_candidates(0)), 4)
+        finally:
+            engine.db.close()
+
+    def test_hybrid_pop_order(self):
+        """Test hybrid widens from the shallow end until the frontier is full, then goes deep"""
+        engine = self._engine(delete=False, strategy="hybrid")
+        try:
+            engine.hybrid_frontier = 3
+            engine.queue.extend([("a", 1), ("b", 1), ("a/x", 2)])
+            self.assertEqual(engine._pop_next(), ("a/x", 2))
+            self.assertEqual(engine._pop_next(), ("a", 1))
+            self.assertEqual(engine._pop_next(), ("b", 1))
+        finally:
+            engine.db.close()
+
+    def test_hybrid_bounds_frontier(self):
+        """Test hybrid scans the same tree as BFS while keeping a smaller queue"""
+        from ui.dashboard import Dashboard
+
+        root = os.path.join(os.sep, "vw_hybrid_root")
+        fs = MemoryFileSystem(root)
+        for path in itertools.product("abcd", repeat=3):
+            fs.makedirs(os.path.join(root, *path))
+        peaks = {}
+        for strategy in ("bfs", "hybrid"):
+            depths = []
+            with mock.patch.object(Dashboard, "set_queue_depth", lambda _self, depth: depths.append(depth)):
+                engine = self._engine(delete=False, fs=fs, strategy=strategy, workers=1, root=root)
+            engine.db.close()
+            os.remove(os.path.join(self.work_dir, "memfs.db"))
+            self.assertEqual(engine.total_scanned, 1 + 4 + 16 + 64)
+            peaks[strategy] = max(depths)
+        self.assertLess(peaks["hybrid"], peaks["bfs"])
+
+    def test_prioritize_scans_prior_empties_first(self):
+        """Test subtrees that held empties last time are scanned before the rest"""
+        from ui.dashboard import Dashboard
+
+        orders = {}
+        for session_id, prioritize in (("session_prior", False), ("session_next", True)):
+            order = []
+            with mock.patch.object(Dashboard, "update_current", lambda _self, path: order.append(path)):
+                engine = self._engine(delete=False, workers=1, session_id=session_id, prioritize=prioritize)
+            engine.db.close()
+            orders[session_id] = [os.path.relpath(path, MEM_ROOT) for path in order]
+
+        self.assertEqual(engine.priorities.session_id, "session_prior")
+        self.assertIn("with_file", orders["session_prior"][1:5])
+        self.assertEqual(set(orders["session_next"][1:5]), {"empty1", "empty2", "nested", "multi_level"})
+        self.assertEqual(len(orders["session_next"]), 12)
+
+    def test_frontier_snapshot_and_estimator(self):
+        """Test pending folders are counted per depth from the DB and the estimator sees the finished scan"""
+        engine = self._engine(delete=False)
+        try:
+            self.assertEqual(engine._frontier_snapshot(), (12, {}))
+            # Pending rows count whether or not they are paged into the in-memory queue
+            engine.db.add_folder("a", 1)
+            engine.db.add_folder("b", 2)
+            engine._enqueue("b", 2)
+            self.assertEqual(engine._frontier_snapshot(), (12, {1: 1, 2: 1}))
+
+            engine.estimator = TreeSizeEstimator(MEM_ROOT, fs=self.fs, progress=lambda: (12, {}))
+            engine.estimator.add_probes(40)
+            engine.estimator.refresh()
+            engine._stop_estimator()
+            self.assertIsNone(engine.estimator)
+            self.assertIsNone(engine.dashboard.size_estimate)
+        finally:
+            engine.db.close()
+
+    def test_checkpoint_race_with_row_write(self):
+        """Test a commit arriving between a folder's SCANNED row and its totals still checkpoints both"""
+        engine = self._engine(delete=False, scan=False)
+        engine.scan_start_time = time.time()
+        committers = []
+        record_totals = engine._count_scanned
+
+        def racing_count(folder_size, empty):
+            committer = threading.Thread(target=engine.db.commit, kwargs={'checkpoint': engine._checkpoint_state})
+            committer.start()
+            committer.join(0.2)  # Blocked on the DB lock until the totals are in
+            committers.append(committer)
+            record_totals(folder_size, empty)
+
+        try:
+            with mock.patch.object(engine, "_count_scanned", side_effect=racing_count):
+                engine._scan_folder(MEM_ROOT, 0)
+            committers[0].join()
+            self.assertEqual(engine.db.load_checkpoint()['scanned'], 1)
+            self.assertEqual(engine.db.get_statistics()['total_scanned'], 1)
+        finally:
+            engine.db.close()
+
+    def test_delete_mode_removes_from_memory(self):
+        """Test cleanup deletes through the backend, never touching disk"""
+        engine = self._engine(delete=True)
+        try:
+            engine._process_cleanup()
+            self.assertEqual(engine.total_deleted, 4)
+            self.assertFalse(self.fs.exists(os.path.join(MEM_ROOT, "empty1")))
+            self.assertTrue(self.fs.exists(os.path.join(MEM_ROOT, "with_file")))
+        finally:
+            engine.db.close()
+
+    def test_scan_through_simulated_latency(self):
+        """Test a latency-wrapped tree scans identically and records device time"""
+        simulated = SimulatedFileSystem(self.fs, HddLatency(root=MEM_ROOT), time_scale=0)
+        engine = self._engine(delete=False, fs=simulated)
+        try:
+            self.assertEqual((engine.total_scanned, engine.total_empty), (12, 4))
+            stats = simulated.stats()
+            self.assertEqual(stats["calls"]["scandir"], 12)
+            self.assertGreater(stats["simulated_seconds"], 0)
+        finally:
+            engine.db.close()
+
+
+class TestLatencyModels(unittest.TestCase):
+    """Test the simulated device latency models"""
+
+    def test_hdd_children_lie_near_parent(self):
+        """Test a subdirectory is closer to its parent than an unrelated top-level folder"""
+        hdd = HddLatency(root=MEM_ROOT)
+        parent = hdd.position(os.path.join(MEM_ROOT, "a"))
+        child = hdd.position(os.path.join(MEM_ROOT, "a", "b"))
+        other = hdd.position(os.path.join(MEM_ROOT, "zz_other"))
+        self.assertLess(abs(child - parent), abs(other - parent))
+        self.assertEqual(hdd.position(MEM_ROOT), 0.0)
+
+    def test_hdd_seek_cost_grows_with_distance(self):
+        """Test near listings cost less than far ones and metadata calls are cached"""
+        hdd = HddLatency(root=MEM_ROOT)
+        hdd.delay("scandir", os.path.join(MEM_ROOT, "a"))
+        near, _ = hdd.delay("scandir", os.path.join(MEM_ROOT, "a", "b"))
+        hdd.delay("scandir", os.path.join(MEM_ROOT, "a"))
+        far, _ = hdd.delay("scandir", os.path.join(MEM_ROOT, "zz_other"))
+        cached, _ = hdd.delay("is_link", os.path.join(MEM_ROOT, "zz_other", "x"))
+        self.assertLess(near, far)
+        self.assertLess(cached, near)
+
+    def test_nfs_listing_pages(self):
+        """Test large listings cost one round trip per READDIRPLUS page"""
+        seconds, _ = NfsLatency(seed=1).delay("scandir", MEM_ROOT, entries=250)
+        self.assertGreaterEqual(seconds, 3 * SIM_NFS_RTT_MS / 1000)
+        self.assertLessEqual(seconds, 3 * (SIM_NFS_RTT_MS + SIM_NFS_JITTER_MS) / 1000)
+
+    def test_stall_injection(self):
+        """Test stalled calls add the stall time and are counted"""
+        slept = []
+        fs = SimulatedFileSystem(_build_tree(), LatencyModel(stall_rate=1.0, stall_seconds=2.0), sleep=slept.append)
+        fs.listdir(MEM_ROOT)
+        fs.exists(MEM_ROOT)
+        self.assertEqual(slept, [2.0, 2.0])
+        self.assertEqual(fs.stats()["stalls"], 2)
+
+    def test_errors_are_charged_and_raised(self):
+        """Test a failing call still costs device time"""
+        fs = SimulatedFileSystem(_build_tree(), NfsLatency(), time_scale=0)
+        with self.assertRaises(FileNotFoundError):
+            fs.scandir(os.path.join(MEM_ROOT, "missing"))
+        self.assertEqual(fs.stats()["calls"], {"scandir": 1})
+
+    def _max_concurrency(self, model):
+        active = [0, 0]  # current, peak
+        lock = threading.Lock()
+
+        def sleep(seconds):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+        fs = SimulatedFileSystem(_build_tree(), model, sleep=sleep)
+        threads = [threading.Thread(target=fs.listdir, args=(MEM_ROOT,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return active[1]
+
+    def test_device_concurrency(self):
+        """Test an HDD serves one call at a time while an SSD overlaps them"""
+        self.assertEqual(self._max_concurrency(HddLatency(root=MEM_ROOT)), 1)
+        self.assertGreater(self._max_concurrency(SsdLatency()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
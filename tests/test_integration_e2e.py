@@ -342,5 +342,56 @@ class TestStrategySelection(unittest.TestCase):
         self.assertEqual(config.strategy, "DFS")
 
 
+class TestMainSummary(unittest.TestCase):
+    """Test the summary main.py prints after an interactive scan"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, "root")
+        os.makedirs(os.path.join(self.root, "empty1"))
+        os.makedirs(os.path.join(self.root, "full"))
+        os.makedirs(os.path.join(self.root, "nest", "deep1"))
+        os.makedirs(os.path.join(self.root, "nest", "deep2"))
+        Path(self.root, "full", "file.txt").write_text("data")
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run_main(self):
+        """Run the CLI on the tree (declining every prompt) and return its session report"""
+        import main
+        from unittest import mock
+
+        output = StringIO()
+        argv = ["main.py", self.root, "--disk", "ssd", "--workers", "2", "--no-tuning", "--no-estimate"]
+        with mock.patch.object(sys, "argv", argv), mock.patch("builtins.input", return_value="n"), \
+                mock.patch("core.controller.Controller.start"), mock.patch.object(sys, "stdout", output):
+            main.main()
+        return output.getvalue().split("SESSION REPORT", 1)[1]
+
+    def test_summary_shows_scan_profile(self):
+        """Test the CLI session report includes the scan time breakdown and slowest directories"""
+        report = self._run_main()
+        self.assertIn("Scan Time:", report)
+        self.assertIn("Slowest", report)
+        self.assertIn("Largest", report)
+
+    def test_summary_drills_into_empty_folders(self):
+        """Test the CLI session report ranks the root's children by empty folders, one level deep"""
+        report = self._run_main()
+        self.assertIn("Most Empty Folders Under Root:", report)
+        self.assertIn(f"1. {os.path.join(self.root, 'nest')}  (2 empty)", report)
+        self.assertIn(f"> {os.path.join(self.root, 'nest', 'deep1')}  (1 empty)", report)
+
+    def test_summary_shows_subtree_rollups(self):
+        """Test the CLI session report ranks the root's subtrees by size from the rollups"""
+        report = self._run_main()
+        self.assertIn("Largest Subtrees Under Root:", report)
+        self.assertIn(f"1. {os.path.join(self.root, 'full')}  (0.0 MB)", report)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,70 @@
+"""Tests for queue-based session logging"""
+import logging
+import logging.handlers
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import utils.logger
+from utils.logger import setup_logger, shutdown_logger
+
+
+class TestSessionLogger(unittest.TestCase):
+    """Test setup_logger's background writer, level control and rotation"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp(prefix="void_walker_log_")
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        shutdown_logger()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read_log(self, session_id):
+        with open(os.path.join("logs", f"{session_id}.log"), encoding="utf-8") as f:
+            return f.read()
+
+    def test_records_written_by_background_listener(self):
+        """Test the logger only enqueues and the listener writes on shutdown"""
+        logger = setup_logger("session_q")
+        self.assertEqual([type(h) for h in logger.handlers], [logging.handlers.QueueHandler])
+
+        logger.info("Scanned %d folders", 42)
+        shutdown_logger()
+
+        self.assertIn("INFO: Scanned 42 folders", self._read_log("session_q"))
+
+    def test_level_filters_and_formatting_is_lazy(self):
+        """Test disabled levels never format their arguments"""
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted a disabled record")
+
+        logger = setup_logger("session_lvl", "warning")
+        logger.debug("Skipping %s", Exploding())
+        logger.info("Not recorded")
+        logger.warning("Recorded %s", "warning")
+        shutdown_logger()
+
+        log = self._read_log("session_lvl")
+        self.assertNotIn("Not recorded", log)
+        self.assertIn("WARNING: Recorded warning", log)
+
+    def test_log_file_rotates(self):
+        """Test the session log rolls over once it exceeds the size limit"""
+        with patch.object(utils.logger, "LOG_MAX_BYTES", 500), patch.object(utils.logger, "LOG_BACKUP_COUNT", 2):
+            logger = setup_logger("session_rot")
+            for i in range(100):
+                logger.info("Progress saved: %d folders scanned", i)
+            shutdown_logger()
+
+        files = sorted(os.listdir("logs"))
+        self.assertEqual(files, ["session_rot.log", "session_rot.log.1", "session_rot.log.2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,408 @@
+"""Tests for utils.metrics and the dashboard counters built on it"""
+import unittest
+import threading
+import time
+import argparse
+import os
+import socket
+import tempfile
+import urllib.request
+from types import SimpleNamespace
+
+from utils.metrics import ShardedCounters, RateHistory, ShardedHistogram, ShardedTopN, log_buckets
+from utils.prometheus import render_metrics, MetricsExporter
+from utils.scan_profile import ScanProfile, DeviceResolver, depth_bucket
+from utils.profiling import PhaseProfiler, profiled_phase
+from utils.tracing import Tracer, TracedLock, NULL_TRACER
+from utils.lock_profiler import LockProfiler
+from ui.dashboard import Dashboard
+
+
+class TestShardedCounters(unittest.TestCase):
+    """Test per-thread sharded counters"""
+
+    def test_concurrent_increments_are_not_lost(self):
+        """Test increments from many threads all land in the snapshot"""
+        counters = ShardedCounters(["scanned", "errors"])
+
+        def work():
+            for _ in range(1000):
+                counters.add("scanned")
+            counters.add("errors", 5)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(counters.snapshot(), {"scanned": 8000, "errors": 40})
+
+    def test_snapshot_without_writes(self):
+        """Test an unused counter set reports zeros"""
+        counters = ShardedCounters(["a", "b"])
+        self.assertEqual(counters.snapshot(), {"a": 0, "b": 0})
+
+
+class TestRateHistory(unittest.TestCase):
+    """Test per-second history, windowed rates and ETA"""
+
+    def _feed(self, history, per_second, queue_start, queue_step, seconds, start=1000):
+        for i in range(seconds + 1):
+            history.record(start + i, {"scanned": per_second * i, "queue": queue_start + queue_step * i})
+
+    def test_windowed_rate_tracks_recent_throughput(self):
+        """Test a slowdown shows up in the short window but not the lifetime average"""
+        history = RateHistory(capacity=300)
+        for i in range(61):
+            history.record(1000 + i, {"scanned": 100 * i, "queue": 0})
+        for i in range(1, 11):
+            history.record(1060 + i, {"scanned": 6000 + 10 * i, "queue": 0})
+
+        self.assertAlmostEqual(history.rate("scanned", 10), 10.0)
+        self.assertGreater(history.rate("scanned", 60), 10.0)
+        self.assertLess(history.ewma("scanned"), 100.0)
+
+    def test_samples_bucketed_per_second(self):
+        """Test several ticks in one second keep a single sample"""
+        history = RateHistory(capacity=5)
+        for tick in range(5):
+            history.record(1000 + tick * 0.2, {"scanned": tick, "queue": 0})
+        self.assertEqual(len(history.samples), 1)
+
+        self._feed(history, 1, 0, 0, 20, start=2000)
+        self.assertEqual(len(history.samples), 5)
+
+    def test_eta_accounts_for_frontier_growth(self):
+        """Test ETA is unknown while the frontier grows and queue/drain once it shrinks"""
+        growing = RateHistory()
+        self._feed(growing, 50, 100, 5, 30)
+        self.assertIsNone(growing.eta_seconds("queue", 60))
+
+        draining = RateHistory()
+        self._feed(draining, 50, 1000, -10, 30)
+        # 700 left, draining at 10/s net
+        self.assertAlmostEqual(draining.eta_seconds("queue", 60), 70.0)
+
+    def test_sparkline(self):
+        """Test the sparkline scales per-second deltas to block characters"""
+        history = RateHistory()
+        values = [0, 1, 3, 6, 14]
+        for i, value in enumerate(values):
+            history.record(1000 + i, {"scanned": value})
+        history.record(1005, {"scanned": 20})
+
+        self.assertEqual(history.sparkline("scanned", 10), "▁▂▃█")
+
+
+class TestShardedHistogram(unittest.TestCase):
+    """Test per-thread histogram buckets"""
+
+    def test_observations_land_in_le_buckets(self):
+        """Test values go to the first bound they do not exceed, overflow to +Inf"""
+        histogram = ShardedHistogram(log_buckets(1, 10, 3))  # 1, 10, 100
+        for value in (0.5, 1, 5, 100, 1000):
+            histogram.observe(value)
+
+        data = histogram.snapshot()[()]
+        self.assertEqual(data['buckets'], [2, 1, 1, 1])
+        self.assertEqual(data['count'], 5)
+        self.assertAlmostEqual(data['sum'], 1106.5)
+
+    def test_labels_and_threads_merge(self):
+        """Test shards from several threads merge per label tuple"""
+        histogram = ShardedHistogram([1.0])
+
+        def work():
+            for _ in range(100):
+                histogram.observe(0.5, ("a",))
+            histogram.observe(2.0, ("b",))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot[("a",)]['buckets'], [400, 0])
+        self.assertEqual(snapshot[("b",)]['buckets'], [0, 4])
+
+
+class TestScanProfile(unittest.TestCase):
+    """Test per-directory profiling aggregates"""
+
+    def test_top_n_keeps_largest_across_threads(self):
+        """Test each thread's heap is merged into a global top-N"""
+        top = ShardedTopN(3)
+
+        def work(offset):
+            for i in range(100):
+                top.offer(i * 10 + offset, f"dir{offset}-{i}")
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual([key for key, _ in top.top()], [993, 992, 991])
+
+    def test_depth_bucket(self):
+        """Test depths fall into power-of-two bands"""
+        self.assertEqual([depth_bucket(d) for d in (0, 1, 2, 3, 4, 7, 8, 100)],
+                         ["0", "1", "2-3", "2-3", "4-7", "4-7", "8-15", "64+"])
+
+    def test_device_resolver(self):
+        """Test drive letters and longest mount point prefixes label devices"""
+        resolver = DeviceResolver(["/mnt/data", "/mnt", "/"])
+        self.assertEqual(resolver.device_of("/mnt/data/x/y"), "/mnt/data")
+        self.assertEqual(resolver.device_of("/mnt/database"), "/mnt")
+        self.assertEqual(resolver.device_of("/home/user"), "/")
+
+    def test_record_tracks_phases_and_extremes(self):
+        """Test phase totals, slowest and largest directories"""
+        profile = ScanProfile(top_n=2, resolver=DeviceResolver(["/"]))
+        profile.record("/a", 1, 10, 0.010, 0.002, 0.001)
+        profile.record("/b", 1, 5000, 0.500, 0.100, 0.010)
+        profile.record("/c", 2, 50, 0.001, 0.001, 0.000)
+
+        totals = profile.phase_totals()
+        self.assertAlmostEqual(totals["enumerate"], 0.511)
+        self.assertAlmostEqual(totals["db"], 0.103)
+        self.assertEqual([item[0] for _, item in profile.slowest.top()], ["/b", "/a"])
+        self.assertEqual([(entries, item[0]) for entries, item in profile.largest.top()],
+                         [(5000, "/b"), (50, "/c")])
+
+
+class TestPrometheusExport(unittest.TestCase):
+    """Test Prometheus text rendering and the exporter outputs"""
+
+    def _engine(self):
+        dashboard = Dashboard(argparse.Namespace(workers=2))
+        dashboard.increment_scanned(time.time())
+        dashboard.increment_empty()
+        dashboard.set_queue_depth(3)
+        profile = ScanProfile(resolver=DeviceResolver(["/"]))
+        profile.record("/data/a", 3, 12, 0.002, 0.0005, 0.0001)
+        db = SimpleNamespace(write_latency=ShardedHistogram([0.001, 0.01]),
+                             commit_latency=ShardedHistogram([0.001, 0.01]))
+        db.commit_latency.observe(0.005)
+        return SimpleNamespace(config=SimpleNamespace(session_id="session_x"), dashboard=dashboard,
+                               profile=profile, db=db, lock=threading.Lock(), in_flight={"/a": 1, "/b": 2},
+                               logger=SimpleNamespace(warning=lambda msg: None))
+
+    def test_render_metrics(self):
+        """Test counters, gauges and cumulative histogram buckets are exposed"""
+        text = render_metrics(self._engine())
+
+        self.assertIn('voidwalker_folders_scanned_total{session="session_x"} 1', text)
+        self.assertIn('voidwalker_empty_folders_total{session="session_x"} 1', text)
+        self.assertIn('voidwalker_queue_depth{session="session_x"} 3', text)
+        self.assertIn('voidwalker_active_workers{session="session_x"} 2', text)
+        self.assertIn('# TYPE voidwalker_scandir_seconds histogram', text)
+        self.assertIn('voidwalker_scandir_seconds_count{session="session_x",depth="2-3",device="/"} 1', text)
+        self.assertIn('voidwalker_db_commit_seconds_bucket{session="session_x",le="0.001"} 0', text)
+        self.assertIn('voidwalker_db_commit_seconds_bucket{session="session_x",le="0.01"} 1', text)
+        self.assertIn('voidwalker_db_commit_seconds_bucket{session="session_x",le="+Inf"} 1', text)
+        self.assertIn('voidwalker_db_commit_seconds_count{session="session_x"} 1', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_textfile_exporter_writes_atomically(self):
+        """Test the textfile is written on stop with no temp file left behind"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            textfile = os.path.join(temp_dir, "voidwalker.prom")
+            exporter = MetricsExporter(self._engine(), textfile=textfile, interval=60)
+            exporter.start()
+            exporter.stop()
+
+            with open(textfile, encoding="utf-8") as f:
+                self.assertIn("voidwalker_folders_scanned_total", f.read())
+            self.assertEqual(os.listdir(temp_dir), ["voidwalker.prom"])
+
+    def test_http_exporter_serves_metrics(self):
+        """Test the localhost endpoint renders metrics per scrape"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        exporter = MetricsExporter(self._engine(), port=port)
+        exporter.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+            self.assertIn('voidwalker_active_workers{session="session_x"} 2', body)
+        finally:
+            exporter.stop()
+
+
+def _busy_worker(n):
+    return sum(i * i for i in range(n))
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    """Test --profile output"""
+
+    def test_phase_merges_worker_threads_and_writes_reports(self):
+        """Test worker-thread calls appear in the merged pstats next to the text reports"""
+        import pstats
+        from concurrent.futures import ThreadPoolExecutor
+
+        class Runner:
+            def __init__(self, profiler):
+                self.profiler = profiler
+
+            @profiled_phase("scan")
+            def scan_only(self):
+                task = self.profiler.wrap(_busy_worker)
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    list(executor.map(task, [2000] * 4))
+                self.profiler.snapshot_memory()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = PhaseProfiler("session_x", memory=True, log_dir=temp_dir)
+            Runner(profiler).scan_only()
+
+            self.assertEqual(sorted(os.listdir(temp_dir)),
+                             ["session_x_scan.pstats", "session_x_scan_alloc.txt", "session_x_scan_profile.txt"])
+            stats = pstats.Stats(os.path.join(temp_dir, "session_x_scan.pstats"))
+            calls = [key for key in stats.stats if key[2] == "_busy_worker"]
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(stats.stats[calls[0]][1], 4)  # Primitive call count across threads
+
+    def test_decorator_is_transparent_without_profiler(self):
+        """Test profiled methods run normally when profiling is off"""
+        class Runner:
+            profiler = None
+
+            @profiled_phase("scan")
+            def scan_only(self):
+                return 42
+
+        self.assertEqual(Runner().scan_only(), 42)
+
+
+class TestTracer(unittest.TestCase):
+    """Test Chrome trace-event recording"""
+
+    def test_spans_per_thread_become_complete_events(self):
+        """Test each thread gets a named track with X events in microseconds"""
+        tracer = Tracer()
+
+        def work():
+            with tracer.span("scan", "engine", path="/x"):
+                time.sleep(0.001)
+
+        threads = [threading.Thread(target=work, name=f"worker-{i}") for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        events = tracer.to_trace_events()["traceEvents"]
+        names = sorted(e["args"]["name"] for e in events if e["ph"] == "M")
+        spans = [e for e in events if e["ph"] == "X"]
+        self.assertEqual(names, ["worker-0", "worker-1"])
+        self.assertEqual(len(spans), 2)
+        self.assertEqual(len({e["tid"] for e in spans}), 2)
+        self.assertGreaterEqual(spans[0]["dur"], 1000)
+        self.assertEqual(spans[0]["args"], {"path": "/x"})
+
+    def test_traced_lock_records_only_contended_waits(self):
+        """Test a blocked acquisition shows up as a lock wait span"""
+        tracer = Tracer()
+        lock = TracedLock(threading.Lock(), tracer, "db.lock_wait")
+        with lock:
+            pass  # Uncontended: not recorded
+
+        lock.acquire()
+        waiter = threading.Thread(target=lambda: lock.__enter__() and lock.release())
+        waiter.start()
+        time.sleep(0.02)
+        lock.release()
+        waiter.join()
+
+        waits = [e for e in tracer.to_trace_events()["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual([e["name"] for e in waits], ["db.lock_wait"])
+        self.assertGreater(waits[0]["dur"], 10000)
+
+    def test_null_tracer_writes_nothing(self):
+        """Test disabled tracing is a no-op"""
+        with NULL_TRACER.span("scan", path="/x"):
+            pass
+        self.assertFalse(NULL_TRACER.enabled)
+
+
+class TestLockProfiler(unittest.TestCase):
+    """Test instrumented-lock contention statistics"""
+
+    def test_wait_and_hold_recorded_per_site(self):
+        """Test a blocked waiter is counted as contended at its own call site"""
+        profiler = LockProfiler()
+        lock = profiler.wrap(threading.Lock(), "Engine.queue_lock")
+
+        def holder():
+            with lock:
+                time.sleep(0.03)
+
+        def waiter():
+            with lock:
+                pass
+
+        first = threading.Thread(target=holder)
+        first.start()
+        time.sleep(0.01)
+        second = threading.Thread(target=waiter)
+        second.start()
+        first.join()
+        second.join()
+
+        stats = profiler.snapshot()
+        sites = {site.split(":")[0]: cells for (_, site), cells in stats.items()}
+        self.assertEqual(set(sites), {"TestLockProfiler.test_wait_and_hold_recorded_per_site.holder",
+                                      "TestLockProfiler.test_wait_and_hold_recorded_per_site.waiter"})
+        holder_cells = sites["TestLockProfiler.test_wait_and_hold_recorded_per_site.holder"]
+        waiter_cells = sites["TestLockProfiler.test_wait_and_hold_recorded_per_site.waiter"]
+        self.assertEqual(waiter_cells[:2], [1, 1])  # Acquired once, contended once
+        self.assertGreater(waiter_cells[2], 5_000_000)  # Waited > 5ms
+        self.assertGreater(holder_cells[4], 20_000_000)  # Held > 20ms
+
+    def test_reentrant_hold_counted_once(self):
+        """Test nested RLock acquisitions count as acquisitions but one hold"""
+        profiler = LockProfiler()
+        lock = profiler.wrap(threading.RLock(), "Dashboard.lock")
+        with lock:
+            with lock:
+                pass
+
+        cells = list(profiler.snapshot().values())
+        self.assertEqual(sum(c[0] for c in cells), 2)
+        self.assertEqual(sum(1 for c in cells if c[4] > 0), 1)
+        self.assertTrue(profiler.format_report())
+
+
+class TestDashboardMetrics(unittest.TestCase):
+    """Test the Dashboard API on top of sharded counters"""
+
+    def test_refresh_aggregates_counters_and_gauges(self):
+        """Test refresh_stats folds worker updates and restored progress together"""
+        dashboard = Dashboard(argparse.Namespace(workers=2))
+        dashboard.restore_progress(scanned=10, errors=1, elapsed_seconds=5.0)
+
+        start = time.time() - 5.0
+        dashboard.increment_scanned(start)
+        dashboard.increment_scanned(start)
+        dashboard.increment_empty()
+        dashboard.add_processed_size(2048)
+        dashboard.set_queue_depth(7)
+
+        stats = dashboard.refresh_stats()
+
+        self.assertEqual(stats["scanned"], 12)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["empty"], 1)
+        self.assertEqual(stats["total_size_bytes"], 2048)
+        self.assertEqual(stats["queue_depth"], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Tests for rolling --time-budget scans that continue across runs"""
+import contextlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from config.settings import Config
+from core.engine import Engine
+from data.database import Database
+from tests.test_config import MockArgs
+
+
+class TestTimeBudget(unittest.TestCase):
+    """Test a budgeted scan checkpoints its frontier and the next run picks it up"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp(prefix="void_walker_budget_")
+        self.root = os.path.join(self.temp_dir, "tree")
+        for branch in ("a", "b"):
+            for leaf in ("x", "y"):
+                os.makedirs(os.path.join(self.root, branch, leaf))
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _args(self, budget=1800, delete=False):
+        args = MockArgs(path=self.root, disk="ssd", strategy="bfs", workers=2, delete=delete)
+        args.time_budget = budget
+        return args
+
+    def _logger(self):
+        logger = logging.getLogger("VoidWalker.test_budget")
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+        return logger
+
+    def _run(self, expired=False, budget=1800, stopped=False, delete=False, unattended=False,
+             session_id=None, keep_open=False):
+        """One invocation (--time-budget 30m by default), scanning like Engine.scan_only without the UI"""
+        args = self._args(budget, delete)
+        args.unattended_delete = unattended
+        with contextlib.redirect_stdout(io.StringIO()):
+            config = Config(args)
+            config.session_id = session_id or config.session_id
+            engine = Engine(config, self._logger())
+            if expired:
+                engine.time_budget = 1e-6  # The window closes before the first folder is submitted
+            engine.running = not stopped
+            engine.dashboard.active = False
+            engine.db.setup()
+            if config.resume_mode:
+                engine._load_resume_state()
+            else:
+                config.save_to_db(engine.db)
+                engine._enqueue(config.root_path, 0)
+                engine.db.add_folder(config.root_path, 0)
+            engine._process_queue()
+            stats = engine.db.get_statistics()
+            if keep_open:
+                self.addCleanup(engine.db.close)
+            else:
+                engine.db.close()
+        return config, engine, stats
+
+    def test_rolling_cycle(self):
+        """Test budget expiry leaves the session open, the next run finishes it, then a new cycle starts"""
+        first, engine, stats = self._run(expired=True)
+        self.assertTrue(first.rolling)
+        self.assertFalse(engine.cycle_complete)
+        self.assertEqual((engine.total_scanned, stats['total_pending']), (0, 1))
+        self.assertIsNotNone(Database.get_last_incomplete_session(first.db_path, self.root))
+
+        second, engine, stats = self._run()
+        self.assertGreater(engine.deadline, time.time() + 1000)  # Budget counted from the start of scanning
+        self.assertTrue(second.resume_mode)
+        self.assertEqual((second.session_id, second.cycle), (first.session_id, 1))
+        self.assertTrue(engine.cycle_complete)
+        self.assertEqual((engine.total_scanned, engine.total_empty, stats['total_pending']), (7, 4, 0))
+        self.assertIsNone(Database.get_last_incomplete_session(second.db_path, self.root))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            third = Config(self._args())
+        self.assertFalse(third.resume_mode)
+        self.assertEqual(third.cycle, 2)
+
+    def test_stopped_scan_not_completed(self):
+        """Test a scan stopped without a budget keeps its session open for --resume"""
+        config, engine, stats = self._run(budget=0, stopped=True)
+        self.assertFalse(config.rolling)
+        self.assertEqual((engine.cycle_complete, stats['total_pending']), (False, 1))
+        self.assertEqual(Database.get_last_incomplete_session(config.db_path)['session_id'], config.session_id)
+
+    def test_start_skips_cleanup_until_cycle_complete(self):
+        """Test Engine.start only runs cleanup once the cycle has drained the tree"""
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            engine = Engine(Config(self._args(delete=True)), self._logger())
+            engine.time_budget = 1e-6  # The window closes before the first folder is submitted
+            with mock.patch.object(engine, "_process_cleanup") as cleanup, \
+                    mock.patch.object(engine.controller, "start"), \
+                    mock.patch.object(engine.dashboard, "start"):
+                engine.start()
+        self.assertFalse(engine.cycle_complete)
+        cleanup.assert_not_called()
+        self.assertNotIn("All phases complete", out.getvalue())
+
+    def _finish(self, config, engine):
+        """main.finish_rolling_window with cleanup_only run inline (no controller or dashboard threads)"""
+        from main import finish_rolling_window
+        with mock.patch.object(engine, "cleanup_only", side_effect=engine._process_cleanup), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return finish_rolling_window(config, engine, self._logger())
+
+    def test_rolling_delete_needs_opt_in(self):
+        """Test a finished --time-budget --delete cycle only reports unless --unattended-delete is given"""
+        empty_leaf = os.path.join(self.root, "a", "x")
+        config, engine, _stats = self._run(delete=True, keep_open=True)
+        self.assertTrue(self._finish(config, engine))
+        self.assertTrue(os.path.isdir(empty_leaf))
+        self.assertFalse(config.delete_mode)
+
+        # Cycle 2 (a distinct session id, as both runs start within the same second)
+        config, engine, _stats = self._run(delete=True, unattended=True, session_id="session_cycle_2", keep_open=True)
+        self.assertTrue(self._finish(config, engine))
+        self.assertFalse(os.path.isdir(empty_leaf))
+
+
+if __name__ == '__main__':
+    unittest.main()
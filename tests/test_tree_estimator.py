@@ -0,0 +1,102 @@
+"""Tests for the sampling tree-size estimator and the dashboard ETA it feeds"""
+import argparse
+import os
+import time
+import unittest
+from unittest import mock
+
+from benchmarks.generator import generate_tree
+from ui.dashboard import Dashboard
+from utils.filesystem import MemoryFileSystem
+from utils.tree_estimator import START_PROGRESS, TreeSizeEstimator
+
+MEM_ROOT = os.path.join(os.sep, "vw_estimator_root")
+
+
+class TestTreeSizeEstimator(unittest.TestCase):
+    """Test Knuth path sampling and its refinement with real counts"""
+
+    def setUp(self):
+        self.fs = MemoryFileSystem()
+
+    def test_uniform_tree_is_exact(self):
+        """Test every probe on a tree with constant fan-out gives the true size"""
+        manifest = generate_tree(MEM_ROOT, "balanced", scale=1.0, fs=self.fs)
+        estimator = TreeSizeEstimator(MEM_ROOT, fs=self.fs, seed=1)
+        estimator.add_probes(40)
+
+        estimate = estimator.compute(*START_PROGRESS)
+        self.assertAlmostEqual(estimate['total'], manifest['folders'])
+        self.assertAlmostEqual(estimate['high'], estimate['low'])
+
+    def test_skewed_tree_interval_and_refinement(self):
+        """Test a lopsided tree gets a real interval that collapses once the scan is done"""
+        manifest = generate_tree(MEM_ROOT, "mixed", scale=1.0, fs=self.fs)
+        estimator = TreeSizeEstimator(MEM_ROOT, fs=self.fs, seed=3)
+        estimator.add_probes(200)
+
+        estimate = estimator.compute(*START_PROGRESS)
+        self.assertLess(estimate['low'], estimate['total'])
+        self.assertLess(estimate['total'], estimate['high'])
+        self.assertLess(abs(estimate['total'] - manifest['folders']) / manifest['folders'], 0.5)
+
+        # Mid-scan: the estimate never drops below what is already known to exist
+        partial = estimator.compute(100, {3: 400})
+        self.assertGreaterEqual(partial['low'], 500)
+
+        done = estimator.compute(manifest['folders'], {})
+        self.assertEqual((done['total'], done['low'], done['high']), (manifest['folders'],) * 3)
+
+    def test_filtered_folders_not_counted(self):
+        """Test probes skip folders the scan would exclude"""
+        fs = MemoryFileSystem(MEM_ROOT)
+        for name in ("keep", "skip"):
+            for child in ("a", "b"):
+                fs.makedirs(os.path.join(MEM_ROOT, name, child))
+        estimator = TreeSizeEstimator(MEM_ROOT, fs=fs, is_filtered=lambda path, name, depth: name == "skip")
+        estimator.add_probes(40)
+        self.assertAlmostEqual(estimator.compute(*START_PROGRESS)['total'], 4)
+
+    def test_background_probing(self):
+        """Test the sampler thread publishes estimates until stopped"""
+        generate_tree(MEM_ROOT, "wide", scale=0.5, fs=self.fs)
+        estimator = TreeSizeEstimator(MEM_ROOT, fs=self.fs, seed=1)
+        updates = []
+        estimator.on_update = updates.append
+        estimator.start()
+        deadline = time.time() + 5
+        while not updates and time.time() < deadline:
+            time.sleep(0.02)
+        estimate = estimator.stop()
+        self.assertTrue(updates)
+        self.assertIsNotNone(estimate)
+        self.assertFalse(estimator._thread.is_alive())
+
+
+class TestDashboardEstimate(unittest.TestCase):
+    """Test the dashboard ETA uses the tree-size estimate"""
+
+    def test_eta_from_estimate(self):
+        """Test ETA = estimated folders left / scan rate, even while the queue grows"""
+        dashboard = Dashboard(argparse.Namespace(workers=2))
+        start = time.time()
+        with mock.patch("ui.dashboard.time.time", return_value=start):
+            dashboard.refresh_stats()
+        for _ in range(100):
+            dashboard.increment_scanned(start)
+        dashboard.set_queue_depth(500)
+        dashboard.set_size_estimate({'total': 1100.0, 'low': 1000.0, 'high': 1210.0})
+        with mock.patch("ui.dashboard.time.time", return_value=start + 10):
+            stats = dashboard.refresh_stats()
+
+        self.assertEqual(stats['estimated_total'], 1100)
+        self.assertAlmostEqual(stats['estimate_margin'], 0.1)
+        self.assertEqual(stats['eta_seconds'], 100)
+
+        dashboard.set_size_estimate(None)
+        with mock.patch("ui.dashboard.time.time", return_value=start + 11):
+            self.assertIsNone(dashboard.refresh_stats()['estimated_total'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Tests for learning workers, strategy and commit interval from session history"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from common.constants import ENGINE_COMMIT_INTERVAL, WORKERS_HDD
+from config.settings import Config
+from config.tuning import describe_learned, learn_from_history
+from data.database import Database
+from tests.test_config import MockArgs
+from utils.scan_profile import device_id
+
+
+def _session(root, workers, strategy, rate, interval=10.0, device=None, scanned=100000):
+    """History row as returned by Database.get_session_history"""
+    config = {'workers': workers, 'strategy': strategy, 'commit_interval': interval}
+    if device:
+        config['device_id'] = device
+    return {'session_id': f"s_{workers}_{strategy}_{rate}", 'timestamp': "", 'root_path': root,
+            'config': config, 'scanned': scanned, 'elapsed_seconds': scanned / rate}
+
+
+class TestLearnFromHistory(unittest.TestCase):
+    """Test ranking past sessions by median throughput"""
+
+    def test_best_median_wins(self):
+        """Test the configuration with the highest median rate is chosen, not the single fastest run"""
+        sessions = [
+            _session("/data", 8, "BFS", 1000), _session("/data", 8, "BFS", 1100), _session("/data", 8, "BFS", 1050),
+            _session("/data", 16, "BFS", 2000), _session("/data", 16, "BFS", 600), _session("/data", 16, "BFS", 700),
+        ]
+        learned = learn_from_history(sessions, "/data", "dev:1")
+        self.assertEqual((learned['workers'], learned['strategy'], learned['samples']), (8, "BFS", 3))
+        self.assertEqual(learned['folders_per_sec'], 1050.0)
+        self.assertEqual((learned['scope'], learned['sessions']), ("root", 6))
+        self.assertIn("6 sessions on this root", describe_learned(learned))
+
+    def test_same_root_before_same_device(self):
+        """Test sessions on the same root are preferred; the device is the fallback"""
+        sessions = [_session("/data", 4, "DFS", 500, device="dev:1"),
+                    _session("/data/other", 32, "BFS", 5000, device="dev:1"),
+                    _session("/elsewhere", 2, "DFS", 9000, device="dev:2")]
+        self.assertEqual(learn_from_history(sessions, "/data", "dev:1")['workers'], 4)
+
+        learned = learn_from_history(sessions, "/data/new", "dev:1")
+        self.assertEqual((learned['workers'], learned['scope']), (32, "device"))
+        self.assertIsNone(learn_from_history(sessions, "/mnt/x", "dev:3"))
+
+    def test_explicit_settings_constrain_choice(self):
+        """Test fixed settings only leave matching sessions to learn from"""
+        sessions = [_session("/data", 16, "BFS", 2000, interval=10.0),
+                    _session("/data", 4, "DFS", 900, interval=30.0),
+                    _session("/data", 4, "DFS", 800, interval=10.0)]
+        learned = learn_from_history(sessions, "/data", "dev:1", workers=4)
+        self.assertEqual((learned['strategy'], learned['commit_interval']), ("DFS", 30.0))
+        self.assertIsNone(learn_from_history(sessions, "/data", "dev:1", strategy="BFS", workers=4))
+
+    def test_short_sessions_ignored(self):
+        """Test tiny or very short scans are too noisy to learn from"""
+        sessions = [_session("/data", 8, "BFS", 100000, scanned=50), _session("/data", 8, "BFS", 10000)]
+        self.assertEqual(learn_from_history(sessions, "/data", "dev:1")['samples'], 1)
+        self.assertIsNone(learn_from_history(sessions[:1], "/data", "dev:1"))
+
+
+class TestConfigHistory(unittest.TestCase):
+    """Test Config applies learned settings with their provenance"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp(prefix="void_walker_history_")
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _record(self, session_id, workers, strategy, interval, scanned, elapsed):
+        """Store a finished session the way a completed scan leaves it"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database("void_walker_history.db", session_id)
+            db.setup()
+            db.close()
+        config = {'workers': workers, 'strategy': strategy, 'commit_interval': interval}
+        with sqlite3.connect("void_walker_history.db") as conn:
+            conn.execute("UPDATE sessions SET config=?, root_path=?, completed=1, scanned_count=?, pending_count=0 "
+                         "WHERE id=?", (json.dumps(config), self.temp_dir, scanned, session_id))
+            conn.execute("INSERT INTO checkpoints (session_id, elapsed_seconds) VALUES (?, ?)", (session_id, elapsed))
+
+    def test_history_fills_auto_settings(self):
+        """Test auto settings come from history and flags still win"""
+        self._record("session_a", 4, "DFS", 30.0, 20000, 10.0)
+        self._record("session_b", 16, "BFS", 10.0, 20000, 40.0)
+
+        config = Config(MockArgs(path=self.temp_dir, disk="ssd", strategy="auto", workers=0))
+        self.assertEqual((config.workers, config.strategy, config.commit_interval), (4, "DFS", 30.0))
+        self.assertIsNotNone(config.learned_tuning)
+        self.assertTrue(config.tuning_source['workers'].startswith("history:"))
+
+        args = MockArgs(path=self.temp_dir, disk="ssd", strategy="bfs", workers=0)
+        args.commit_interval = 5.0
+        config = Config(args)
+        self.assertEqual((config.workers, config.strategy, config.commit_interval), (16, "BFS", 5.0))
+        self.assertEqual(config.tuning_source['strategy'], "--strategy")
+        self.assertEqual(config.tuning_source['commit_interval'], "--commit-interval")
+
+    def test_calibration_beats_history(self):
+        """Test a calibrated profile outranks history for workers and strategy"""
+        self._record("session_a", 4, "DFS", 30.0, 20000, 10.0)
+        Database.save_tuning_profile("void_walker_history.db", device_id(self.temp_dir), {
+            "root_path": self.temp_dir, "workers": 8, "strategy": "BFS", "folders_per_sec": 1.0,
+            "latency_ms": None, "p95_latency_ms": None, "trials": []})
+
+        config = Config(MockArgs(path=self.temp_dir, disk="ssd", strategy="auto", workers=0))
+        self.assertEqual((config.workers, config.strategy), (8, "BFS"))
+        # No history matches the calibrated settings, so the interval stays at its default
+        self.assertIsNone(config.learned_tuning)
+        self.assertEqual(config.tuning_source['commit_interval'], "default")
+
+    def test_no_tuning_opt_out(self):
+        """Test --no-tuning ignores history and calibration (as benchmarks and calibration trials do)"""
+        self._record("session_a", 4, "DFS", 30.0, 20000, 10.0)
+        Database.save_tuning_profile("void_walker_history.db", device_id(self.temp_dir), {
+            "root_path": self.temp_dir, "workers": 8, "strategy": "BFS", "folders_per_sec": 1.0,
+            "latency_ms": None, "p95_latency_ms": None, "trials": []})
+
+        args = MockArgs(path=self.temp_dir, disk="hdd", strategy="auto", workers=0)
+        args.no_tuning = True
+        config = Config(args)
+        self.assertEqual((config.workers, config.strategy, config.commit_interval), (WORKERS_HDD, "DFS", ENGINE_COMMIT_INTERVAL))
+        self.assertIsNone(config.tuning_profile)
+        self.assertIsNone(config.learned_tuning)
+        self.assertEqual(config.tuning_source['workers'], "HDD default")
+
+
+if __name__ == '__main__':
+    unittest.main()
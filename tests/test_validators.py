@@ -3,7 +3,7 @@ import unittest
 import os
 import tempfile
 import shutil
-from utils.validators import normalize_path, validate_target_path
+from utils.validators import normalize_path, parse_duration, validate_target_path
 
 
 class TestPathNormalization(unittest.TestCase):
@@ -76,5 +76,23 @@ class TestPathValidation(unittest.TestCase):
         self.assertIn("not a directory", msg)
 
 
+class TestParseDuration(unittest.TestCase):
+    """Test --time-budget duration parsing"""
+
+    def test_units(self):
+        """Test hour/minute/second suffixes, combinations and bare minutes"""
+        self.assertEqual(parse_duration("30m"), 1800)
+        self.assertEqual(parse_duration("90s"), 90)
+        self.assertEqual(parse_duration("1h30m"), 5400)
+        self.assertEqual(parse_duration("2.5h"), 9000)
+        self.assertEqual(parse_duration(" 45 "), 2700)
+
+    def test_invalid(self):
+        """Test malformed and non-positive durations are rejected"""
+        for text in ("", "abc", "30x", "m", "0m", "-5m"):
+            with self.assertRaises(ValueError):
+                parse_duration(text)
+
+
 if __name__ == '__main__':
     unittest.main()
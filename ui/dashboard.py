@@ -5,8 +5,17 @@ import threading
 from datetime import timedelta
 from common.constants import (
     DASHBOARD_UPDATE_INTERVAL,
-    DASHBOARD_SPINNER_CHARS
+    DASHBOARD_SPINNER_CHARS,
+    DASHBOARD_HISTORY_SECONDS,
+    DASHBOARD_RATE_WINDOW_SHORT,
+    DASHBOARD_RATE_WINDOW_LONG,
+    DASHBOARD_EWMA_ALPHA,
+    DASHBOARD_SPARKLINE_WIDTH
 )
+from utils.metrics import ShardedCounters, RateHistory
+
+# Counters workers increment on the hot path (aggregated on each render tick)
+DASHBOARD_COUNTERS = ("scanned", "empty", "deleted", "errors", "total_size_bytes")
 
 class Dashboard:
     # Display constants (moved to constants.py)
@@ -17,6 +26,10 @@ class Dashboard:
     def __init__(self, config):
         """Initialize real-time dashboard with thread-safe metrics.
         
+        Worker-facing updates never take self.lock: counters go to per-thread
+        shards and gauges (current path, queue depth) are single attribute
+        writes. The render loop aggregates them into self.stats on each tick.
+        
         Args:
             config: Application configuration object with settings
         """
@@ -28,23 +41,35 @@ class Dashboard:
         self.status = "STARTING"
         self.phase = "INIT"
         
-        # Enhanced metrics
+        # Hot-path metrics: sharded counters plus lock-free gauges
+        self.counters = ShardedCounters(DASHBOARD_COUNTERS)
+        self.counter_base = dict.fromkeys(DASHBOARD_COUNTERS, 0)  # Restored from a checkpoint
+        self.queue_depth = 0
+        self.size_estimate = None  # Latest TreeSizeEstimator result (total, low, high, ...)
+        self.deadline = None  # Epoch time the --time-budget window closes, if any
+        
+        # Enhanced metrics (aggregated snapshot, refreshed by refresh_stats)
         self.stats = {
             "scanned": 0,
             "empty": 0,
             "deleted": 0,
             "errors": 0,
-            "scan_rate": 0.0,
+            "scan_rate": 0.0,  # Scanned/s over the short window
+            "scan_rate_long": 0.0,  # Scanned/s over the long window
+            "scan_rate_ewma": 0.0,  # Per-second EWMA of scanned/s
+            "error_rate": 0.0,  # Errors/s over the short window
             "queue_depth": 0,
             "active_workers": 0,
             "total_size_bytes": 0,  # Total bytes processed
             "processing_speed_bps": 0.0,  # Bytes per second
             "eta_seconds": 0,  # Estimated time remaining
+            "estimated_total": None,  # Estimated total folders (tree-size sampling)
+            "estimate_margin": None,  # 95% interval half-width as a fraction of the total
             "memory_mb": 0.0,  # Current memory usage in MB
         }
         self.start_time = time.time()
-        self.rate_samples = []  # For rolling average calculation
-        self.max_rate_samples = 10  # Keep last 10 samples
+        # Per-second history feeding windowed rates, sparkline and ETA
+        self.history = RateHistory(DASHBOARD_HISTORY_SECONDS, DASHBOARD_EWMA_ALPHA)
 
     def start(self):
         self.active = True
@@ -66,8 +91,8 @@ class Dashboard:
         sys.stdout.write("\n")       # Add newline for clean separation
         sys.stdout.flush()
     def update_current(self, path):
-        with self.lock:
-            self.current_path = path
+        # Single attribute write: atomic, no lock needed on the hot path
+        self.current_path = path
 
     def set_status(self, msg):
         with self.lock:
@@ -77,50 +102,97 @@ class Dashboard:
         with self.lock:
             self.phase = phase
     
-    def increment_scanned(self, scan_start_time):
-        """Thread-safe increment of scanned counter with rolling average rate calculation."""
+    def restore_progress(self, scanned=0, empty=0, errors=0, total_size_bytes=0, elapsed_seconds=0.0):
+        """Seed counters and runtime from a resumed session's checkpoint."""
         with self.lock:
-            self.stats['scanned'] += 1
-            elapsed = time.time() - scan_start_time
-            if elapsed > 0:
-                # Calculate instantaneous rate
-                instant_rate = self.stats['scanned'] / elapsed
-                
-                # Add to rolling samples
-                self.rate_samples.append(instant_rate)
-                if len(self.rate_samples) > self.max_rate_samples:
-                    self.rate_samples.pop(0)
-                
-                # Use rolling average for smoother display
-                self.stats['scan_rate'] = sum(self.rate_samples) / len(self.rate_samples)
+            self.counter_base.update(
+                scanned=scanned,
+                empty=empty,
+                errors=errors,
+                total_size_bytes=total_size_bytes
+            )
+            self.start_time = time.time() - elapsed_seconds
+            # Restored totals would read as a burst of throughput; start history afresh
+            self.history = RateHistory(DASHBOARD_HISTORY_SECONDS, DASHBOARD_EWMA_ALPHA)
+        self.refresh_stats()
+    
+    def increment_scanned(self, scan_start_time):
+        """Lock-free increment of scanned counter (rates are computed by refresh_stats)."""
+        self.counters.add('scanned')
     
     def increment_empty(self):
-        """Thread-safe increment of empty folder counter"""
-        with self.lock:
-            self.stats['empty'] += 1
+        """Lock-free increment of empty folder counter"""
+        self.counters.add('empty')
     
     def increment_errors(self):
-        """Thread-safe increment of error counter"""
-        with self.lock:
-            self.stats['errors'] += 1
+        """Lock-free increment of error counter"""
+        self.counters.add('errors')
     
     def increment_deleted(self):
-        """Thread-safe increment of deleted counter"""
-        with self.lock:
-            self.stats['deleted'] += 1
+        """Lock-free increment of deleted counter"""
+        self.counters.add('deleted')
     
     def set_queue_depth(self, depth):
-        """Thread-safe update of queue depth"""
-        with self.lock:
-            self.stats['queue_depth'] = depth
+        """Lock-free update of queue depth gauge"""
+        self.queue_depth = depth
+    
+    def set_size_estimate(self, estimate):
+        """Lock-free update of the tree-size estimate (None clears it)"""
+        self.size_estimate = estimate
     
     def add_processed_size(self, size_bytes: int):
-        """Thread-safe increment of total processed size"""
+        """Lock-free increment of total processed size"""
+        self.counters.add('total_size_bytes', size_bytes)
+    
+    def counter_totals(self):
+        """Current counter totals (including restored progress) and gauges, without side effects."""
+        totals = self.counters.snapshot()
+        for name in totals:
+            totals[name] += self.counter_base[name]
+        totals['queue_depth'] = self.queue_depth
+        return totals
+    
+    def refresh_stats(self):
+        """Aggregate counter shards and gauges into self.stats.
+        
+        Called from the render loop on every tick, so the per-folder paths
+        above stay free of lock traffic. Each call also feeds the per-second
+        history that the windowed rates, sparkline and ETA are derived from.
+        
+        Returns:
+            Copy of the refreshed stats dict
+        """
+        totals = self.counter_totals()
+        now = time.time()
         with self.lock:
-            self.stats['total_size_bytes'] += size_bytes
-            elapsed = time.time() - self.start_time
-            if elapsed > 0:
-                self.stats['processing_speed_bps'] = self.stats['total_size_bytes'] / elapsed
+            self.stats.update(totals)
+            
+            self.history.record(now, {
+                'scanned': self.stats['scanned'],
+                'errors': self.stats['errors'],
+                'total_size_bytes': self.stats['total_size_bytes'],
+                'queue_depth': self.stats['queue_depth'],
+            })
+            self.stats['scan_rate'] = self.history.rate('scanned', DASHBOARD_RATE_WINDOW_SHORT) or 0.0
+            self.stats['scan_rate_long'] = self.history.rate('scanned', DASHBOARD_RATE_WINDOW_LONG) or 0.0
+            self.stats['scan_rate_ewma'] = self.history.ewma('scanned') or 0.0
+            self.stats['error_rate'] = self.history.rate('errors', DASHBOARD_RATE_WINDOW_SHORT) or 0.0
+            self.stats['processing_speed_bps'] = (
+                self.history.rate('total_size_bytes', DASHBOARD_RATE_WINDOW_SHORT) or 0.0
+            )
+            estimate = self.size_estimate
+            rate = self.stats['scan_rate_long'] or self.stats['scan_rate']
+            if estimate and rate > 0:
+                # Estimated folders left at the current rate; valid while the frontier still grows
+                eta = max(estimate['total'] - self.stats['scanned'], 0) / rate
+                self.stats['estimated_total'] = int(estimate['total'])
+                self.stats['estimate_margin'] = (estimate['high'] - estimate['total']) / estimate['total']
+            else:
+                eta = self.history.eta_seconds('queue_depth', DASHBOARD_RATE_WINDOW_LONG)
+                self.stats['estimated_total'] = None
+                self.stats['estimate_margin'] = None
+            self.stats['eta_seconds'] = int(eta) if eta is not None else None
+            return dict(self.stats)
 
     def _loop(self):
         i = 0
@@ -139,17 +211,19 @@ class Dashboard:
             
             s = DASHBOARD_SPINNER_CHARS[i % len(DASHBOARD_SPINNER_CHARS)]
             
-            with self.lock:
-                path = self.current_path
-                rate = self.stats.get('scan_rate', 0)
-                scanned = self.stats.get('scanned', 0)
-                errors = self.stats.get('errors', 0)
-                queue = self.stats.get('queue_depth', 0)
-                empty = self.stats.get('empty', 0)
-                deleted = self.stats.get('deleted', 0)
-                total_bytes = self.stats.get('total_size_bytes', 0)
-                speed_bps = self.stats.get('processing_speed_bps', 0)
-                memory_mb = self.stats.get('memory_mb', 0.0)
+            stats = self.refresh_stats()
+            path = self.current_path
+            rate = stats.get('scan_rate', 0)
+            rate_long = stats.get('scan_rate_long', 0)
+            eta_seconds = stats.get('eta_seconds')
+            scanned = stats.get('scanned', 0)
+            errors = stats.get('errors', 0)
+            queue = stats.get('queue_depth', 0)
+            empty = stats.get('empty', 0)
+            deleted = stats.get('deleted', 0)
+            total_bytes = stats.get('total_size_bytes', 0)
+            speed_bps = stats.get('processing_speed_bps', 0)
+            memory_mb = stats.get('memory_mb', 0.0)
             
             # Update memory usage if psutil available
             if memory_mb == 0.0:
@@ -184,18 +258,23 @@ class Dashboard:
             size_str = format_bytes(total_bytes)
             speed_str = format_bytes(speed_bps) + "/s" if speed_bps > 0 else "0B/s"
             
-            # Calculate ETA based on queue depth and scan rate
+            # ETA from the tree-size estimate, else only once the frontier is shrinking
             eta_str = "--:--:--"
-            if rate > 0 and queue > 0:
-                eta_seconds = int(queue / rate)
+            if eta_seconds is not None:
                 eta_str = str(timedelta(seconds=eta_seconds))
+            if stats.get('estimated_total'):
+                eta_str += f" (~{stats['estimated_total']:,} ±{stats['estimate_margin']:.0%})"
+            with self.lock:
+                trend = self.history.sparkline('scanned', DASHBOARD_SPARKLINE_WIDTH)
             
             # Build output lines
             mem_str = f"{memory_mb:.1f}MB" if memory_mb > 0 else "N/A"
             line1 = f"[{s}] {self.phase} | {self.status} | Workers: {self.config.workers} | Mem: {mem_str}"
+            if self.deadline is not None:
+                line1 += f" | Budget: {timedelta(seconds=max(0, int(self.deadline - time.time())))} left"
             line2 = f"{path}"
-            line3 = f"Scanned: {scanned} | Rate: {rate:.1f}/s | Queue: {queue} | Empty: {empty} | Deleted: {deleted} | Errors: {errors} | Time: {elapsed_str}"
-            line4 = f"Size: {size_str} | Speed: {speed_str} | ETA: {eta_str} | " + "-" * max(0, min(60, cols) - 50)
+            line3 = f"Scanned: {scanned} | Rate: {rate:.1f}/s (1m {rate_long:.1f}/s) | Queue: {queue} | Empty: {empty} | Deleted: {deleted} | Errors: {errors} | Time: {elapsed_str}"
+            line4 = f"Size: {size_str} | Speed: {speed_str} | ETA: {eta_str} | Trend: {trend}"
             
             # Clear and rewrite (move cursor up on subsequent runs)
             if not first_run:
@@ -52,6 +52,7 @@ class Menu:
                         if saved["strategy"] == "auto": saved["strategy"] = "1"
                         elif saved["strategy"] == "bfs": saved["strategy"] = "2"
                         elif saved["strategy"] == "dfs": saved["strategy"] = "3"
+                        elif saved["strategy"] == "hybrid": saved["strategy"] = "4"
                     
                     # Normalize all numeric values to strings (handles manually edited JSON with integers)
                     for key in ["mode", "disk", "strategy"]:
@@ -381,12 +382,14 @@ class Menu:
             print(f"  {Color.CYAN}[2]{Color.RESET} BFS (Breadth-First)  - Scan level-by-level (parallel)")
             print(f"      {Color.GRAY}→ Best for: SSDs with many shallow folders{Color.RESET}")
             print(f"  {Color.CYAN}[3]{Color.RESET} DFS (Depth-First)    - Scan branch-by-branch (sequential)")
-            print(f"      {Color.GRAY}→ Best for: HDDs, deep directory trees{Color.RESET}\n")
+            print(f"      {Color.GRAY}→ Best for: HDDs, deep directory trees{Color.RESET}")
+            print(f"  {Color.CYAN}[4]{Color.RESET} Hybrid               - BFS near the root, then DFS per subtree")
+            print(f"      {Color.GRAY}→ Best for: large trees; keeps workers busy with bounded memory{Color.RESET}\n")
             
             WizardStep.show_shortcuts(show_previous=True)
             
-            strategy_names = {'1': 'Auto', '2': 'BFS', '3': 'DFS'}
-            strategy_choice = self.get_input("   Choice [1-3]", "strategy", ['1', '2', '3'], value_map=strategy_names)
+            strategy_names = {'1': 'Auto', '2': 'BFS', '3': 'DFS', '4': 'Hybrid'}
+            strategy_choice = self.get_input("   Choice [1-4]", "strategy", ['1', '2', '3', '4'], value_map=strategy_names)
             self.defaults["strategy"] = strategy_choice
 
             # 5. Workers
@@ -577,7 +580,7 @@ class Menu:
         # Maps for displaying human-readable values
         mode_names = {'1': 'Dry Run', '2': 'Delete'}
         disk_names = {'1': 'Auto', '2': 'SSD', '3': 'HDD'}
-        strategy_names = {'1': 'Auto', '2': 'BFS', '3': 'DFS'}
+        strategy_names = {'1': 'Auto', '2': 'BFS', '3': 'DFS', '4': 'Hybrid'}
         
         for key, value in self.defaults.items():
             if isinstance(value, list):
@@ -651,7 +654,7 @@ class Menu:
         # Maps for displaying human-readable values
         mode_names = {'1': 'Dry Run', '2': 'Delete'}
         disk_names = {'1': 'Auto', '2': 'SSD', '3': 'HDD'}
-        strategy_names = {'1': 'Auto', '2': 'BFS', '3': 'DFS'}
+        strategy_names = {'1': 'Auto', '2': 'BFS', '3': 'DFS', '4': 'Hybrid'}
         
         for key, value in self.defaults.items():
             if isinstance(value, list):
@@ -746,12 +749,14 @@ class Menu:
             cmd.append("auto")
         
         # Strategy: Convert number to actual value
-        # '1' = Auto, '2' = BFS, '3' = DFS
+        # '1' = Auto, '2' = BFS, '3' = DFS, '4' = Hybrid
         cmd.append("--strategy")
         if strategy == '2':
             cmd.append("bfs")
         elif strategy == '3':
             cmd.append("dfs")
+        elif strategy == '4':
+            cmd.append("hybrid")
         else:
             cmd.append("auto")
         
@@ -1,10 +1,78 @@
 import json
 import os
+import threading
+
+class KeysetPager:
+    """Page through a DB result set one page at a time using keyset cursors.
+    
+    Only the visible page is held in memory. The page after it is fetched on
+    a background thread while the user reads the current one, so paging
+    forward does not wait on the database.
+    
+    Args:
+        fetch_page: Callable(after, limit) returning a list of rows
+        cursor_of: Callable(row) returning the keyset cursor for that row
+        page_size: Number of rows per page
+    """
+    
+    def __init__(self, fetch_page, cursor_of, page_size=20):
+        self.fetch_page = fetch_page
+        self.cursor_of = cursor_of
+        self.page_size = page_size
+        # page_starts[i] is the cursor that page i starts after (None for page 0)
+        self.page_starts = [None]
+        self._prefetch_thread = None
+        self._prefetch_result = []
+        self._prefetch_page = None
+    
+    def get_page(self, page_index):
+        """Return the rows of page_index (pages must be visited in order the first time).
+        
+        Raises:
+            Exception: Whatever the page query raised, including a failed prefetch
+        """
+        if self._prefetch_page == page_index and self._prefetch_thread is not None:
+            self._prefetch_thread.join()
+            rows = self._prefetch_result[0] if self._prefetch_result else None
+        else:
+            rows = None
+        if isinstance(rows, Exception):
+            self._prefetch_thread = None
+            self._prefetch_page = None
+            raise rows
+        if rows is None:
+            rows = self.fetch_page(self.page_starts[page_index], self.page_size)
+        self._prefetch_thread = None
+        self._prefetch_page = None
+        
+        if rows and len(rows) == self.page_size and len(self.page_starts) == page_index + 1:
+            self.page_starts.append(self.cursor_of(rows[-1]))
+        if page_index + 1 < len(self.page_starts):
+            self._start_prefetch(page_index + 1)
+        return rows
+    
+    def _start_prefetch(self, page_index):
+        after = self.page_starts[page_index]
+        # Fresh slot per prefetch so an abandoned one cannot overwrite a newer result
+        result = []
+        
+        def worker():
+            try:
+                result.append(self.fetch_page(after, self.page_size))
+            except Exception as e:
+                result.append(e)  # Re-raised by get_page when the page is read
+        
+        self._prefetch_result = result
+        self._prefetch_page = page_index
+        self._prefetch_thread = threading.Thread(target=worker, daemon=True)
+        self._prefetch_thread.start()
+
 
 class Reporter:
-    def __init__(self, config, db):
+    def __init__(self, config, db, profile=None):
         self.config = config
         self.db = db
+        self.profile = profile  # ScanProfile from the engine (None when unavailable)
         
     def show_summary(self) -> None:
         """Display session summary report with error statistics."""
@@ -12,19 +80,27 @@ class Reporter:
         print(" SESSION REPORT")
         print("="*60)
         
-        errors = self.db.get_errors()
-        err_count = len(errors)
+        err_count = self.db.count_errors()
         
         print(f" Session:  {self.config.session_id}")
         print(f" Logs:     logs/{self.config.session_id}.log")
         print(f" Errors:   {err_count}")
         print("-" * 60)
+        
+        if self._show_top_folders_under_root():
+            print("-" * 60)
+        if self._show_subtree_rollups():
+            print("-" * 60)
+        
+        if self.profile is not None and self.profile.slowest.top():
+            self._show_scan_profile(width=60)
+            print("-" * 60)
 
         if err_count > 0:
             print(f" \033[93m[!] {err_count} folders could not be scanned (Access Denied/System).\033[0m")
             q = input(" View error list? (y/N): ").lower()
             if q == 'y':
-                self._scroll_error_list(errors)
+                self._scroll_error_list(err_count)
         
         # Note: We do NOT hold the user here anymore using input().
         # The Menu Loop in menu.py handles the pause.
@@ -69,155 +145,238 @@ class Reporter:
         else:
             print("   (No empty folders found)")
         
+        self._show_top_folders_under_root()
+        self._show_subtree_rollups()
+        
+        if self.profile is not None:
+            self._show_scan_profile()
+        
         print("="*70)
         print()
     
-    def _scroll_error_list(self, errors, page_size=20):
-        """Display errors in a scrollable paginated list with Page Up/Down support."""
-        total = len(errors)
+    def _show_top_folders_under_root(self) -> bool:
+        """Print the scan root's children holding the most empty folders, each drilled down one level.
+        
+        Returns:
+            True if anything was printed
+        """
+        if not self.config.root_path:
+            return False
+        top = self.db.get_top_folders_under(self.config.root_path, limit=3)
+        if not top:
+            return False
+        print(" Most Empty Folders Under Root:")
+        for idx, (folder, count) in enumerate(top, 1):
+            print(f"   {idx}. {self._shorten(folder)}  ({count:,} empty)")
+            for child, child_count in self.db.get_top_folders_under(folder, limit=1):
+                print(f"      > {self._shorten(child, 44)}  ({child_count:,} empty)")
+        return True
+    
+    def _show_subtree_rollups(self) -> bool:
+        """Print the root's largest subtrees and those with the most errors (from the subtree rollups).
+        
+        Returns:
+            True if anything was printed (rollups exist once a scan has covered the whole tree)
+        """
+        if not self.config.root_path:
+            return False
+        largest = self.db.get_top_subtrees("bytes", parent=self.config.root_path, limit=3)
+        if not largest:
+            return False
+        print(" Largest Subtrees Under Root:")
+        for idx, (path, size_bytes) in enumerate(largest, 1):
+            print(f"   {idx}. {self._shorten(path)}  ({size_bytes / 1024 ** 2:,.1f} MB)")
+        failing = [(path, errors) for path, errors
+                   in self.db.get_top_subtrees("errors", parent=self.config.root_path, limit=3) if errors]
+        if failing:
+            print(" Most Errors Under Root:")
+            for idx, (path, errors) in enumerate(failing, 1):
+                print(f"   {idx}. {self._shorten(path)}  ({errors:,} errors)")
+        return True
+    
+    @staticmethod
+    def _shorten(path, width=50):
+        return path if len(path) <= width else "..." + path[-(width - 3):]
+    
+    def _show_scan_profile(self, width=70) -> None:
+        """Print the scan time breakdown plus the slowest and largest directories."""
+        slowest = self.profile.slowest.top()
+        if not slowest:
+            return
+        totals = self.profile.phase_totals()
+        grand_total = sum(totals.values())
+        print("-" * width)
+        breakdown = " | ".join(
+            f"{phase} {seconds:.1f}s ({seconds * 100 / grand_total if grand_total > 0 else 0.0:.0f}%)"
+            for phase, seconds in totals.items()
+        )
+        print(f" Scan Time:        {breakdown}")
+        
+        print(f" Slowest {len(slowest)} Directories:")
+        for idx, (seconds, (path, entries, enum_s, db_s, filter_s)) in enumerate(slowest, 1):
+            print(f"   {idx}. {self._shorten(path)}")
+            print(f"      {seconds * 1000:,.1f} ms  (enumerate {enum_s * 1000:,.1f} / db {db_s * 1000:,.1f} / "
+                  f"filter {filter_s * 1000:,.1f})  {entries:,} entries")
+        
+        largest = self.profile.largest.top()
+        print(f" Largest {len(largest)} Directories:")
+        for idx, (entries, (path, seconds)) in enumerate(largest, 1):
+            print(f"   {idx}. {self._shorten(path)}")
+            print(f"      {entries:,} entries in {seconds * 1000:,.1f} ms")
+    
+    def _prompt_page(self, current_page, total_pages):
+        """Prompt for page navigation.
+        
+        Returns:
+            The new page index, or None if the user quit.
+        """
+        options = []
+        if current_page < total_pages - 1:
+            options.append("[N]ext / PgDn")
+        if current_page > 0:
+            options.append("[P]revious / PgUp")
+        options.append("[Q]uit / ESC")
+        
+        prompt = f" {' | '.join(options)}: "
+        
+        # Try to use keyboard input for page keys (Windows)
+        try:
+            import msvcrt
+            print(prompt, end='', flush=True)
+            
+            while True:
+                if msvcrt.kbhit():
+                    key = msvcrt.getch()
+                    
+                    # Handle special keys (arrow keys, page up/down, etc)
+                    if key == b'\xe0' or key == b'\x00':  # Special key prefix
+                        key = msvcrt.getch()
+                        if key == b'I':  # Page Up
+                            if current_page > 0:
+                                print("\n[Page Up]")
+                                return current_page - 1
+                        elif key == b'Q':  # Page Down
+                            if current_page < total_pages - 1:
+                                print("\n[Page Down]")
+                                return current_page + 1
+                    elif key == b'\x1b':  # ESC
+                        print("\n")
+                        return None
+                    elif key in (b'q', b'Q'):
+                        print("\n")
+                        return None
+                    elif key in (b'n', b'N') and current_page < total_pages - 1:
+                        print("n\n")
+                        return current_page + 1
+                    elif key in (b'p', b'P') and current_page > 0:
+                        print("p\n")
+                        return current_page - 1
+                    elif key in (b'\r', b'\n'):  # Enter
+                        print("\n")
+                        return None
+        except ImportError:
+            # Fallback to standard input for non-Windows
+            while True:
+                choice = input(prompt).lower().strip()
+                
+                if choice == 'n' and current_page < total_pages - 1:
+                    return current_page + 1
+                elif choice == 'p' and current_page > 0:
+                    return current_page - 1
+                elif choice == 'q' or choice == '':
+                    return None
+                else:
+                    print("\033[93m[!] Invalid choice. Try again.\033[0m")
+    
+    def _scroll_error_list(self, total=None, page_size=20):
+        """Display errors in a scrollable paginated list with Page Up/Down support.
+        
+        Pages are fetched from the database on demand, so only the visible
+        page of errors is held in memory.
+        """
+        if total is None:
+            total = self.db.count_errors()
+        if total == 0:
+            return
         total_pages = (total + page_size - 1) // page_size
+        pager = KeysetPager(self.db.get_errors_page, lambda row: row[0], page_size)
         current_page = 0
         
         while True:
+            rows = pager.get_page(current_page)
             start_idx = current_page * page_size
-            end_idx = min(start_idx + page_size, total)
+            end_idx = min(start_idx + len(rows), total)
             
             # Display current page
             print("\n" + "="*70)
             print(f" ERROR LIST - Page {current_page + 1}/{total_pages} (Showing {start_idx + 1}-{end_idx} of {total})")
             print("="*70)
             
-            for i in range(start_idx, end_idx):
-                path, msg = errors[i]
+            for offset, (_rowid, path, msg) in enumerate(rows):
                 # Shorten path if too long
                 display_path = path
                 if len(display_path) > 50:
                     display_path = "..." + display_path[-47:]
-                print(f" {i+1:4}. {display_path}")
+                print(f" {start_idx + offset + 1:4}. {display_path}")
                 print(f"       Error: {msg}")
             
             print("-"*70)
             
             # Navigation prompt
             if total_pages > 1:
-                options = []
-                if current_page < total_pages - 1:
-                    options.append("[N]ext / PgDn")
-                if current_page > 0:
-                    options.append("[P]revious / PgUp")
-                options.append("[Q]uit / ESC")
-                
-                prompt = f" {' | '.join(options)}: "
-                
-                # Try to use keyboard input for page keys (Windows)
-                try:
-                    import msvcrt
-                    print(prompt, end='', flush=True)
-                    
-                    while True:
-                        if msvcrt.kbhit():
-                            key = msvcrt.getch()
-                            
-                            # Handle special keys
-                            if key == b'\xe0' or key == b'\x00':
-                                key = msvcrt.getch()
-                                if key == b'I':  # Page Up
-                                    if current_page > 0:
-                                        print("\n[Page Up]")
-                                        current_page -= 1
-                                        break
-                                elif key == b'Q':  # Page Down
-                                    if current_page < total_pages - 1:
-                                        print("\n[Page Down]")
-                                        current_page += 1
-                                        break
-                            elif key == b'\x1b':  # ESC
-                                print("\n")
-                                return
-                            elif key in (b'q', b'Q'):
-                                print("\n")
-                                return
-                            elif key in (b'n', b'N') and current_page < total_pages - 1:
-                                print("n\n")
-                                current_page += 1
-                                break
-                            elif key in (b'p', b'P') and current_page > 0:
-                                print("p\n")
-                                current_page -= 1
-                                break
-                            elif key in (b'\r', b'\n'):  # Enter
-                                print("\n")
-                                return
-                except ImportError:
-                    # Fallback to standard input for non-Windows
-                    choice = input(prompt).lower().strip()
-                    
-                    if choice == 'n' and current_page < total_pages - 1:
-                        current_page += 1
-                    elif choice == 'p' and current_page > 0:
-                        current_page -= 1
-                    elif choice == 'q' or choice == '':
-                        return
-                    else:
-                        print("\033[93m[!] Invalid choice. Try again.\033[0m")
+                next_page = self._prompt_page(current_page, total_pages)
+                if next_page is None:
+                    return
+                current_page = next_page
             else:
                 # Single page
                 input("\n Press Enter to continue...")
                 return
     
-    def scroll_empty_folders(self, empty_folder_paths=None, page_size=20):
+    def scroll_empty_folders(self, page_size=20):
         """
         Display empty folders in a scrollable paginated list.
         
+        Folders are read from the database one page at a time with keyset
+        pagination (depth DESC, rowid), and the next page is prefetched while
+        the current one is displayed.
+        
         Args:
-            empty_folder_paths: List of folder paths. If None, fetches from DB.
             page_size: Number of folders to show per page.
         
         Returns:
-            int: Total number of folders displayed
+            int: Total number of empty folder candidates
         """
-        if empty_folder_paths is None:
-            empty_folder_paths = self.db.get_empty_candidates(self.config.min_depth)
+        min_depth = self.config.min_depth
+        total = self.db.count_empty_candidates(min_depth)
         
-        if not empty_folder_paths:
+        if total == 0:
             print("\n\033[93m[!] No empty folders found.\033[0m")
             return 0
         
-        # Get detailed info for each folder from database
-        empty_folders = []
-        for path in empty_folder_paths:
-            # Query depth and file_count from database
-            self.db.cursor.execute(
-                "SELECT depth, file_count FROM folders WHERE path=? AND session_id=?",
-                (path, self.db.session_id)
-            )
-            result = self.db.cursor.fetchone()
-            if result:
-                depth, file_count = result
-                empty_folders.append((path, depth, file_count))
-            else:
-                # Fallback if not in DB
-                empty_folders.append((path, 0, 0))
-        
-        total = len(empty_folders)
         print(f"\n{'='*70}")
         print(f" EMPTY FOLDERS FOUND: {total}")
         print(f"{'='*70}\n")
         
         # Paginate
+        pager = KeysetPager(
+            lambda after, limit: self.db.get_empty_candidates_page(min_depth, after, limit),
+            lambda row: (row[2], row[0]),
+            page_size
+        )
         current_page = 0
         total_pages = (total + page_size - 1) // page_size
         
         while True:
+            rows = pager.get_page(current_page)
             start_idx = current_page * page_size
-            end_idx = min(start_idx + page_size, total)
+            end_idx = min(start_idx + len(rows), total)
             
             # Display current page
             print(f"\n Page {current_page + 1}/{total_pages} (Showing {start_idx + 1}-{end_idx} of {total})")
             print("-"*70)
             
-            for i in range(start_idx, end_idx):
-                path, depth, file_count = empty_folders[i]
+            for offset, (_rowid, path, depth, _file_count) in enumerate(rows):
                 # Shorten path if too long
                 display_path = path
                 if len(display_path) > 60:
@@ -225,73 +384,16 @@ class Reporter:
                 
                 indent = "  " * min(depth, 3)  # Max 3 levels of indent for display
                 depth_marker = f"[D{depth}]" if depth < 100 else "[D99+]"
-                print(f" {i+1:4}. {indent}{depth_marker} {display_path}")
+                print(f" {start_idx + offset + 1:4}. {indent}{depth_marker} {display_path}")
             
             print("-"*70)
             
             # Navigation prompt
             if total_pages > 1:
-                options = []
-                if current_page < total_pages - 1:
-                    options.append("[N]ext / PgDn")
-                if current_page > 0:
-                    options.append("[P]revious / PgUp")
-                options.append("[Q]uit / ESC")
-                
-                prompt = f" {' | '.join(options)}: "
-                
-                # Try to use keyboard input for arrow/page keys (Windows)
-                try:
-                    import msvcrt
-                    print(prompt, end='', flush=True)
-                    
-                    while True:
-                        if msvcrt.kbhit():
-                            key = msvcrt.getch()
-                            
-                            # Handle special keys (arrow keys, page up/down, etc)
-                            if key == b'\xe0' or key == b'\x00':  # Special key prefix
-                                key = msvcrt.getch()
-                                if key == b'I':  # Page Up
-                                    if current_page > 0:
-                                        print("\n[Page Up]")
-                                        current_page -= 1
-                                        break
-                                elif key == b'Q':  # Page Down
-                                    if current_page < total_pages - 1:
-                                        print("\n[Page Down]")
-                                        current_page += 1
-                                        break
-                            elif key == b'\x1b':  # ESC
-                                print("\n[ESC - Quit]")
-                                return total
-                            elif key in (b'q', b'Q'):
-                                print("\n")
-                                return total
-                            elif key in (b'n', b'N') and current_page < total_pages - 1:
-                                print("n\n")
-                                current_page += 1
-                                break
-                            elif key in (b'p', b'P') and current_page > 0:
-                                print("p\n")
-                                current_page -= 1
-                                break
-                            elif key in (b'\r', b'\n'):  # Enter
-                                print("\n")
-                                return total
-                except ImportError:
-                    # Fallback to standard input for non-Windows
-                    choice = input(prompt).lower().strip()
-                    
-                    if choice == 'n' and current_page < total_pages - 1:
-                        current_page += 1
-                    elif choice == 'p' and current_page > 0:
-                        current_page -= 1
-                    elif choice == 'q' or choice == '':
-                        break
-                    else:
-                        # Invalid input, stay on current page
-                        print("\033[93m[!] Invalid choice. Try again.\033[0m")
+                next_page = self._prompt_page(current_page, total_pages)
+                if next_page is None:
+                    break
+                current_page = next_page
             else:
                 # Single page, just prompt to continue
                 input("\n Press Enter to continue...")
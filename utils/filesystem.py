@@ -0,0 +1,261 @@
+"""
+Filesystem backends for the scan and cleanup phases.
+
+The engine never calls os.* directly for the tree it walks; it goes through a
+FileSystem so scans can run against an in-memory tree. LocalFileSystem is the
+real disk, MemoryFileSystem a compact fake used by tests and benchmarks to
+exercise the engine, scheduler and database at scale without disk I/O.
+"""
+import errno
+import os
+import stat
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set
+
+
+class FileSystem(ABC):
+    """Operations the engine performs on the tree being scanned.
+
+    Every method is abstract, so a backend missing one fails when it is
+    created rather than partway through a scan. scandir entries must provide
+    name, path, is_file(), is_dir(), is_symlink() and stat() like
+    os.DirEntry; stat results need st_size.
+    """
+
+    @abstractmethod
+    def scandir(self, path: str):
+        """Iterate the entries of a directory, like os.scandir."""
+
+    @abstractmethod
+    def listdir(self, path: str) -> List[str]:
+        """List the entry names of a directory."""
+
+    @abstractmethod
+    def stat(self, path: str) -> os.stat_result:
+        """Return the os.stat_result for a path."""
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        """Return True if the path exists."""
+
+    @abstractmethod
+    def is_link(self, path: str) -> bool:
+        """Return True if the path is a symlink or junction."""
+
+    @abstractmethod
+    def rmdir(self, path: str) -> None:
+        """Remove an empty directory."""
+
+
+class LocalFileSystem(FileSystem):
+    """The real filesystem (thin delegation to os)."""
+
+    def scandir(self, path: str):
+        return os.scandir(path)
+
+    def listdir(self, path: str) -> List[str]:
+        return os.listdir(path)
+
+    def stat(self, path: str) -> os.stat_result:
+        return os.stat(path)
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def is_link(self, path: str) -> bool:
+        return os.path.islink(path)
+
+    def rmdir(self, path: str) -> None:
+        os.rmdir(path)
+
+
+LOCAL_FS = LocalFileSystem()
+
+# Child markers in MemoryFileSystem listings; non-negative ints are file sizes
+_DIR = -1
+_LINK = -2
+
+
+def _stat_result(mode: int, size: int) -> os.stat_result:
+    return os.stat_result((mode, 0, 0, 1, 0, 0, size, 0, 0, 0))
+
+
+class _MemoryEntry:
+    """os.DirEntry look-alike for MemoryFileSystem.scandir."""
+
+    __slots__ = ("name", "path", "_kind")
+
+    def __init__(self, name: str, path: str, kind: int):
+        self.name = name
+        self.path = path
+        self._kind = kind
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._kind == _DIR
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return self._kind >= 0
+
+    def is_symlink(self) -> bool:
+        return self._kind == _LINK
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        if self._kind == _DIR:
+            return _stat_result(stat.S_IFDIR | 0o755, 0)
+        if self._kind == _LINK:
+            return _stat_result(stat.S_IFLNK | 0o777, 0)
+        return _stat_result(stat.S_IFREG | 0o644, self._kind)
+
+
+class ListedScandir:
+    """os.scandir-style iterator/context manager over an already-listed directory."""
+
+    def __init__(self, entries: list):
+        self._entries = iter(entries)
+
+    def __iter__(self) -> "ListedScandir":
+        return self
+
+    def __next__(self):
+        return next(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._entries = iter(())
+
+
+class MemoryFileSystem(FileSystem):
+    """In-memory directory tree.
+
+    Only directories that have children own a listing dict ({name: size or
+    marker}); empty directories exist purely as a marker in their parent, so a
+    tree of millions of mostly-leaf folders stays compact. Paths are built with
+    os.path.join and are expected to be normalized.
+
+    Thread-safe for concurrent reads; mutations (rmdir) are single dict
+    operations and safe under the GIL.
+    """
+
+    def __init__(self, *roots: str):
+        self._listings: Dict[str, Dict[str, int]] = {}
+        self._roots: Set[str] = set()
+        self._denied: Set[str] = set()
+        for root in roots:
+            self.add_root(root)
+
+    # -- building ---------------------------------------------------------
+
+    def add_root(self, root: str) -> str:
+        """Register a top-level directory (e.g. the scan root)."""
+        self._roots.add(root)
+        return root
+
+    def mkdir(self, path: str) -> str:
+        """Create a directory whose parent already exists."""
+        self._add_child(path, _DIR)
+        return path
+
+    def makedirs(self, path: str) -> str:
+        """Create a directory and any missing parents below an existing root."""
+        if path in self._roots or self._kind(path) == _DIR:
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            raise FileNotFoundError(errno.ENOENT, "No root for path", path)
+        self.makedirs(parent)
+        return self.mkdir(path)
+
+    def add_file(self, path: str, size: int = 0) -> str:
+        """Create a file of `size` bytes (contents are not stored)."""
+        self._add_child(path, max(0, int(size)))
+        return path
+
+    def symlink(self, path: str) -> str:
+        """Create a symlink entry (never followed by the scanner)."""
+        self._add_child(path, _LINK)
+        return path
+
+    def deny(self, path: str) -> None:
+        """Make listing `path` raise PermissionError."""
+        self._denied.add(path)
+
+    def _add_child(self, path: str, kind: int) -> None:
+        parent, name = os.path.split(path)
+        if self._kind(parent) != _DIR:
+            raise FileNotFoundError(errno.ENOENT, "Parent directory does not exist", parent)
+        listing = self._listings.setdefault(parent, {})
+        if name in listing:
+            raise FileExistsError(errno.EEXIST, "File exists", path)
+        listing[name] = kind
+
+    # -- queries ----------------------------------------------------------
+
+    def _kind(self, path: str) -> Optional[int]:
+        if path in self._roots:
+            return _DIR
+        parent, name = os.path.split(path)
+        if not name or parent == path:
+            return None
+        listing = self._listings.get(parent)
+        return listing.get(name) if listing else None
+
+    def _listing(self, path: str) -> Dict[str, int]:
+        kind = self._kind(path)
+        if kind is None:
+            raise FileNotFoundError(errno.ENOENT, "No such file or directory", path)
+        if kind != _DIR:
+            raise NotADirectoryError(errno.ENOTDIR, "Not a directory", path)
+        if path in self._denied:
+            raise PermissionError(errno.EACCES, "Permission denied", path)
+        return self._listings.get(path, {})
+
+    def scandir(self, path: str) -> ListedScandir:
+        join = os.path.join
+        return ListedScandir([_MemoryEntry(name, join(path, name), kind)
+                               for name, kind in list(self._listing(path).items())])
+
+    def listdir(self, path: str) -> List[str]:
+        return list(self._listing(path))
+
+    def stat(self, path: str) -> os.stat_result:
+        kind = self._kind(path)
+        if kind is None:
+            raise FileNotFoundError(errno.ENOENT, "No such file or directory", path)
+        return _MemoryEntry(os.path.basename(path), path, kind).stat()
+
+    def exists(self, path: str) -> bool:
+        return self._kind(path) is not None
+
+    def is_link(self, path: str) -> bool:
+        return self._kind(path) == _LINK
+
+    def rmdir(self, path: str) -> None:
+        if self._listing(path):
+            raise OSError(errno.ENOTEMPTY, "Directory not empty", path)
+        if path in self._roots:
+            self._roots.discard(path)
+            return
+        parent, name = os.path.split(path)
+        listing = self._listings[parent]
+        del listing[name]
+        if not listing:
+            del self._listings[parent]
+
+    def counts(self) -> Dict[str, int]:
+        """Folder, file and empty-folder totals over the whole tree."""
+        folders = len(self._roots)
+        files = 0
+        for listing in self._listings.values():
+            for kind in listing.values():
+                if kind == _DIR:
+                    folders += 1
+                elif kind >= 0:
+                    files += 1
+        # Every directory without a listing has no entries at all
+        return {"folders": folders, "files": files, "empty": folders - len(self._listings)}
+
@@ -0,0 +1,243 @@
+"""
+Latency-injecting filesystem for repeatable strategy evaluation.
+
+SimulatedFileSystem wraps another backend (usually a MemoryFileSystem) and
+delays every call according to a latency model, so BFS/DFS and worker-count
+choices for HDDs, SSDs and network shares can be compared on one machine:
+
+    HddLatency  single actuator; seek time grows with the distance between
+                directories on a simulated platter (subdirectories sit near
+                their parent, so traversal order matters)
+    SsdLatency  fixed random-read latency, many requests in parallel
+    NfsLatency  one round trip plus jitter per RPC; large listings page
+
+Every model can also inject occasional stalls.
+"""
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+from common.constants import (
+    SIM_HDD_FULL_SEEK_MS,
+    SIM_HDD_SETTLE_MS,
+    SIM_HDD_ROTATION_MS,
+    SIM_HDD_BLOCK_READ_MS,
+    SIM_HDD_CHILD_SPAN,
+    SIM_CACHED_OP_MS,
+    SIM_DIR_ENTRIES_PER_BLOCK,
+    SIM_SSD_READ_MS,
+    SIM_SSD_QUEUE_DEPTH,
+    SIM_NFS_RTT_MS,
+    SIM_NFS_JITTER_MS,
+    SIM_NFS_ENTRIES_PER_RPC,
+    SIM_NFS_MAX_INFLIGHT,
+    SIM_STALL_SECONDS,
+)
+from utils.filesystem import FileSystem, ListedScandir
+
+LISTING_OPS = ("scandir", "listdir")
+
+
+class LatencyModel:
+    """No device latency; only injects stalls. Base class for the device models.
+
+    Args:
+        root: Scan root (used by models that lay the tree out on a device)
+        stall_rate: Probability that a call stalls for stall_seconds
+        stall_seconds: Extra delay of a stalled call
+        seed: RNG seed for jitter and stalls
+    """
+
+    name = "none"
+    slots = 0  # Requests served concurrently (0 = unlimited)
+
+    def __init__(self, root: Optional[str] = None, stall_rate: float = 0.0,
+                 stall_seconds: float = SIM_STALL_SECONDS, seed: int = 0):
+        self.root = root
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()  # Guards model state (head position, RNG)
+
+    def service_time(self, op: str, path: str, entries: int) -> float:
+        """Seconds the device needs for one call (called under self.lock)."""
+        return 0.0
+
+    def delay(self, op: str, path: str, entries: int = 0) -> Tuple[float, bool]:
+        """Delay for one call.
+
+        Args:
+            op: FileSystem method name ("scandir", "stat", "rmdir", ...)
+            path: Path the call targets
+            entries: Entries returned (listing calls)
+
+        Returns:
+            (seconds, stalled)
+        """
+        with self.lock:
+            seconds = self.service_time(op, path, entries)
+            stalled = self.stall_rate > 0 and self.rng.random() < self.stall_rate
+        return seconds + (self.stall_seconds if stalled else 0.0), stalled
+
+
+class SsdLatency(LatencyModel):
+    """Flat random-read latency; listings read one block per SIM_DIR_ENTRIES_PER_BLOCK entries."""
+
+    name = "ssd"
+    slots = SIM_SSD_QUEUE_DEPTH
+
+    def service_time(self, op: str, path: str, entries: int) -> float:
+        if op not in LISTING_OPS:
+            return SIM_CACHED_OP_MS / 1000
+        return math.ceil(max(entries, 1) / SIM_DIR_ENTRIES_PER_BLOCK) * SIM_SSD_READ_MS / 1000
+
+
+class HddLatency(LatencyModel):
+    """Single-actuator disk with distance-dependent seeks.
+
+    Each directory maps to a position in [0, 1): a child lies inside its
+    parent's region, which is SIM_HDD_CHILD_SPAN of the parent's span, at a
+    stable hash-derived offset. Listing a directory seeks from the previous
+    head position (settle + full seek * sqrt(distance)), waits half a
+    rotation, then reads further blocks sequentially. Metadata calls are
+    served from the page cache.
+    """
+
+    name = "hdd"
+    slots = 1
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.head = 0.0
+
+    def position(self, path: str) -> float:
+        """Deterministic platter position of a directory."""
+        if self.root and (path == self.root or path.startswith(self.root.rstrip(os.sep) + os.sep)):
+            path = path[len(self.root):]
+        position = 0.0
+        span = 1.0
+        for part in path.split(os.sep):
+            if part:
+                position += span * (1 - SIM_HDD_CHILD_SPAN) * (zlib.crc32(part.encode()) / 2**32)
+                span *= SIM_HDD_CHILD_SPAN
+        return position
+
+    def service_time(self, op: str, path: str, entries: int) -> float:
+        if op not in LISTING_OPS:
+            return SIM_CACHED_OP_MS / 1000
+        target = self.position(path)
+        distance = abs(target - self.head)
+        self.head = target
+        seek_ms = SIM_HDD_SETTLE_MS + SIM_HDD_FULL_SEEK_MS * math.sqrt(distance) if distance else 0.0
+        extra_blocks = math.ceil(max(entries, 1) / SIM_DIR_ENTRIES_PER_BLOCK) - 1
+        return (seek_ms + SIM_HDD_ROTATION_MS / 2 + extra_blocks * SIM_HDD_BLOCK_READ_MS) / 1000
+
+
+class NfsLatency(LatencyModel):
+    """One RPC per call (GETATTR, RMDIR, ...); listings take one READDIRPLUS per page."""
+
+    name = "nfs"
+    slots = SIM_NFS_MAX_INFLIGHT
+
+    def service_time(self, op: str, path: str, entries: int) -> float:
+        rpcs = math.ceil(max(entries, 1) / SIM_NFS_ENTRIES_PER_RPC) if op in LISTING_OPS else 1
+        return sum(SIM_NFS_RTT_MS + self.rng.uniform(0, SIM_NFS_JITTER_MS) for _ in range(rpcs)) / 1000
+
+
+LATENCY_MODELS = {model.name: model for model in (LatencyModel, SsdLatency, HddLatency, NfsLatency)}
+
+
+class SimulatedFileSystem(FileSystem):
+    """Wraps a backend and delays each call per a LatencyModel.
+
+    Concurrency is capped at model.slots in-flight calls (1 for an HDD), so
+    extra workers queue exactly as they would on the device.
+
+    Args:
+        inner: Backend holding the actual tree
+        model: Latency model
+        time_scale: Multiplier on real sleeps (0 = account delays without sleeping)
+        sleep: Sleep function (injectable for tests)
+    """
+
+    def __init__(self, inner: FileSystem, model: LatencyModel, time_scale: float = 1.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.inner = inner
+        self.model = model
+        self.time_scale = time_scale
+        self._sleep = sleep
+        self._slots = threading.BoundedSemaphore(model.slots) if model.slots else None
+        self._stats_lock = threading.Lock()
+        self._calls: Dict[str, int] = {}
+        self._seconds: Dict[str, float] = {}
+        self._stalls = 0
+
+    def _wait(self, op: str, path: str, entries: int = 0) -> None:
+        if self._slots:
+            self._slots.acquire()
+        try:
+            seconds, stalled = self.model.delay(op, path, entries)
+            if seconds > 0 and self.time_scale > 0:
+                self._sleep(seconds * self.time_scale)
+        finally:
+            if self._slots:
+                self._slots.release()
+        with self._stats_lock:
+            self._calls[op] = self._calls.get(op, 0) + 1
+            self._seconds[op] = self._seconds.get(op, 0.0) + seconds
+            self._stalls += stalled
+
+    def _call(self, op: str, path: str, *args):
+        try:
+            result = getattr(self.inner, op)(path, *args)
+        except OSError:
+            self._wait(op, path)
+            raise
+        self._wait(op, path)
+        return result
+
+    def scandir(self, path: str) -> ListedScandir:
+        try:
+            with self.inner.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            self._wait("scandir", path)
+            raise
+        self._wait("scandir", path, len(entries))
+        return ListedScandir(entries)
+
+    def listdir(self, path: str):
+        try:
+            names = self.inner.listdir(path)
+        except OSError:
+            self._wait("listdir", path)
+            raise
+        self._wait("listdir", path, len(names))
+        return names
+
+    def stat(self, path: str) -> os.stat_result:
+        return self._call("stat", path)
+
+    def exists(self, path: str) -> bool:
+        return self._call("exists", path)
+
+    def is_link(self, path: str) -> bool:
+        return self._call("is_link", path)
+
+    def rmdir(self, path: str) -> None:
+        self._call("rmdir", path)
+
+    def stats(self) -> Dict[str, object]:
+        """Calls, simulated seconds per operation and stall count so far."""
+        with self._stats_lock:
+            return {
+                "model": self.model.name,
+                "calls": dict(self._calls),
+                "seconds": {op: round(value, 6) for op, value in self._seconds.items()},
+                "simulated_seconds": round(sum(self._seconds.values()), 6),
+                "stalls": self._stalls,
+            }
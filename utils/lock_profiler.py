@@ -0,0 +1,171 @@
+"""
+Lock contention profiling for Void Walker v4 (--lock-stats).
+
+Engine, Database and Dashboard locks are wrapped in InstrumentedLock,
+which records acquisitions, wait time and hold time per (lock, call site).
+Statistics are kept in per-thread shards, so the instrumentation adds no
+shared state of its own to the locks it measures.
+"""
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Stat cells per (lock, site): acquisitions, contended, wait_ns, max_wait_ns, hold_ns, max_hold_ns
+_ACQ, _CONTENDED, _WAIT, _MAX_WAIT, _HOLD, _MAX_HOLD = range(6)
+
+
+class LockProfiler:
+    """Collects InstrumentedLock statistics and formats the contention table."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, str], list]] = []
+        self._registry_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, str], list]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._registry_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _cells(self, key: Tuple[str, str]) -> list:
+        shard = getattr(self._local, 'shard', None) or self._shard()
+        cells = shard.get(key)
+        if cells is None:
+            cells = shard[key] = [0, 0, 0, 0, 0, 0]
+        return cells
+
+    def wrap(self, lock, name: str) -> "InstrumentedLock":
+        """Return an instrumented proxy for `lock` reported as `name`."""
+        return InstrumentedLock(lock, self, name)
+
+    def snapshot(self) -> Dict[Tuple[str, str], list]:
+        """Merge shards into {(lock, site): [acq, contended, wait_ns, max_wait_ns, hold_ns, max_hold_ns]}."""
+        with self._registry_lock:
+            shards = list(self._shards)
+        merged: Dict[Tuple[str, str], list] = {}
+        for shard in shards:
+            for key, cells in list(shard.items()):
+                total = merged.setdefault(key, [0, 0, 0, 0, 0, 0])
+                for i in (_ACQ, _CONTENDED, _WAIT, _HOLD):
+                    total[i] += cells[i]
+                for i in (_MAX_WAIT, _MAX_HOLD):
+                    total[i] = max(total[i], cells[i])
+        return merged
+
+    def format_report(self, limit: int = 20) -> List[str]:
+        """Contention table, worst total wait first.
+
+        Args:
+            limit: Maximum number of (lock, site) rows
+
+        Returns:
+            Lines ready to print (empty when no lock was taken)
+        """
+        stats = self.snapshot()
+        if not stats:
+            return []
+        rows = sorted(stats.items(), key=lambda item: (item[1][_WAIT], item[1][_HOLD]), reverse=True)
+        lines = [
+            f" {'Lock / Site':<56} {'Acquired':>9} {'Cont%':>6} {'Wait ms':>9} {'MaxW ms':>8} "
+            f"{'Hold ms':>9} {'MaxH ms':>8}",
+            " " + "-" * 110,
+        ]
+        for (name, site), cells in rows[:limit]:
+            label = f"{name} @ {site}"
+            if len(label) > 56:
+                label = "..." + label[-53:]
+            contended_pct = cells[_CONTENDED] * 100 / cells[_ACQ] if cells[_ACQ] else 0.0
+            lines.append(
+                f" {label:<56} {cells[_ACQ]:>9,} {contended_pct:>5.1f}% {cells[_WAIT] / 1e6:>9.1f} "
+                f"{cells[_MAX_WAIT] / 1e6:>8.2f} {cells[_HOLD] / 1e6:>9.1f} {cells[_MAX_HOLD] / 1e6:>8.2f}"
+            )
+        # Per-lock totals show which lock limits scaling regardless of call site
+        totals: Dict[str, list] = {}
+        for (name, _), cells in stats.items():
+            total = totals.setdefault(name, [0, 0, 0])
+            total[0] += cells[_ACQ]
+            total[1] += cells[_WAIT]
+            total[2] += cells[_HOLD]
+        lines.append(" " + "-" * 110)
+        for name, (acquired, wait_ns, hold_ns) in sorted(totals.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f" {name:<56} {acquired:>9,} {'':>6} {wait_ns / 1e6:>9.1f} {'':>8} {hold_ns / 1e6:>9.1f}")
+        return lines
+
+
+def _site_label(frame) -> str:
+    """'Class.method:line' for the frame that takes the lock (closures keep their outer name)."""
+    code = frame.f_code
+    name = getattr(code, 'co_qualname', code.co_name).replace(".<locals>", "")
+    return f"{name}:{frame.f_lineno}"
+
+
+class InstrumentedLock:
+    """Lock/RLock proxy that records wait and hold time per call site.
+
+    Hold time is measured from the outermost acquisition to the matching
+    release, so re-entrant RLock use is counted once. Only the owning
+    thread touches the hold-tracking fields.
+
+    Args:
+        lock: Underlying threading.Lock or RLock
+        profiler: LockProfiler receiving the statistics
+        name: Lock name shown in the report (e.g. "Engine.queue_lock")
+    """
+
+    def __init__(self, lock, profiler: LockProfiler, name: str):
+        self._lock = lock
+        self._profiler = profiler
+        self.name = name
+        self._depth = 0
+        self._held_since = 0
+        self._held_cells = None
+
+    def _acquire(self, site_frame, blocking: bool, timeout: float) -> bool:
+        cells = self._profiler._cells((self.name, _site_label(site_frame)))
+        if self._lock.acquire(False):
+            waited = 0
+        else:
+            if not blocking:
+                return False
+            start = time.perf_counter_ns()
+            if not self._lock.acquire(True, timeout):
+                return False
+            waited = time.perf_counter_ns() - start
+            cells[_CONTENDED] += 1
+            cells[_WAIT] += waited
+            if waited > cells[_MAX_WAIT]:
+                cells[_MAX_WAIT] = waited
+        cells[_ACQ] += 1
+        if self._depth == 0:
+            self._held_since = time.perf_counter_ns()
+            self._held_cells = cells
+        self._depth += 1
+        return True
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return self._acquire(sys._getframe(1), blocking, timeout)
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            held = time.perf_counter_ns() - self._held_since
+            cells = self._held_cells
+            cells[_HOLD] += held
+            if held > cells[_MAX_HOLD]:
+                cells[_MAX_HOLD] = held
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self._acquire(sys._getframe(1), True, -1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
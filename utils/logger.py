@@ -1,28 +1,70 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 
-def setup_logger(session_id: str) -> logging.Logger:
+from common.constants import LOG_DIRECTORY, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+# Background writer for the current session (replaced on each setup_logger call)
+_listener = None
+
+
+def setup_logger(session_id: str, level: str = "INFO") -> logging.Logger:
     """
     Setup and configure logger for a session.
-    
+
+    Records are handed to a QueueHandler, so worker threads only enqueue;
+    a QueueListener thread does the file I/O into a size-rotated log file.
+
     Args:
         session_id: Unique session identifier
-        
+        level: Minimum level to record (DEBUG, INFO, WARNING or ERROR)
+
     Returns:
         Configured Logger instance
     """
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
-        
+    if not os.path.exists(LOG_DIRECTORY):
+        os.makedirs(LOG_DIRECTORY)
+
+    # Flush and stop the previous session's writer before replacing it
+    shutdown_logger()
+
     logger = logging.getLogger("VoidWalker")
-    logger.setLevel(logging.INFO)
-    
+    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+
     # Clear existing handlers to prevent accumulation (memory leak fix)
     logger.handlers.clear()
-    
-    # File Handler
-    fh = logging.FileHandler(f"logs/{session_id}.log", encoding='utf-8')
+
+    # Rotating file handler, driven by the background listener
+    fh = logging.handlers.RotatingFileHandler(
+        os.path.join(LOG_DIRECTORY, f"{session_id}.log"),
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding='utf-8'
+    )
     fh.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
-    
-    logger.addHandler(fh)
+
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, fh, respect_handler_level=True)
+    _listener.start()
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
     return logger
+
+
+def shutdown_logger() -> None:
+    """Drain queued records to disk and stop the background writer."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logger)
@@ -0,0 +1,246 @@
+"""
+Low-contention metrics primitives for Void Walker v4.
+Worker threads write to their own shard; readers aggregate on demand.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class ShardedCounters:
+    """Named monotonic counters sharded per thread.
+
+    Each thread increments a private dict, so the hot path takes no lock
+    (only a thread's first increment registers its shard). Readers sum all
+    shards; a snapshot may lag an in-progress increment by one, which is fine
+    for display and export.
+
+    Args:
+        names: Counter names this instance tracks
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = tuple(names)
+        self._local = threading.local()
+        self._shards: List[Dict[str, int]] = []
+        self._registry_lock = threading.Lock()
+
+    def _shard(self) -> Dict[str, int]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = dict.fromkeys(self.names, 0)
+            with self._registry_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def add(self, name: str, amount: int = 1) -> None:
+        """Increment a counter from the calling thread's shard."""
+        shard = getattr(self._local, 'shard', None) or self._shard()
+        shard[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        """Sum all shards into a single {name: total} dict."""
+        with self._registry_lock:
+            shards = list(self._shards)
+        totals = dict.fromkeys(self.names, 0)
+        for shard in shards:
+            for name in self.names:
+                totals[name] += shard[name]
+        return totals
+
+
+class RateHistory:
+    """Per-second ring buffer of cumulative metrics with windowed and EWMA rates.
+
+    The render loop records the current totals on every tick. Samples are
+    bucketed by whole second (the latest tick in a second wins), so the
+    buffer holds at most `capacity` seconds of history regardless of tick
+    rate. Rates are derived from differences between samples, which makes
+    them reflect recent throughput rather than a lifetime average.
+
+    Args:
+        capacity: Seconds of history to keep
+        ewma_alpha: Smoothing factor for the per-second EWMA (0-1)
+    """
+
+    SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+    def __init__(self, capacity: int = 300, ewma_alpha: float = 0.3):
+        # Each sample: (second, timestamp, {name: cumulative value})
+        self.samples = deque(maxlen=capacity)
+        self.ewma_alpha = ewma_alpha
+        self._ewma: Dict[str, float] = {}
+
+    def record(self, now: float, values: Dict[str, float]) -> None:
+        """Record cumulative values observed at time `now`."""
+        second = int(now)
+        if self.samples and self.samples[-1][0] == second:
+            self.samples[-1] = (second, now, dict(values))
+            return
+        # Entering a new second closes the previous one: fold it into the EWMA
+        if len(self.samples) >= 2:
+            (sec_a, _, prev), (sec_b, _, last) = self.samples[-2], self.samples[-1]
+            span = sec_b - sec_a
+            for name, value in last.items():
+                per_second = (value - prev.get(name, 0)) / span
+                if name in self._ewma:
+                    self._ewma[name] = self.ewma_alpha * per_second + (1 - self.ewma_alpha) * self._ewma[name]
+                else:
+                    self._ewma[name] = per_second
+        self.samples.append((second, now, dict(values)))
+
+    def rate(self, name: str, window: float) -> Optional[float]:
+        """Average per-second change of `name` over the last `window` seconds (None if unknown)."""
+        if len(self.samples) < 2:
+            return None
+        _, latest_time, latest = self.samples[-1]
+        base_time, base = None, None
+        for _, sample_time, values in self.samples:
+            if latest_time - sample_time <= window:
+                base_time, base = sample_time, values
+                break
+        if base is None or latest_time - base_time <= 0:
+            return None
+        return (latest[name] - base[name]) / (latest_time - base_time)
+
+    def ewma(self, name: str) -> Optional[float]:
+        """Exponentially weighted per-second rate of `name` over closed seconds."""
+        return self._ewma.get(name)
+
+    def per_second(self, name: str, count: int) -> List[float]:
+        """Per-second deltas of `name` for the last `count` closed seconds."""
+        samples = list(self.samples)[:-1]  # The latest second is still filling
+        deltas = []
+        for (sec_a, _, prev), (sec_b, _, last) in zip(samples, samples[1:]):
+            deltas.append((last[name] - prev[name]) / (sec_b - sec_a))
+        return deltas[-count:]
+
+    def sparkline(self, name: str, width: int = 20) -> str:
+        """Compact unicode bar chart of recent per-second deltas of `name`."""
+        deltas = self.per_second(name, width)
+        if not deltas:
+            return ""
+        peak = max(deltas)
+        if peak <= 0:
+            return self.SPARK_CHARS[0] * len(deltas)
+        top = len(self.SPARK_CHARS) - 1
+        return "".join(self.SPARK_CHARS[int(max(0.0, d) / peak * top)] for d in deltas)
+
+    def eta_seconds(self, queue_name: str, window: float) -> Optional[float]:
+        """Estimate seconds until the frontier drains, accounting for its growth.
+
+        The queue changes by (discovered - completed) per second, so its windowed
+        rate is the net drain rate. While the frontier is still growing there is
+        no meaningful ETA and None is returned.
+        """
+        if not self.samples:
+            return None
+        queue = self.samples[-1][2][queue_name]
+        drift = self.rate(queue_name, window)
+        if queue <= 0 or drift is None or drift >= 0:
+            return None
+        return queue / -drift
+
+
+def log_buckets(start: float, factor: float, count: int) -> List[float]:
+    """Exponentially spaced histogram upper bounds: start, start*factor, ..."""
+    return [start * factor ** i for i in range(count)]
+
+
+class ShardedHistogram:
+    """Histogram with fixed upper bounds, sharded per thread like ShardedCounters.
+
+    Observations may carry a label tuple (e.g. (depth_bucket, device)) so one
+    histogram can be broken down by dimension without extra locking.
+
+    Args:
+        bounds: Sorted bucket upper bounds; values above the last go to +Inf
+    """
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = list(bounds)
+        self._local = threading.local()
+        self._shards: List[Dict[tuple, list]] = []
+        self._registry_lock = threading.Lock()
+
+    def _shard(self) -> Dict[tuple, list]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            with self._registry_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        """Record one observation from the calling thread's shard."""
+        shard = self._shard()
+        # Layout: [bucket counts..., +Inf count, sum]
+        cells = shard.get(labels)
+        if cells is None:
+            cells = shard[labels] = [0] * (len(self.bounds) + 1) + [0.0]
+        cells[bisect_left(self.bounds, value)] += 1
+        cells[-1] += value
+
+    def snapshot(self) -> Dict[tuple, Dict[str, object]]:
+        """Merge shards into {labels: {'buckets': [...], 'count': n, 'sum': s}}.
+
+        'buckets' holds non-cumulative counts per bound, with the +Inf bucket last.
+        """
+        with self._registry_lock:
+            shards = list(self._shards)
+        merged: Dict[tuple, list] = {}
+        for shard in shards:
+            for labels, cells in list(shard.items()):
+                total = merged.setdefault(labels, [0] * len(cells[:-1]) + [0.0])
+                for i, value in enumerate(cells):
+                    total[i] += value
+        return {
+            labels: {'buckets': cells[:-1], 'count': sum(cells[:-1]), 'sum': cells[-1]}
+            for labels, cells in merged.items()
+        }
+
+
+class ShardedTopN:
+    """Keeps the N items with the largest keys, sharded per thread.
+
+    Each thread maintains a private min-heap of at most N entries, so an
+    offer that does not beat the thread's current N-th best is one
+    comparison. Readers merge the shards.
+
+    Args:
+        n: Number of items to keep
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._registry_lock = threading.Lock()
+
+    def _shard(self) -> list:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = []
+            with self._registry_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def offer(self, key: float, item) -> None:
+        """Consider `item` ranked by `key` (items with equal keys must be orderable)."""
+        heap = self._shard()
+        if len(heap) < self.n:
+            heapq.heappush(heap, (key, item))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, item))
+
+    def top(self) -> List[tuple]:
+        """Return up to N (key, item) pairs, largest key first."""
+        with self._registry_lock:
+            shards = list(self._shards)
+        merged = [entry for shard in shards for entry in list(shard)]
+        return heapq.nlargest(self.n, merged)
@@ -0,0 +1,156 @@
+"""
+Built-in profiling mode for Void Walker v4 (--profile / --profile-memory).
+
+cProfile only observes the thread that enabled it, so each worker thread
+gets its own profiler around every task and the results are merged with
+the main thread's when a phase ends. Output lands in logs/ next to the
+session log:
+
+    logs/<session>_<phase>.pstats        merged cProfile stats
+    logs/<session>_<phase>_profile.txt   top functions by cumulative time
+    logs/<session>_<phase>_alloc.txt     top allocations and growth (--profile-memory)
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Optional
+
+from common.constants import PROFILE_REPORT_LINES, PROFILE_TRACEMALLOC_FRAMES
+
+
+def profiled_phase(phase: str):
+    """Method decorator: run the method under `self.profiler.phase(phase)` when profiling."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, 'profiler', None)
+            if profiler is None:
+                return method(self, *args, **kwargs)
+            with profiler.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PhaseProfiler:
+    """Collects CPU (and optionally memory) profiles per engine phase.
+
+    Args:
+        session_id: Session whose log directory receives the output
+        memory: Also trace allocations with tracemalloc
+        log_dir: Output directory
+    """
+
+    def __init__(self, session_id: str, memory: bool = False, log_dir: str = "logs"):
+        self.session_id = session_id
+        self.memory = memory
+        self.log_dir = log_dir
+        self.written: List[str] = []  # Files produced so far
+        self._phase: Optional[str] = None
+        self._local = threading.local()
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._registry_lock = threading.Lock()
+        self._first_snapshot = None
+        self._last_snapshot = None
+
+    def _path(self, phase: str, suffix: str) -> str:
+        return os.path.join(self.log_dir, f"{self.session_id}_{phase}{suffix}")
+
+    @contextmanager
+    def phase(self, name: str):
+        """Profile the calling thread, plus wrapped worker tasks, until the block exits."""
+        self._phase = name
+        with self._registry_lock:
+            self._thread_profiles = []
+        self._first_snapshot = self._last_snapshot = None
+        if self.memory:
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            self.snapshot_memory()
+        main_profile = cProfile.Profile()
+        main_profile.enable()
+        try:
+            yield self
+        finally:
+            main_profile.disable()
+            self._phase = None
+            self._write_cpu_report(name, main_profile)
+            if self.memory:
+                self.snapshot_memory()
+                self._write_memory_report(name)
+                tracemalloc.stop()
+
+    def wrap(self, func):
+        """Return `func` wrapped so each call on a worker thread is profiled."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self._phase is None:
+                return func(*args, **kwargs)
+            profile = getattr(self._local, 'profile', None)
+            if profile is None:
+                profile = self._local.profile = cProfile.Profile()
+                with self._registry_lock:
+                    self._thread_profiles.append(profile)
+            try:
+                profile.enable()
+            except ValueError:
+                # Interpreters where cProfile is process-wide already see this thread
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+        return wrapper
+
+    def snapshot_memory(self) -> None:
+        """Take a tracemalloc snapshot (call at commit boundaries); keeps first and latest only."""
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self._first_snapshot is None:
+            self._first_snapshot = snapshot
+        self._last_snapshot = snapshot
+
+    def _write_cpu_report(self, phase: str, main_profile: cProfile.Profile) -> None:
+        os.makedirs(self.log_dir, exist_ok=True)
+        stats = pstats.Stats(main_profile)
+        with self._registry_lock:
+            thread_profiles = list(self._thread_profiles)
+        for profile in thread_profiles:
+            profile.create_stats()
+            if profile.stats:
+                stats.add(profile)
+        # Each worker thread's profile is a reused object; drop it for the next phase
+        self._local = threading.local()
+
+        stats_path = self._path(phase, ".pstats")
+        stats.dump_stats(stats_path)
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_REPORT_LINES)
+        report_path = self._path(phase, "_profile.txt")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(f"Phase: {phase} ({len(thread_profiles)} worker thread profile(s) merged)\n")
+            f.write(buffer.getvalue())
+        self.written.extend([stats_path, report_path])
+
+    def _write_memory_report(self, phase: str) -> None:
+        if self._last_snapshot is None:
+            return
+        report_path = self._path(phase, "_alloc.txt")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(f"Phase: {phase}\n\nTop allocations at phase end:\n")
+            for stat in self._last_snapshot.statistics("lineno")[:PROFILE_REPORT_LINES]:
+                f.write(f"  {stat}\n")
+            if self._first_snapshot is not self._last_snapshot:
+                f.write("\nGrowth since phase start:\n")
+                for stat in self._last_snapshot.compare_to(self._first_snapshot, "lineno")[:PROFILE_REPORT_LINES]:
+                    f.write(f"  {stat}\n")
+        self.written.append(report_path)
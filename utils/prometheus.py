@@ -0,0 +1,206 @@
+"""
+Prometheus text-format exposition for Void Walker v4.
+
+Metrics are rendered on demand from the same sharded structures the
+Dashboard reads, so exporting adds no work to the scan hot path: an HTTP
+scrape or a textfile write aggregates the shards at that moment.
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from common.constants import METRICS_HTTP_HOST, METRICS_TEXTFILE_INTERVAL
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+PROFILE_LABELS = ("depth", "device")
+
+# (metric name, dashboard counter, help text)
+COUNTER_METRICS = (
+    ("voidwalker_folders_scanned_total", "scanned", "Folders scanned"),
+    ("voidwalker_empty_folders_total", "empty", "Empty folders found"),
+    ("voidwalker_errors_total", "errors", "Folders that failed to scan or delete"),
+    ("voidwalker_folders_deleted_total", "deleted", "Folders deleted (or marked in dry run)"),
+    ("voidwalker_bytes_scanned_total", "total_size_bytes", "Bytes of file data seen"),
+)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render_histogram(lines: List[str], name: str, help_text: str, histogram,
+                     base_labels: Dict[str, str], label_names: tuple = ()) -> None:
+    """Append a ShardedHistogram in Prometheus histogram format to `lines`.
+
+    Args:
+        lines: Output buffer
+        name: Metric base name (without _bucket/_sum/_count)
+        help_text: HELP line text
+        histogram: ShardedHistogram to read
+        base_labels: Labels attached to every sample (e.g. session)
+        label_names: Names for the histogram's label tuple, in order
+    """
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    bounds = histogram.bounds
+    for label_values, data in sorted(histogram.snapshot().items(), key=lambda item: tuple(map(str, item[0]))):
+        labels = dict(base_labels)
+        labels.update(zip(label_names, label_values))
+        cumulative = 0
+        for bound, count in zip(bounds + [None], data['buckets']):
+            cumulative += count
+            le = "+Inf" if bound is None else repr(float(bound))
+            lines.append(f"{name}_bucket{_format_labels(dict(labels, le=le))} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(float(data['sum']))}")
+        lines.append(f"{name}_count{_format_labels(labels)} {data['count']}")
+
+
+def render_metrics(engine) -> str:
+    """Render the engine's live metrics in Prometheus text exposition format.
+
+    Args:
+        engine: Running Engine (reads its dashboard, scan profile, database and in-flight set)
+
+    Returns:
+        Exposition text ending with a newline
+    """
+    base = {"session": engine.config.session_id}
+    labels = _format_labels(base)
+    totals = engine.dashboard.counter_totals()
+    with engine.lock:
+        active_workers = len(engine.in_flight)
+
+    lines = []
+    for name, key, help_text in COUNTER_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{labels} {totals[key]}")
+
+    gauges = (
+        ("voidwalker_queue_depth", "Folders waiting in the in-memory frontier", totals['queue_depth']),
+        ("voidwalker_active_workers", "Folders currently being scanned", active_workers),
+        ("voidwalker_scan_rate", "Folders per second over the short dashboard window",
+         float(engine.dashboard.stats.get('scan_rate', 0.0))),
+    )
+    for name, help_text, value in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name}{labels} {_format_value(value)}")
+
+    profile = engine.profile
+    render_histogram(lines, "voidwalker_scandir_seconds", "Time to list one directory (excluding DB and filters)",
+                     profile.phase_latency["enumerate"], base, PROFILE_LABELS)
+    render_histogram(lines, "voidwalker_scan_db_seconds", "Database time spent per scanned directory",
+                     profile.phase_latency["db"], base, PROFILE_LABELS)
+    render_histogram(lines, "voidwalker_scan_filter_seconds", "Filter evaluation time per scanned directory",
+                     profile.phase_latency["filter"], base, PROFILE_LABELS)
+    render_histogram(lines, "voidwalker_directory_entries", "Entries listed per scanned directory",
+                     profile.entries, base, PROFILE_LABELS)
+    render_histogram(lines, "voidwalker_db_write_seconds", "Database write latency including lock wait",
+                     engine.db.write_latency, base)
+    render_histogram(lines, "voidwalker_db_commit_seconds", "Database commit duration",
+                     engine.db.commit_latency, base)
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str, text: str) -> None:
+    """Atomically replace `path` with `text` (textfile collectors must never see partial files)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """Serves engine metrics over localhost HTTP and/or a textfile collector file.
+
+    Both outputs run on their own daemon threads and render only when a
+    scrape arrives or the write interval elapses.
+
+    Args:
+        engine: Engine whose metrics are exported
+        port: HTTP port on localhost (0 disables the endpoint)
+        textfile: Path of a .prom file to rewrite periodically (None disables)
+        interval: Seconds between textfile writes
+    """
+
+    def __init__(self, engine, port: int = 0, textfile: Optional[str] = None,
+                 interval: float = METRICS_TEXTFILE_INTERVAL):
+        self.engine = engine
+        self.port = port
+        self.textfile = textfile
+        self.interval = interval
+        self.server = None
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+
+    def start(self):
+        if self.port:
+            self.server = ThreadingHTTPServer((METRICS_HTTP_HOST, self.port), self._make_handler())
+            self.server.daemon_threads = True
+            self.port = self.server.server_address[1]
+            self._spawn(self.server.serve_forever)
+        if self.textfile:
+            self._spawn(self._textfile_loop)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        if self.textfile:
+            self._write_textfile()  # Leave final values behind for the collector
+
+    def _spawn(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _write_textfile(self):
+        try:
+            write_textfile(self.textfile, render_metrics(self.engine))
+        except OSError as e:
+            self.engine.logger.warning(f"Metrics textfile write failed: {e}")
+
+    def _textfile_loop(self):
+        while not self._stop_event.is_set():
+            self._write_textfile()
+            self._stop_event.wait(self.interval)
+
+    def _make_handler(self):
+        engine = self.engine
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_metrics(engine).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would otherwise spam stderr over the dashboard
+
+        return Handler
@@ -0,0 +1,140 @@
+"""
+Per-directory scan profiling for Void Walker v4.
+Splits each directory's scan time into enumerate / DB / filter phases and
+aggregates it by depth and device, so a slow scan can be attributed to the
+disk, huge directories or database contention.
+"""
+import os
+from typing import Dict, List, Tuple
+
+from common.constants import (
+    METRICS_LATENCY_BUCKET_START,
+    METRICS_LATENCY_BUCKET_FACTOR,
+    METRICS_LATENCY_BUCKET_COUNT,
+    METRICS_ENTRY_BUCKET_COUNT,
+    PROFILE_TOP_DIRECTORIES
+)
+from utils.metrics import ShardedHistogram, ShardedTopN, log_buckets
+
+PHASES = ("enumerate", "db", "filter")
+
+
+def depth_bucket(depth: int) -> str:
+    """Power-of-two depth band label: '0', '1', '2-3', '4-7', ... '64+'."""
+    if depth < 2:
+        return str(depth)
+    low = 1 << (depth.bit_length() - 1)
+    if low >= 64:
+        return "64+"
+    return f"{low}-{2 * low - 1}"
+
+
+def _read_mount_table() -> Dict[str, Tuple[str, str]]:
+    """{mount point: (source device, filesystem type)} from /proc/mounts (empty where unavailable)."""
+    table = {}
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3:
+                    table[fields[1].replace("\\040", " ")] = (fields[0], fields[2])
+    except OSError:
+        return {}
+    return table
+
+
+def _read_mount_points() -> List[str]:
+    """Mount points from /proc/mounts, longest first (empty where unavailable)."""
+    return sorted(_read_mount_table(), key=len, reverse=True)
+
+
+def device_id(path: str) -> str:
+    """Stable identifier of the volume holding `path`, used to key tuning profiles.
+
+    POSIX: "<fstype>:<source>@<mount point>" from /proc/mounts, else "dev:<st_dev>".
+    Windows: the drive letter or UNC share.
+    """
+    drive = os.path.splitdrive(path)[0]
+    if drive:
+        return drive.upper()
+    table = _read_mount_table()
+    if table:
+        point = DeviceResolver(sorted(table, key=len, reverse=True)).device_of(path)
+        source, fstype = table.get(point, ("?", "?"))
+        return f"{fstype}:{source}@{point}"
+    try:
+        return f"dev:{os.stat(path).st_dev}"
+    except OSError:
+        return "unknown"
+
+
+class DeviceResolver:
+    """Maps a path to a device label without touching the filesystem.
+
+    Windows paths resolve to their drive letter or UNC share; POSIX paths
+    resolve to the longest matching mount point, read once at startup.
+    """
+
+    def __init__(self, mount_points: List[str] = None):
+        self.mount_points = _read_mount_points() if mount_points is None else mount_points
+
+    def device_of(self, path: str) -> str:
+        drive = os.path.splitdrive(path)[0]
+        if drive:
+            return drive.upper()
+        for point in self.mount_points:
+            if path == point or path.startswith(point.rstrip("/") + "/"):
+                return point
+        return "/"
+
+
+class ScanProfile:
+    """Aggregated per-directory scan timings.
+
+    Histograms are labelled (depth_band, device). The slowest and largest
+    directories are tracked with sharded top-N heaps; all recording is
+    thread-local, so workers never contend on it.
+
+    Args:
+        top_n: How many slowest/largest directories to keep
+        resolver: DeviceResolver used to label directories
+    """
+
+    def __init__(self, top_n: int = PROFILE_TOP_DIRECTORIES, resolver: DeviceResolver = None):
+        latency_bounds = log_buckets(METRICS_LATENCY_BUCKET_START, METRICS_LATENCY_BUCKET_FACTOR,
+                                     METRICS_LATENCY_BUCKET_COUNT)
+        self.phase_latency: Dict[str, ShardedHistogram] = {
+            phase: ShardedHistogram(latency_bounds) for phase in PHASES
+        }
+        self.entries = ShardedHistogram(log_buckets(1, 2, METRICS_ENTRY_BUCKET_COUNT))
+        self.slowest = ShardedTopN(top_n)
+        self.largest = ShardedTopN(top_n)
+        self.resolver = resolver or DeviceResolver()
+
+    def record(self, path: str, depth: int, entry_count: int,
+               enumerate_s: float, db_s: float, filter_s: float) -> None:
+        """Record one scanned directory.
+
+        Args:
+            path: Directory path
+            depth: Traversal depth
+            entry_count: Files and folders listed
+            enumerate_s: Seconds spent listing (total minus DB and filter time)
+            db_s: Seconds spent in database calls for this directory
+            filter_s: Seconds spent evaluating exclude/include filters
+        """
+        labels = (depth_bucket(depth), self.resolver.device_of(path))
+        self.phase_latency["enumerate"].observe(enumerate_s, labels)
+        self.phase_latency["db"].observe(db_s, labels)
+        self.phase_latency["filter"].observe(filter_s, labels)
+        self.entries.observe(entry_count, labels)
+        total = enumerate_s + db_s + filter_s
+        self.slowest.offer(total, (path, entry_count, enumerate_s, db_s, filter_s))
+        self.largest.offer(entry_count, (path, total))
+
+    def phase_totals(self) -> Dict[str, float]:
+        """Total seconds per phase across all labels."""
+        return {
+            phase: sum(data['sum'] for data in histogram.snapshot().values())
+            for phase, histogram in self.phase_latency.items()
+        }
@@ -0,0 +1,184 @@
+"""
+Chrome trace-event recording for Void Walker v4 (--trace).
+
+Spans are timed with time.perf_counter_ns and buffered per thread, then
+written as Chrome trace_event JSON (loadable in Perfetto or
+chrome://tracing) with one track per worker thread. When tracing is off,
+the engine uses NULL_TRACER, whose spans are a shared no-op object.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+from common.constants import TRACE_MAX_EVENTS_PER_THREAD, TRACE_MIN_LOCK_WAIT_NS
+
+
+class _Span:
+    __slots__ = ("buffer", "name", "cat", "args", "start")
+
+    def __init__(self, buffer, name, cat, args):
+        self.buffer = buffer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.buffer.add(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ThreadBuffer:
+    """Events recorded by one thread: (name, cat, start_ns, end_ns, args)."""
+
+    __slots__ = ("thread_name", "tid", "events", "dropped")
+
+    def __init__(self):
+        thread = threading.current_thread()
+        self.thread_name = thread.name
+        self.tid = threading.get_native_id()
+        self.events: List[tuple] = []
+        self.dropped = 0
+
+    def add(self, name, cat, start, end, args):
+        if len(self.events) < TRACE_MAX_EVENTS_PER_THREAD:
+            self.events.append((name, cat, start, end, args))
+        else:
+            self.dropped += 1
+
+
+class Tracer:
+    """Records complete ("X") trace events per thread.
+
+    Usage:
+        with tracer.span("scan", "engine", path=path):
+            ...
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.origin_ns = time.perf_counter_ns()
+        self._local = threading.local()
+        self._buffers: List[_ThreadBuffer] = []
+        self._registry_lock = threading.Lock()
+
+    def _buffer(self) -> _ThreadBuffer:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = _ThreadBuffer()
+            with self._registry_lock:
+                self._buffers.append(buffer)
+        return buffer
+
+    def span(self, name: str, cat: str = "engine", **args) -> _Span:
+        """Context manager timing one span on the calling thread."""
+        return _Span(self._buffer(), name, cat, args or None)
+
+    def record(self, name: str, cat: str, start_ns: int, end_ns: int, **args) -> None:
+        """Record an already-timed span on the calling thread."""
+        self._buffer().add(name, cat, start_ns, end_ns, args or None)
+
+    def to_trace_events(self) -> Dict[str, object]:
+        """Build the Chrome trace_event document."""
+        pid = os.getpid()
+        with self._registry_lock:
+            buffers = list(self._buffers)
+        events = []
+        dropped = 0
+        for buffer in buffers:
+            dropped += buffer.dropped
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": buffer.tid,
+                           "args": {"name": buffer.thread_name}})
+            for name, cat, start, end, args in list(buffer.events):
+                event = {"ph": "X", "name": name, "cat": cat, "pid": pid, "tid": buffer.tid,
+                         "ts": (start - self.origin_ns) / 1000, "dur": (end - start) / 1000}
+                if args:
+                    event["args"] = args
+                events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": dropped}}
+
+    def write(self, path: str) -> str:
+        """Write the trace JSON to `path` and return it."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_trace_events(), f)
+        return path
+
+
+class NullTracer:
+    """Tracer stand-in used when tracing is disabled."""
+
+    enabled = False
+
+    def span(self, name: str, cat: str = "engine", **args) -> _NullSpan:
+        return _NULL_SPAN
+
+    def record(self, name: str, cat: str, start_ns: int, end_ns: int, **args) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class TracedLock:
+    """Lock wrapper that records acquisitions which had to wait as trace spans.
+
+    Waits shorter than TRACE_MIN_LOCK_WAIT_NS are not recorded, so
+    uncontended acquisitions do not flood the trace.
+
+    Args:
+        lock: Underlying lock
+        tracer: Tracer receiving the wait spans
+        name: Span name (e.g. "db.lock_wait")
+    """
+
+    def __init__(self, lock, tracer: Tracer, name: str):
+        self._lock = lock
+        self._tracer = tracer
+        self._name = name
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            return True
+        start = time.perf_counter_ns()
+        acquired = self._lock.acquire(blocking, timeout)
+        end = time.perf_counter_ns()
+        if end - start >= TRACE_MIN_LOCK_WAIT_NS:
+            self._tracer.record(self._name, "lock", start, end)
+        return acquired
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
@@ -0,0 +1,190 @@
+"""
+Tree-size estimation by random path sampling (Knuth, 1975).
+
+A probe walks from the root to a leaf, picking a uniformly random
+subdirectory at each level. With b_i the subdirectory count of the i-th
+folder on the path, W_d = b_0 * ... * b_(d-1) is the inverse probability of
+reaching the depth-d folder and S_d = 1 + b_d * S_(d+1) is an unbiased
+estimate of the size of its subtree. Averaged over probes, W_d estimates the
+number of folders at depth d and W_d * S_d the folders at or below it.
+
+Live refinement: the scan knows exactly which folders it has finished and
+how many are pending at each depth (p_d). The remaining work is then
+sum_d p_d * m_d with m_d = E[W_d * S_d] / E[W_d], the mean subtree size at
+depth d. With only the root pending this is Knuth's estimate; as the top of
+the tree is scanned, exact counts replace sampled ones and the interval
+tightens.
+"""
+import math
+import random
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from common.constants import (
+    ESTIMATOR_MIN_PROBES,
+    ESTIMATOR_MAX_PROBES,
+    ESTIMATOR_TARGET_PRECISION,
+    ESTIMATOR_REFRESH_SECONDS,
+    ESTIMATOR_PROBE_PAUSE,
+    ESTIMATOR_Z
+)
+from utils.filesystem import LOCAL_FS
+
+# Only the root pending and nothing scanned: the plain Knuth estimate
+START_PROGRESS = (0, {0: 1})
+
+
+class TreeSizeEstimator:
+    """Background path sampler estimating the total folder count of a scan.
+
+    Args:
+        root: Scan root
+        fs: Filesystem backend (the real disk unless injected)
+        is_filtered: (path, name, depth) -> True for folders the scan skips
+        progress: () -> (folders scanned, {depth: pending folders}); defaults to scan start
+        seed: RNG seed (None = random)
+    """
+
+    def __init__(self, root: str, fs=None, is_filtered: Optional[Callable[[str, str, int], bool]] = None,
+                 progress: Optional[Callable[[], Tuple[int, Dict[int, int]]]] = None, seed: Optional[int] = None):
+        self.root = root
+        self.fs = fs or LOCAL_FS
+        self.is_filtered = is_filtered or (lambda path, name, depth: False)
+        self.progress = progress or (lambda: START_PROGRESS)
+        self.rng = random.Random(seed)
+        self.on_update: Optional[Callable[[Dict[str, float]], None]] = None  # Called with each new estimate
+        self.lock = threading.Lock()  # Guards probes and estimate
+        self.probes: List[List[Tuple[float, float]]] = []  # Per probe: (W_d, S_d) for each depth on its path
+        self.estimate: Optional[Dict[str, float]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _children(self, path: str, depth: int) -> List[str]:
+        """Subdirectories the scan would descend into (unreadable folders count as leaves)."""
+        try:
+            with self.fs.scandir(path) as it:
+                return [entry.path for entry in it
+                        if not entry.is_symlink() and entry.is_dir(follow_symlinks=False)
+                        and not self.is_filtered(entry.path, entry.name, depth + 1)]
+        except OSError:
+            return []
+
+    def probe(self) -> List[Tuple[float, float]]:
+        """Walk one random root-to-leaf path and return its (W_d, S_d) per depth."""
+        branching = []
+        path = self.root
+        while True:
+            children = self._children(path, len(branching))
+            branching.append(len(children))
+            if not children:
+                break
+            path = self.rng.choice(children)
+
+        weights = []
+        weight = 1.0
+        for count in branching:
+            weights.append(weight)
+            weight *= count
+        sizes = [0.0] * len(branching)
+        below = 0.0
+        for depth in range(len(branching) - 1, -1, -1):
+            below = 1 + branching[depth] * below
+            sizes[depth] = below
+        return list(zip(weights, sizes))
+
+    def add_probes(self, count: int) -> None:
+        """Run `count` probes synchronously."""
+        for _ in range(count):
+            sample = self.probe()
+            with self.lock:
+                self.probes.append(sample)
+
+    def compute(self, scanned: int, pending: Dict[int, int]) -> Optional[Dict[str, float]]:
+        """Estimate the total folder count given the scan's progress.
+
+        Args:
+            scanned: Folders the scan has finished
+            pending: Folders queued or in flight, by depth
+
+        Returns:
+            Dict with total, low, high (95% interval), remaining and probes;
+            None until ESTIMATOR_MIN_PROBES probes have run
+        """
+        with self.lock:
+            probes = list(self.probes)
+        n = len(probes)
+        if n < max(2, ESTIMATOR_MIN_PROBES):
+            return None
+
+        depth_weight: Dict[int, float] = {}
+        for sample in probes:
+            for depth, (weight, _size) in enumerate(sample):
+                depth_weight[depth] = depth_weight.get(depth, 0.0) + weight
+        # Each probe's estimate of the remaining folders; their mean is sum_d p_d * m_d
+        per_probe = []
+        for sample in probes:
+            remaining = 0.0
+            for depth, (weight, size) in enumerate(sample):
+                if pending.get(depth, 0) > 0:
+                    remaining += pending[depth] * weight * size * n / depth_weight[depth]
+            per_probe.append(remaining)
+        # Pending folders deeper than any probe reached count as single folders
+        unsampled = sum(count for depth, count in pending.items() if count > 0 and not depth_weight.get(depth))
+
+        queued = sum(count for count in pending.values() if count > 0)
+        # Queued folders exist for certain, so neither the estimate nor its lower bound drops below them
+        remaining = max(statistics.fmean(per_probe) + unsampled, queued)
+        half_width = ESTIMATOR_Z * statistics.stdev(per_probe) / math.sqrt(n)
+        return {
+            'total': scanned + remaining,
+            'low': scanned + max(remaining - half_width, queued),
+            'high': scanned + remaining + half_width,
+            'remaining': remaining,
+            'probes': n,
+        }
+
+    def refresh(self) -> Optional[Dict[str, float]]:
+        """Re-estimate from the current scan progress and notify on_update."""
+        scanned, pending = self.progress()
+        estimate = self.compute(scanned, pending)
+        if estimate is not None:
+            with self.lock:
+                self.estimate = estimate
+            if self.on_update:
+                self.on_update(estimate)
+        return estimate
+
+    def converged(self) -> bool:
+        """True once the interval is within ESTIMATOR_TARGET_PRECISION of the total."""
+        with self.lock:
+            estimate = self.estimate
+        if not estimate or not estimate['total']:
+            return False
+        return (estimate['high'] - estimate['total']) / estimate['total'] <= ESTIMATOR_TARGET_PRECISION
+
+    def _run(self) -> None:
+        last_refresh = 0.0
+        while not self._stop.is_set():
+            probing = len(self.probes) < ESTIMATOR_MAX_PROBES and not self.converged()
+            if probing:
+                self.add_probes(1)
+            now = time.monotonic()
+            if now - last_refresh >= ESTIMATOR_REFRESH_SECONDS or len(self.probes) == ESTIMATOR_MIN_PROBES:
+                self.refresh()
+                last_refresh = now
+            self._stop.wait(ESTIMATOR_PROBE_PAUSE if probing else ESTIMATOR_REFRESH_SECONDS)
+
+    def start(self) -> None:
+        """Probe and re-estimate on a background daemon thread until stop()."""
+        self._thread = threading.Thread(target=self._run, name="TreeSizeEstimator", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Optional[Dict[str, float]]:
+        """Stop the background thread and return the last estimate."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        with self.lock:
+            return self.estimate
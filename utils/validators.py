@@ -1,4 +1,5 @@
 import os
+import re
 from typing import Tuple
 
 def normalize_path(raw_path: str) -> str:
@@ -63,3 +64,26 @@ def validate_target_path(path: str) -> Tuple[bool, str]:
         return False, f"Permission denied accessing: {clean}"
         
     return True, "OK"
+
+def parse_duration(text: str) -> float:
+    """
+    Parses a duration like "30m", "90s", "1h30m" or "2.5h" (a bare number is minutes).
+    
+    Args:
+        text: Duration string
+        
+    Returns:
+        Duration in seconds (always > 0)
+    """
+    text = str(text).strip().lower()
+    match = re.fullmatch(r"(?:(\d+(?:\.\d+)?)h)?\s*(?:(\d+(?:\.\d+)?)m)?\s*(?:(\d+(?:\.\d+)?)s)?", text)
+    if re.fullmatch(r"\d+(?:\.\d+)?", text):
+        seconds = float(text) * 60
+    elif match and any(match.groups()):
+        hours, minutes, secs = (float(part) if part else 0.0 for part in match.groups())
+        seconds = hours * 3600 + minutes * 60 + secs
+    else:
+        raise ValueError(f"Invalid duration: {text!r} (use e.g. 30m, 90s, 1h30m)")
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive: {text!r}")
+    return seconds